@@ -0,0 +1,242 @@
+'''
+Data-quality audit for a seeded database.
+
+Every check is a single set-based SQL statement (no Python-side loops over
+rows), so the full audit runs in well under a second on the full dataset.
+Prints a JSON report of findings per check.
+
+Run with: python audit.py [--checks NAME ...] [--report PATH] [--fail-on NAME ... | all]
+'''
+
+import os
+import sys
+import json
+import time
+import argparse
+from flask import Flask
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+from models import db
+
+# fraction of a child polygon allowed to fall outside its parent, and the
+# smallest overlap (in square degrees) worth reporting; both absorb the
+# slivers that come with digitised boundaries
+COVERAGE_TOLERANCE = 0.01
+MIN_OVERLAP_AREA = 1e-6
+# relative difference between the CSV area and the geodesic area computed
+# from the boundary (seeding/geometry.py) before it is reported
+AREA_TOLERANCE = 0.1
+
+CODE_GAPS = '''
+    WITH layers(layer, width, lo, hi) AS (
+        SELECT 'counties', 3, min(code::int), max(code::int) FROM counties WHERE code ~ '^[0-9]+$'
+        UNION ALL
+        SELECT 'constituencies', 3, min(code::int), max(code::int) FROM constituencies WHERE code ~ '^[0-9]+$'
+        UNION ALL
+        SELECT 'wards', 4, min(code::int), max(code::int) FROM wards WHERE code ~ '^[0-9]+$'
+    ),
+    expected AS (
+        SELECT l.layer, lpad(g::text, l.width, '0') AS code
+        FROM layers l, generate_series(l.lo, l.hi) AS g
+    ),
+    existing AS (
+        SELECT 'counties' AS layer, code FROM counties
+        UNION ALL
+        SELECT 'constituencies', code FROM constituencies
+        UNION ALL
+        SELECT 'wards', code FROM wards
+    )
+    SELECT e.layer, count(*) AS missing, array_agg(e.code ORDER BY e.code) AS missing_codes
+    FROM expected e
+    LEFT JOIN existing x ON x.layer = e.layer AND x.code = e.code
+    WHERE x.code IS NULL
+    GROUP BY e.layer
+'''
+
+DUPLICATE_CODES = '''
+    SELECT 'counties' AS layer, code, array_agg(id ORDER BY id) AS ids
+    FROM counties GROUP BY code HAVING count(*) > 1
+    UNION ALL
+    SELECT 'constituencies', code, array_agg(id ORDER BY id)
+    FROM constituencies GROUP BY code HAVING count(*) > 1
+    UNION ALL
+    SELECT 'wards', code, array_agg(id ORDER BY id)
+    FROM wards GROUP BY code HAVING count(*) > 1
+'''
+
+# ST_CoveredBy is a cheap first filter; the area difference is only
+# computed for children that poke out of their parent
+UNCOVERED_CHILDREN = '''
+    SELECT layer, id, name, parent_id, parent_name, outside_fraction FROM (
+        SELECT 'constituencies' AS layer, c.id, c.name, p.id AS parent_id, p.name AS parent_name,
+               ST_Area(ST_Difference(c.geom, p.geom)) / NULLIF(ST_Area(c.geom), 0) AS outside_fraction
+        FROM constituencies c
+        JOIN counties p ON p.id = c.county_id
+        WHERE c.geom IS NOT NULL AND p.geom IS NOT NULL AND NOT ST_CoveredBy(c.geom, p.geom)
+        UNION ALL
+        SELECT 'wards', w.id, w.name, p.id, p.name,
+               ST_Area(ST_Difference(w.geom, p.geom)) / NULLIF(ST_Area(w.geom), 0)
+        FROM wards w
+        JOIN constituencies p ON p.id = w.constituency_id
+        WHERE w.geom IS NOT NULL AND p.geom IS NOT NULL AND NOT ST_CoveredBy(w.geom, p.geom)
+    ) uncovered
+    WHERE outside_fraction > :tolerance
+    ORDER BY outside_fraction DESC
+'''
+
+# && uses the GiST index to find candidate pairs; the DE-9IM pattern keeps
+# only pairs whose interiors share an area (shared borders are fine)
+OVERLAPPING_POLYGONS = '''
+    SELECT layer, a_id, b_id, overlap_area FROM (
+        SELECT 'counties' AS layer, a.id AS a_id, b.id AS b_id,
+               ST_Area(ST_Intersection(a.geom, b.geom)) AS overlap_area
+        FROM counties a JOIN counties b ON a.id < b.id AND a.geom && b.geom
+        WHERE ST_Relate(a.geom, b.geom, '2********')
+        UNION ALL
+        SELECT 'constituencies', a.id, b.id, ST_Area(ST_Intersection(a.geom, b.geom))
+        FROM constituencies a JOIN constituencies b ON a.id < b.id AND a.geom && b.geom
+        WHERE ST_Relate(a.geom, b.geom, '2********')
+        UNION ALL
+        SELECT 'wards', a.id, b.id, ST_Area(ST_Intersection(a.geom, b.geom))
+        FROM wards a JOIN wards b ON a.id < b.id AND a.geom && b.geom
+        WHERE ST_Relate(a.geom, b.geom, '2********')
+    ) overlaps
+    WHERE overlap_area > :min_overlap
+    ORDER BY overlap_area DESC
+'''
+
+# reads the stored geodesic_area, so no geometry is touched; areas that were
+# never loaded or computed are left out
+AREA_DISCREPANCIES = '''
+    SELECT layer, id, name, area, geodesic_area, difference FROM (
+        SELECT 'counties' AS layer, id, name, area, round(geodesic_area::numeric, 1) AS geodesic_area,
+               round(((geodesic_area - area) / NULLIF(area, 0))::numeric, 3) AS difference
+        FROM counties
+        WHERE area IS NOT NULL AND geodesic_area IS NOT NULL
+        UNION ALL
+        SELECT 'constituencies', id, name, area, round(geodesic_area::numeric, 1),
+               round(((geodesic_area - area) / NULLIF(area, 0))::numeric, 3)
+        FROM constituencies
+        WHERE area IS NOT NULL AND geodesic_area IS NOT NULL
+    ) areas
+    WHERE abs(difference) > :area_tolerance
+    ORDER BY abs(difference) DESC
+'''
+
+TERMS_WITHOUT_LOCATION = '''
+    SELECT p.name AS position, p.level, count(*) AS terms, array_agg(t.id ORDER BY t.id) AS term_ids
+    FROM terms t
+    JOIN positions p ON p.id = t.position_id
+    WHERE (p.level = 'county' AND t.county_id IS NULL)
+       OR (p.level = 'constituency' AND t.constituency_id IS NULL)
+       OR (p.level = 'ward' AND t.ward_id IS NULL)
+    GROUP BY p.name, p.level
+    ORDER BY terms DESC
+'''
+
+# a seat is a position plus its location; national seats have no location
+SEATS_WITH_MULTIPLE_HOLDERS = '''
+    SELECT p.name AS position, t.county_id, t.constituency_id, t.ward_id,
+           count(*) AS holders, array_agg(t.official_id ORDER BY t.official_id) AS official_ids
+    FROM terms t
+    JOIN positions p ON p.id = t.position_id
+    WHERE t.end_year IS NULL
+      AND (p.level = 'national' OR COALESCE(t.ward_id, t.constituency_id, t.county_id) IS NOT NULL)
+    GROUP BY p.name, t.position_id, t.county_id, t.constituency_id, t.ward_id
+    HAVING count(*) > 1
+    ORDER BY holders DESC
+'''
+
+# elected terms of one seat whose [start_year, end_year) ranges overlap;
+# these block the ex_terms_seat_overlap exclusion constraint
+OVERLAPPING_TERMS = '''
+    SELECT p.name AS position, a.county_id, a.constituency_id, a.ward_id,
+           a.id AS term_id, a.official_id, a.start_year, a.end_year,
+           b.id AS other_term_id, b.official_id AS other_official_id,
+           b.start_year AS other_start_year, b.end_year AS other_end_year
+    FROM terms a
+    JOIN terms b
+      ON a.id < b.id
+     AND a.position_id = b.position_id
+     AND coalesce(a.county_id, 0) = coalesce(b.county_id, 0)
+     AND coalesce(a.constituency_id, 0) = coalesce(b.constituency_id, 0)
+     AND coalesce(a.ward_id, 0) = coalesce(b.ward_id, 0)
+     AND int4range(a.start_year, a.end_year) && int4range(b.start_year, b.end_year)
+    JOIN positions p ON p.id = a.position_id
+    WHERE a.nomination_type IS NULL AND b.nomination_type IS NULL
+    ORDER BY p.name, a.id
+'''
+
+CHECKS = {
+    'code_gaps': CODE_GAPS,
+    'duplicate_codes': DUPLICATE_CODES,
+    'uncovered_children': UNCOVERED_CHILDREN,
+    'overlapping_polygons': OVERLAPPING_POLYGONS,
+    'area_discrepancies': AREA_DISCREPANCIES,
+    'terms_without_location': TERMS_WITHOUT_LOCATION,
+    'seats_with_multiple_holders': SEATS_WITH_MULTIPLE_HOLDERS,
+    'overlapping_terms': OVERLAPPING_TERMS,
+}
+
+
+def run_audit(checks=None):
+    """Run the named ``checks`` (default: all) and return the report dict."""
+    params = {
+        'tolerance': COVERAGE_TOLERANCE,
+        'min_overlap': MIN_OVERLAP_AREA,
+        'area_tolerance': AREA_TOLERANCE,
+    }
+    report = {'checks': {}, 'counts': {}, 'timings': {}}
+    for name in checks or CHECKS:
+        started = time.perf_counter()
+        rows = db.session.execute(text(CHECKS[name]), params).mappings().all()
+        report['timings'][name] = round(time.perf_counter() - started, 4)
+        report['checks'][name] = [dict(row) for row in rows]
+        report['counts'][name] = len(rows)
+    report['timings']['total'] = round(sum(report['timings'].values()), 4)
+    return report
+
+
+def create_audit_app():
+    load_dotenv()
+
+    database_uri = os.getenv('DATABASE_URI') or os.getenv('DATABASE_URL')
+    if not database_uri:
+        raise RuntimeError('Please set DATABASE_URI environment variable to your Postgres/Supabase connection string')
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run set-based data-quality checks against the database.')
+    parser.add_argument('--checks', nargs='+', choices=list(CHECKS), metavar='NAME',
+                        help=f"checks to run (default: all of {', '.join(CHECKS)})")
+    parser.add_argument('--report', metavar='PATH', help='write the JSON report here instead of stdout')
+    parser.add_argument('--fail-on', nargs='+', metavar='NAME', default=[],
+                        choices=list(CHECKS) + ['all'],
+                        help='exit with status 1 if any of these checks have findings')
+    args = parser.parse_args(argv)
+
+    app = create_audit_app()
+    with app.app_context():
+        report = run_audit(args.checks)
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as fh:
+            fh.write(output)
+    else:
+        print(output)
+
+    failing = list(CHECKS) if 'all' in args.fail_on else args.fail_on
+    if any(report['counts'].get(name) for name in failing):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import os
+
+
+class Config:
+    """Defaults for create_app(); anything passed to create_app(config) wins."""
+
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JSON_SORT_KEYS = False
+
+    MAIL_SERVER = 'smtp.gmail.com'
+    MAIL_PORT = 587
+    MAIL_USE_TLS = True
+    MAIL_USERNAME = 'your_email'
+    MAIL_PASSWORD = 'your_password'
+    MAIL_DEFAULT_SENDER = 'your_email'
+
+    # contact-form outbox (see services/mail_outbox.py and mail_worker.py)
+    MAIL_OUTBOX_BATCH_SIZE = 20
+    MAIL_OUTBOX_MAX_ATTEMPTS = 6
+    MAIL_OUTBOX_POLL_SECONDS = 2
+    # close the worker's SMTP connection after this long without mail
+    MAIL_SMTP_IDLE_SECONDS = 60
+
+    # contact-form duplicate detection (see services/spam_fingerprint.py)
+    SPAM_FINGERPRINT_WINDOW = 24 * 3600
+    SPAM_FINGERPRINT_MAX_ENTRIES = 10000
+    # bits; chosen with python -m tools.simhash_distances
+    SPAM_SIMHASH_DISTANCE = 3
+
+    CORS_ORIGINS = ["http://localhost:5173", "https://serikali-map.vercel.app"]
+
+    # engine/pool settings, turned into SQLALCHEMY_ENGINE_OPTIONS by
+    # extensions.database.engine_options() unless that is set directly
+    DB_POOL_SIZE = 5
+    DB_MAX_OVERFLOW = 10
+    DB_POOL_TIMEOUT = 30
+    DB_POOL_RECYCLE = 1800
+    DB_POOL_PRE_PING = True
+    DB_PGBOUNCER = False
+
+    # per-request statement timeout in ms (0 disables); not applied outside requests
+    STATEMENT_TIMEOUT_MS = 5000
+
+    # read replica (REPLICA_DATABASE_URI); see extensions/replica.py
+    REPLICA_MAX_LAG_SECONDS = 10
+    REPLICA_LAG_CHECK_INTERVAL = 5
+    # seconds; the lag check connects from inside a request
+    REPLICA_CONNECT_TIMEOUT = 2
+
+    # Prometheus text endpoint, off unless METRICS_ENDPOINT is set; with
+    # METRICS_TOKEN it needs "Authorization: Bearer <token>".
+    # X-Query-Count/Server-Timing headers are added in debug mode or when
+    # METRICS_DEBUG_HEADERS is set
+    METRICS_ENDPOINT = None
+    METRICS_TOKEN = None
+    METRICS_DEBUG_HEADERS = False
+
+    # N+1 detection for development/tests (see extensions/query_watch.py):
+    # None, "warn" or "raise"
+    QUERY_WATCH = None
+    QUERY_WATCH_THRESHOLD = 5
+    LAZY_LOAD_RAISE = False
+
+    # request tracing (see extensions/tracing.py): None, "console" or "file"
+    TRACING_EXPORTER = None
+    TRACING_FILE = "traces/spans.jsonl"
+    TRACE_SAMPLE_RATE = 1.0
+
+    # Flask-Limiter: "memory://" is per worker; "database" shares counters
+    # through Postgres (extensions/ratelimit_storage.py), "redis://host:6379"
+    # through Redis/Valkey (needs the redis package). If the store is down,
+    # limits fall back to memory rather than failing requests.
+    RATELIMIT_STORAGE_URI = "memory://"
+    RATELIMIT_STRATEGY = "sliding-window-counter"
+    RATELIMIT_SWALLOW_ERRORS = True
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = True
+    # reverse proxies in front of the app whose X-Forwarded-For is trusted
+    RATELIMIT_TRUSTED_PROXIES = 0
+    # per-client budgets for the expensive read routes (see read_budget())
+    RATELIMIT_READ_BUDGETS = {
+        "maps.counties": "60 per minute",
+        "maps.constituencies": "30 per minute",
+        "officials.all": "60 per minute",
+        "officials.search": "120 per minute",
+        "location_search": "30 per minute",
+    }
+
+    # Cache-Control max-age (seconds) on the ETag'd read endpoints (resources/etag.py)
+    CACHE_MAX_AGE = 300
+
+    # resource groups to register (see resources/registry.py); None registers all
+    RESOURCE_GROUPS = None
+
+    # Flask-Migrate pulls in alembic (~150ms of imports) and is only needed by
+    # the `flask db` commands, so web workers can switch it off
+    ENABLE_MIGRATIONS = True
+
+
+def config_from_env():
+    """Settings read from the environment (call after load_dotenv)."""
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': os.getenv("DATABASE_URI"),
+    }
+    for key in ('DB_POOL_SIZE', 'DB_MAX_OVERFLOW', 'DB_POOL_TIMEOUT', 'DB_POOL_RECYCLE',
+                'DB_POOL_PRE_PING', 'DB_PGBOUNCER'):
+        if os.getenv(key) is not None:
+            settings[key] = os.getenv(key)
+    if os.getenv("STATEMENT_TIMEOUT_MS") is not None:
+        settings['STATEMENT_TIMEOUT_MS'] = int(os.getenv("STATEMENT_TIMEOUT_MS"))
+    if os.getenv("REPLICA_DATABASE_URI"):
+        settings['SQLALCHEMY_BINDS'] = {'replica': os.getenv("REPLICA_DATABASE_URI")}
+    for key in ('REPLICA_MAX_LAG_SECONDS', 'REPLICA_LAG_CHECK_INTERVAL', 'REPLICA_CONNECT_TIMEOUT'):
+        if os.getenv(key) is not None:
+            settings[key] = float(os.getenv(key))
+    for key in ('METRICS_ENDPOINT', 'METRICS_TOKEN'):
+        if os.getenv(key):
+            settings[key] = os.getenv(key)
+    if os.getenv("METRICS_DEBUG_HEADERS") is not None:
+        settings['METRICS_DEBUG_HEADERS'] = os.getenv("METRICS_DEBUG_HEADERS").lower() not in ("0", "false", "no")
+    if os.getenv("QUERY_WATCH"):
+        settings['QUERY_WATCH'] = os.getenv("QUERY_WATCH").lower()
+    if os.getenv("QUERY_WATCH_THRESHOLD"):
+        settings['QUERY_WATCH_THRESHOLD'] = int(os.getenv("QUERY_WATCH_THRESHOLD"))
+    if os.getenv("LAZY_LOAD_RAISE") is not None:
+        settings['LAZY_LOAD_RAISE'] = os.getenv("LAZY_LOAD_RAISE").lower() not in ("0", "false", "no")
+    if os.getenv("TRACING_EXPORTER"):
+        settings['TRACING_EXPORTER'] = os.getenv("TRACING_EXPORTER").lower()
+    if os.getenv("TRACING_FILE"):
+        settings['TRACING_FILE'] = os.getenv("TRACING_FILE")
+    if os.getenv("TRACE_SAMPLE_RATE"):
+        settings['TRACE_SAMPLE_RATE'] = float(os.getenv("TRACE_SAMPLE_RATE"))
+    # MAIL_SERVER=localhost MAIL_PORT=8025 MAIL_USE_TLS=0 points at tools/smtp_sink.py
+    for key in ('MAIL_SERVER', 'MAIL_USERNAME', 'MAIL_PASSWORD', 'MAIL_DEFAULT_SENDER'):
+        if os.getenv(key):
+            settings[key] = os.getenv(key)
+    if os.getenv("MAIL_PORT"):
+        settings['MAIL_PORT'] = int(os.getenv("MAIL_PORT"))
+    if os.getenv("MAIL_USE_TLS") is not None:
+        settings['MAIL_USE_TLS'] = os.getenv("MAIL_USE_TLS").lower() not in ("0", "false", "no")
+    for key in ('MAIL_OUTBOX_BATCH_SIZE', 'MAIL_OUTBOX_MAX_ATTEMPTS'):
+        if os.getenv(key):
+            settings[key] = int(os.getenv(key))
+    for key in ('SPAM_FINGERPRINT_WINDOW', 'SPAM_FINGERPRINT_MAX_ENTRIES', 'SPAM_SIMHASH_DISTANCE'):
+        if os.getenv(key):
+            settings[key] = int(os.getenv(key))
+    for key in ('MAIL_OUTBOX_POLL_SECONDS', 'MAIL_SMTP_IDLE_SECONDS'):
+        if os.getenv(key):
+            settings[key] = float(os.getenv(key))
+    if os.getenv("RATELIMIT_ENABLED") is not None:
+        settings['RATELIMIT_ENABLED'] = os.getenv("RATELIMIT_ENABLED").lower() not in ("0", "false", "no")
+    for key in ('RATELIMIT_STORAGE_URI', 'RATELIMIT_STRATEGY'):
+        if os.getenv(key):
+            settings[key] = os.getenv(key)
+    if os.getenv("RATELIMIT_TRUSTED_PROXIES"):
+        settings['RATELIMIT_TRUSTED_PROXIES'] = int(os.getenv("RATELIMIT_TRUSTED_PROXIES"))
+    if os.getenv("RATELIMIT_READ_BUDGETS") is not None:
+        # "maps.constituencies=10 per minute;location_search=" (empty turns one off)
+        budgets = dict(Config.RATELIMIT_READ_BUDGETS)
+        for item in os.getenv("RATELIMIT_READ_BUDGETS").split(";"):
+            name, _, limit = item.partition("=")
+            if name.strip():
+                budgets[name.strip()] = limit.strip()
+        settings['RATELIMIT_READ_BUDGETS'] = budgets
+    if os.getenv("CACHE_MAX_AGE"):
+        settings['CACHE_MAX_AGE'] = int(os.getenv("CACHE_MAX_AGE"))
+    if os.getenv("ENABLE_MIGRATIONS") is not None:
+        settings['ENABLE_MIGRATIONS'] = os.getenv("ENABLE_MIGRATIONS").lower() not in ("0", "false", "no")
+    if os.getenv("RESOURCE_GROUPS"):
+        settings['RESOURCE_GROUPS'] = [g.strip() for g in os.getenv("RESOURCE_GROUPS").split(",") if g.strip()]
+    return settings
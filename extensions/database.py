@@ -0,0 +1,151 @@
+"""
+Engine tuning for the app's Postgres connections.
+
+``engine_options()`` turns the DB_* settings into Flask-SQLAlchemy's
+``SQLALCHEMY_ENGINE_OPTIONS``, with a pool that records how long checkouts
+wait; ``init_engine()`` adds a per-request ``statement_timeout``.
+"""
+import logging
+import time
+from threading import Lock
+
+from flask import current_app, g, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolWaitStats:
+    """Running totals of how long connection checkouts waited on the pool."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += int(timed_out)
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "total_wait_seconds": round(self.total_wait, 6),
+                "max_wait_seconds": round(self.max_wait, 6),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    # checkouts slower than this are logged as a sign the pool is saturated
+    slow_checkout_seconds = 0.1
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        waited = time.perf_counter() - started
+        self.wait_stats.record(waited)
+        if has_request_context():
+            g.db_pool_wait = g.get("db_pool_wait", 0.0) + waited
+        if waited > self.slow_checkout_seconds:
+            logger.warning(
+                "Waited %.0f ms for a database connection (%s)", waited * 1000, self.status()
+            )
+        return conn
+
+
+def _flag(value):
+    return str(value).strip().lower() not in ("0", "false", "no", "off", "")
+
+
+def engine_options(database_uri, settings):
+    """
+    Build ``SQLALCHEMY_ENGINE_OPTIONS`` from DB_* ``settings``.
+
+    ``DB_PGBOUNCER`` is for pgbouncer (or Supabase's pooler) in transaction
+    mode, where a server connection is not kept between transactions, so
+    prepared statements have to be switched off. psycopg2 never prepares
+    statements; psycopg 3 does after ``prepare_threshold`` executions.
+    """
+    if database_uri and make_url(database_uri).get_backend_name() == "sqlite":
+        # Flask-SQLAlchemy picks the pool for SQLite itself
+        return {}
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": int(settings.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(settings.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(settings.get("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(settings.get("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": _flag(settings.get("DB_POOL_PRE_PING", True)),
+    }
+    if database_uri and _flag(settings.get("DB_PGBOUNCER", False)):
+        if make_url(database_uri).get_driver_name() == "psycopg":
+            options["connect_args"] = {"prepare_threshold": None}
+    return options
+
+
+def _statement_timeout_ms():
+    if not (has_app_context() and has_request_context()):
+        # seeding, migrations and the CLI run without a timeout
+        return None
+    return g.get("statement_timeout_ms", current_app.config.get("STATEMENT_TIMEOUT_MS"))
+
+
+def set_statement_timeout(ms):
+    """
+    Override the statement timeout for the rest of this request.
+
+    Takes effect on the next transaction; call it before the first query.
+    ``None`` or 0 disables the timeout.
+    """
+    g.statement_timeout_ms = ms
+
+
+def init_engine(engine):
+    """Hook the statement timeout into ``engine`` (call once per engine)."""
+    if engine.dialect.name != "postgresql":
+        return
+
+    @event.listens_for(engine, "begin")
+    def set_local_statement_timeout(conn):
+        ms = _statement_timeout_ms()
+        if ms:
+            # SET LOCAL lasts until the end of the transaction, which also
+            # keeps it from leaking across clients behind pgbouncer
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(ms)}")
+
+
+def pool_stats(engine):
+    """Checkout-wait totals and current pool occupancy for ``engine``."""
+    pool = engine.pool
+    stats = pool.wait_stats.snapshot() if hasattr(pool, "wait_stats") else {}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    return stats
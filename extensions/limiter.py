@@ -1,10 +1,61 @@
+from flask import current_app, g, request
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
+# RATELIMIT_STORAGE_URI value that means "the app's own database"
+DATABASE_STORAGE = "database"
+
 def key_func():
-    from flask import request
     return request.cookies.get("client_id") or get_remote_address()
 
+def client_ip():
+    """
+    The caller's address, skipping RATELIMIT_TRUSTED_PROXIES hops of
+    X-Forwarded-For. Read budgets key on this rather than the client_id
+    cookie, which a scraper can simply drop or rotate. Resolved once per
+    request however many limits use it.
+    """
+    ip = g.get("client_ip")
+    if ip is None:
+        hops = current_app.config["RATELIMIT_TRUSTED_PROXIES"]
+        route = request.access_route if hops else []
+        ip = route[-hops] if len(route) >= hops > 0 else request.remote_addr or "127.0.0.1"
+        g.client_ip = ip
+    return ip
+
+def read_budget(name):
+    """
+    Per-endpoint limit for an expensive read route, taken from
+    ``RATELIMIT_READ_BUDGETS[name]`` at request time (a missing or empty
+    entry turns it off). Use as ``decorators = [read_budget("maps.constituencies")]``.
+    """
+    def budget():
+        return current_app.config["RATELIMIT_READ_BUDGETS"].get(name) or ""
+
+    return limiter.limit(
+        lambda: budget() or "1 per second",
+        key_func=client_ip,
+        exempt_when=lambda: not budget(),
+    )
+
+def storage_uri(config):
+    """Resolve RATELIMIT_STORAGE_URI=database to the Postgres limiter storage."""
+    uri = config["RATELIMIT_STORAGE_URI"]
+    if uri != DATABASE_STORAGE:
+        return uri
+    from sqlalchemy.engine import make_url
+    # registers the ratelimit+postgresql schemes with `limits`
+    from extensions.ratelimit_storage import SCHEME_PREFIX
+
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() != "postgresql":
+        raise ValueError("RATELIMIT_STORAGE_URI=database needs a PostgreSQL DATABASE_URI")
+    return SCHEME_PREFIX + url.render_as_string(hide_password=False)
+
+def init_limiter(app):
+    app.config["RATELIMIT_STORAGE_URI"] = storage_uri(app.config)
+    limiter.init_app(app)
+
 limiter = Limiter(
     key_func=key_func,
     default_limits=[]
@@ -0,0 +1,203 @@
+"""
+Per-request performance instrumentation.
+
+Counts SQL statements and the time spent in them per request (SQLAlchemy
+cursor events), times outbound Mapbox and SMTP calls, and keeps per-endpoint
+latency histograms. Everything is exposed in the Prometheus text format on
+``METRICS_ENDPOINT``, which is off unless configured and, with
+``METRICS_TOKEN`` set, only answers ``Authorization: Bearer <token>``; with
+``app.debug`` each response also gets ``X-Query-Count`` and
+``Server-Timing`` headers.
+
+Metrics live in process memory, so under gunicorn each worker reports its
+own series (scrape each worker, or aggregate by ``instance``).
+"""
+import hmac
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from flask import Response, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# seconds; covers everything from a cached lookup to a slow map render
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+
+def _label_str(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        '%s="%s"' % (n, str(v).replace("\\", "\\\\").replace('"', '\\"')) for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        for labels, (counts, total, sum_) in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_label_str(names, labels + (bound,))} {count}")
+            lines.append(f"{self.name}_bucket{_label_str(names, labels + ('+Inf',))} {total}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, labels)} {total}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, labels)} {sum_:.6f}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by endpoint", ("endpoint", "method", "status")
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements per request by endpoint", ("endpoint",), QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request by endpoint", ("endpoint",)
+)
+EXTERNAL_LATENCY = Histogram(
+    "external_call_duration_seconds", "Outbound call latency by service", ("service", "outcome")
+)
+
+METRICS = [REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_DB_TIME, EXTERNAL_LATENCY]
+
+
+# [query count, seconds in SQL] for the current request; a plain ContextVar
+# is much cheaper per statement than going through flask.g
+_request_db = ContextVar("request_db", default=None)
+
+
+# the start time rides on the execution context, which is per statement, so
+# a failed statement leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_db.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - context._query_started
+
+
+def request_db_stats():
+    """``(queries, seconds)`` spent in SQL so far in this request."""
+    stats = _request_db.get()
+    return (stats[0], stats[1]) if stats is not None else (0, 0.0)
+
+
+def instrument_engine(engine):
+    """Count statements and their time on ``engine`` (call once per engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def timed(service):
+    """Time an outbound call, e.g. ``with timed("mapbox"): requests.get(...)``."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - started
+        EXTERNAL_LATENCY.observe(elapsed, service, outcome)
+        if has_request_context():
+            external = g.setdefault("external_time", {})
+            external[service] = external.get(service, 0.0) + elapsed
+
+
+def render_metrics():
+    from models import db
+    from extensions.database import pool_stats
+
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.append("# HELP db_pool_checkout_wait_seconds_total Time spent waiting for a pooled connection")
+    lines.append("# TYPE db_pool_checkout_wait_seconds_total counter")
+    pools = [(key or "primary", pool_stats(engine)) for key, engine in db.engines.items()]
+    for bind, stats in pools:
+        if "total_wait_seconds" in stats:
+            lines.append(f'db_pool_checkout_wait_seconds_total{{bind="{bind}"}} {stats["total_wait_seconds"]}')
+    lines.append("# HELP db_pool_checked_out Connections currently checked out")
+    lines.append("# TYPE db_pool_checked_out gauge")
+    for bind, stats in pools:
+        if "checked_out" in stats:
+            lines.append(f'db_pool_checked_out{{bind="{bind}"}} {stats["checked_out"]}')
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view():
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            abort(401)
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def _start_timer():
+    g.request_started = time.perf_counter()
+    g.request_db_token = _request_db.set([0, 0.0])
+
+
+def _reset_db_stats(exc=None):
+    token = g.pop("request_db_token", None)
+    if token is not None:
+        _request_db.reset(token)
+
+
+def _record_request(response):
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or "unmatched"
+    if endpoint == "metrics":
+        return response
+    queries, db_time = request_db_stats()
+    REQUEST_LATENCY.observe(elapsed, endpoint, request.method, response.status_code)
+    REQUEST_QUERIES.observe(queries, endpoint)
+    REQUEST_DB_TIME.observe(db_time, endpoint)
+
+    if current_app.debug or current_app.config.get("METRICS_DEBUG_HEADERS"):
+        timings = [f"db;dur={db_time * 1000:.1f};desc=\"{queries} queries\""]
+        if g.get("db_pool_wait"):
+            timings.append(f"pool;dur={g.db_pool_wait * 1000:.1f}")
+        for service, spent in g.get("external_time", {}).items():
+            timings.append(f"{service};dur={spent * 1000:.1f}")
+        timings.append(f"total;dur={elapsed * 1000:.1f}")
+        response.headers["X-Query-Count"] = str(queries)
+        response.headers["Server-Timing"] = ", ".join(timings)
+    return response
+
+
+def init_metrics(app, engines):
+    for engine in engines:
+        instrument_engine(engine)
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.teardown_request(_reset_db_stats)
+    if app.config.get("METRICS_ENDPOINT"):
+        app.add_url_rule(app.config["METRICS_ENDPOINT"], "metrics", metrics_view)
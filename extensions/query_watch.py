@@ -0,0 +1,99 @@
+"""
+N+1 detection for development and tests.
+
+``QUERY_WATCH`` turns it on (off by default, so production pays nothing):
+
+* ``"warn"`` logs every SQL statement a request ran at least
+  ``QUERY_WATCH_THRESHOLD`` times with different parameters, which is what a
+  query-per-row loop looks like;
+* ``"raise"`` does the same but fails the request, so the loop shows up as a
+  500 in development and a failed test in CI.
+
+``LAZY_LOAD_RAISE`` additionally applies ``raiseload("*", sql_only=True)``
+to every ORM query run in that app's context, so touching a relationship
+that wasn't eager-loaded raises instead of quietly emitting a query.
+Explicit ``joinedload`` / ``selectinload`` options still win over the
+wildcard.
+"""
+import logging
+from collections import Counter
+from contextvars import ContextVar
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import raiseload
+
+logger = logging.getLogger(__name__)
+
+_statements = ContextVar("query_watch_statements", default=None)
+
+
+class RepeatedQueryError(RuntimeError):
+    """A request ran the same statement more often than QUERY_WATCH_THRESHOLD allows."""
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    seen = _statements.get()
+    if seen is not None:
+        seen[statement] += 1
+
+
+def _start():
+    g.query_watch_token = _statements.set(Counter())
+
+
+def repeated_statements(threshold):
+    """``[(statement, count)]`` run at least ``threshold`` times so far in this request."""
+    seen = _statements.get() or {}
+    return sorted(
+        ((statement, count) for statement, count in seen.items() if count >= threshold),
+        key=lambda item: -item[1],
+    )
+
+
+def _check(response):
+    threshold = current_app.config["QUERY_WATCH_THRESHOLD"]
+    repeated = repeated_statements(threshold)
+    if not repeated:
+        return response
+    for statement, count in repeated:
+        logger.warning("%s ran %d times in %s %s:\n%s",
+                       request.endpoint, count, request.method, request.path, statement)
+    response.headers["X-Repeated-Queries"] = str(len(repeated))
+    if current_app.config["QUERY_WATCH"] == "raise":
+        # the error response goes through after_request again; don't re-raise there
+        _statements.get().clear()
+        statement, count = repeated[0]
+        raise RepeatedQueryError(
+            f"{request.endpoint} ran the same statement {count} times (threshold {threshold}):\n{statement}"
+        )
+    return response
+
+
+def _finish(exc=None):
+    token = g.pop("query_watch_token", None)
+    if token is not None:
+        _statements.reset(token)
+
+
+def _raiseload_everything(state):
+    # session events are per class, so this listener sees every app's
+    # sessions; only those of an app that asked for it are changed
+    if not (has_app_context() and current_app.config.get("LAZY_LOAD_RAISE")):
+        return
+    if state.is_select and not state.is_relationship_load and not state.is_column_load:
+        state.statement = state.statement.options(raiseload("*", sql_only=True))
+
+
+def init_query_watch(app, engines, session_class):
+    mode = app.config.get("QUERY_WATCH")
+    if mode:
+        if mode not in ("warn", "raise"):
+            raise ValueError(f"QUERY_WATCH must be 'warn' or 'raise', not {mode!r}")
+        for engine in engines:
+            event.listen(engine, "after_cursor_execute", _count_statement)
+        app.before_request(_start)
+        app.after_request(_check)
+        app.teardown_request(_finish)
+    if app.config.get("LAZY_LOAD_RAISE") and not event.contains(session_class, "do_orm_execute", _raiseload_everything):
+        event.listen(session_class, "do_orm_execute", _raiseload_everything)
@@ -0,0 +1,186 @@
+"""
+Postgres storage for Flask-Limiter, shared by every worker.
+
+Registered with ``limits`` under ``ratelimit+<sqlalchemy url>`` (see
+:func:`extensions.limiter.storage_uri`). Counters live in an UNLOGGED table
+(rate limits don't need to survive a crash, and skipping the WAL keeps the
+writes cheap). Each check is one round trip:
+
+* fixed window: a single ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``;
+* sliding window counter: ``rate_limit_acquire()``, a plpgsql function that
+  weighs the previous window and conditionally increments the current one
+  under the row lock, so concurrent workers can't overshoot the limit.
+"""
+import threading
+import time
+
+from limits.storage.base import SlidingWindowCounterSupport, Storage, TimestampedSlidingWindow
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+
+SCHEME_PREFIX = "ratelimit+"
+TABLE = "rate_limit_counters"
+# expired counters are swept after this many writes (per process)
+SWEEP_EVERY = 1000
+
+SETUP = [
+    f"""
+    CREATE UNLOGGED TABLE IF NOT EXISTS {TABLE} (
+        key text PRIMARY KEY,
+        count integer NOT NULL,
+        expires_at double precision NOT NULL
+    )
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION rate_limit_acquire(
+        previous_key text, current_key text, weight double precision, max_count integer,
+        amount integer, now_ts double precision, current_expires double precision
+    ) RETURNS boolean LANGUAGE plpgsql AS $$
+    DECLARE
+        used double precision;
+        acquired integer;
+    BEGIN
+        SELECT coalesce(max(c.count), 0) * weight INTO used
+        FROM {TABLE} c WHERE c.key = previous_key AND c.expires_at > now_ts;
+        IF used + amount > max_count THEN
+            RETURN false;
+        END IF;
+        INSERT INTO {TABLE} AS c (key, count, expires_at)
+        VALUES (current_key, amount, current_expires)
+        ON CONFLICT (key) DO UPDATE
+            SET count = CASE WHEN c.expires_at > now_ts THEN c.count + amount ELSE amount END,
+                expires_at = CASE WHEN c.expires_at > now_ts THEN c.expires_at ELSE current_expires END
+            WHERE c.expires_at <= now_ts OR used + c.count + amount <= max_count
+        RETURNING c.count INTO acquired;
+        RETURN acquired IS NOT NULL;
+    END $$
+    """,
+]
+
+INCR = text(f"""
+    INSERT INTO {TABLE} AS c (key, count, expires_at) VALUES (:key, :amount, :expires)
+    ON CONFLICT (key) DO UPDATE
+        SET count = CASE WHEN c.expires_at > :now THEN c.count + :amount ELSE :amount END,
+            expires_at = CASE WHEN c.expires_at > :now THEN c.expires_at ELSE :expires END
+    RETURNING count
+""")
+
+
+class PostgresStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    STORAGE_SCHEME = [
+        "ratelimit+postgresql",
+        "ratelimit+postgresql+psycopg2",
+        "ratelimit+postgresql+psycopg",
+    ]
+
+    def __init__(self, uri, wrap_exceptions=False, pool_size=2, statement_timeout_ms=200, **options):
+        # a limiter check must never hold a request up for long; Flask-Limiter
+        # falls back to in-memory limits when this raises
+        self.engine = create_engine(
+            uri[len(SCHEME_PREFIX):],
+            pool_size=int(pool_size),
+            max_overflow=2,
+            pool_pre_ping=True,
+            isolation_level="AUTOCOMMIT",
+            connect_args={"options": f"-c statement_timeout={int(statement_timeout_ms)}"},
+        )
+        self._ready = False
+        self._lock = threading.Lock()
+        self._writes = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return SQLAlchemyError
+
+    def _execute(self, statement, params=None):
+        if not self._ready:
+            self._setup()
+        with self.engine.connect() as conn:
+            return conn.execute(statement, params or {}).all()
+
+    def _setup(self):
+        with self._lock:
+            if self._ready:
+                return
+            with self.engine.begin() as conn:
+                # CREATE OR REPLACE FUNCTION from several workers at once conflicts
+                conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": TABLE})
+                for statement in SETUP:
+                    conn.execute(text(statement))
+            self._ready = True
+
+    def _count_write(self):
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            with self.engine.connect() as conn:
+                conn.execute(text(f"DELETE FROM {TABLE} WHERE expires_at <= :now"), {"now": time.time()})
+
+    # --- fixed window ---
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        rows = self._execute(INCR, {"key": key, "amount": amount, "now": now, "expires": now + expiry})
+        self._count_write()
+        return rows[0][0]
+
+    def get(self, key):
+        rows = self._execute(text(f"SELECT count FROM {TABLE} WHERE key = :key AND expires_at > :now"),
+                             {"key": key, "now": time.time()})
+        return rows[0][0] if rows else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        rows = self._execute(text(f"SELECT expires_at FROM {TABLE} WHERE key = :key AND expires_at > :now"),
+                             {"key": key, "now": now})
+        return rows[0][0] if rows else now
+
+    def check(self):
+        try:
+            self._execute(text("SELECT 1"))
+            return True
+        except SQLAlchemyError:
+            return False
+
+    def reset(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"DELETE FROM {TABLE}")).rowcount
+
+    def clear(self, key):
+        self._execute(text(f"DELETE FROM {TABLE} WHERE key = :key RETURNING key"), {"key": key})
+
+    # --- sliding window counter ---
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        # share of the previous window still inside the sliding window
+        weight = 1 - (now / expiry) % 1
+        window_start = int(now / expiry) * expiry
+        rows = self._execute(
+            text("SELECT rate_limit_acquire(:previous, :current, :weight, :limit, :amount, :now, :expires)"),
+            {"previous": previous_key, "current": current_key, "weight": weight, "limit": limit,
+             "amount": amount, "now": now, "expires": window_start + 2 * expiry},
+        )
+        self._count_write()
+        return bool(rows[0][0])
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        counts = dict(self._execute(
+            text(f"SELECT key, count FROM {TABLE} WHERE key IN (:previous, :current) AND expires_at > :now"),
+            {"previous": previous_key, "current": current_key, "now": now},
+        ))
+        previous_count = counts.get(previous_key, 0)
+        current_count = counts.get(current_key, 0)
+        previous_ttl = (1 - (now / expiry) % 1) * expiry if previous_count else 0.0
+        current_ttl = (1 - (now / expiry) % 1) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self._execute(text(f"DELETE FROM {TABLE} WHERE key IN (:previous, :current) RETURNING key"),
+                      {"previous": previous_key, "current": current_key})
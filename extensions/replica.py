@@ -0,0 +1,110 @@
+"""
+Read-replica routing for db.session.
+
+When ``REPLICA_DATABASE_URI`` is set the replica is registered as the
+``replica`` bind. Resource ``get`` methods wrapped with ``replica_reads``
+send their queries there; everything else (flushes, seeding, the CLI, any
+request that didn't opt in) uses the primary. The replica is skipped while
+its replay lag is over ``REPLICA_MAX_LAG_SECONDS`` or it can't be reached,
+and a client can force the primary with an ``X-DB-Route: primary`` header.
+
+The lag check runs inside the request, so the replica engine connects with
+a short ``REPLICA_CONNECT_TIMEOUT``: a replica that is down costs a request
+a couple of seconds, not the operating system's TCP timeout.
+"""
+import logging
+import time
+from functools import wraps
+from threading import Lock
+
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = "replica"
+ROUTE_HEADER = "X-DB-Route"
+
+# seconds since the last replayed transaction; 0 on a server that isn't a standby
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END"
+)
+
+_lag_cache = {}
+_lag_lock = Lock()
+
+
+def replica_bind(database_uri, settings):
+    """
+    ``SQLALCHEMY_BINDS`` entry for the replica.
+
+    Flask-SQLAlchemy doesn't apply ``SQLALCHEMY_ENGINE_OPTIONS`` to binds, so
+    the replica gets the primary's pool settings here, plus the connect
+    timeout.
+    """
+    from extensions.database import engine_options
+
+    options = engine_options(database_uri, settings)
+    if make_url(database_uri).get_backend_name() == "postgresql":
+        options["connect_args"] = {
+            **options.get("connect_args", {}),
+            "connect_timeout": int(settings.get("REPLICA_CONNECT_TIMEOUT", 2)),
+        }
+    return {"url": database_uri, **options}
+
+
+def replica_lag(engine):
+    """Replication lag of ``engine`` in seconds (cached), or None if it can't be read."""
+    interval = current_app.config.get("REPLICA_LAG_CHECK_INTERVAL", 5)
+    key = id(engine)
+    now = time.monotonic()
+    with _lag_lock:
+        cached = _lag_cache.get(key)
+        if cached and now - cached[0] < interval:
+            return cached[1]
+    try:
+        with engine.connect() as conn:
+            lag = float(conn.execute(REPLICA_LAG_SQL).scalar())
+    except Exception as e:
+        logger.warning("Replica lag check failed, reading from the primary: %s", e)
+        lag = None
+    with _lag_lock:
+        _lag_cache[key] = (now, lag)
+    return lag
+
+
+def replica_usable(engine):
+    lag = replica_lag(engine)
+    return lag is not None and lag <= current_app.config.get("REPLICA_MAX_LAG_SECONDS", 10)
+
+
+def use_primary():
+    """Send the rest of this request's reads to the primary (e.g. to read your own writes)."""
+    g.db_route = "primary"
+
+
+def replica_reads(method):
+    """Route the queries of a read-only Resource method to the replica."""
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if request.headers.get(ROUTE_HEADER, "").lower() != "primary":
+            g.db_route = REPLICA_BIND
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends replica-routed reads to the replica bind."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get("db_route") == REPLICA_BIND:
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None and replica_usable(engine):
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
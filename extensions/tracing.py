@@ -0,0 +1,311 @@
+"""
+Request tracing across Flask, SQLAlchemy, Mapbox and SMTP.
+
+``TRACING_EXPORTER`` turns it on: ``"console"`` prints finished spans to
+stderr, ``"file"`` appends them as JSON lines to ``TRACING_FILE``. Each
+request is a root span (continuing an incoming W3C ``traceparent``), with
+child spans for every SQL statement and for the calls wrapped in
+:func:`span`, which outside a request starts a trace of its own.
+``TRACE_SAMPLE_RATE`` (0..1) decides per trace whether it is recorded;
+unsampled requests only pay for a ContextVar lookup per span.
+
+If the OpenTelemetry SDK is installed, spans go through it (so any OTel
+exporter can be swapped in); otherwise a small built-in tracer writes
+records with the same fields (trace_id, span_id, parent_id, name, start,
+end, attributes, status) so the output reads the same either way.
+"""
+import json
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from flask import request
+from sqlalchemy import event
+
+try:
+    from opentelemetry import context as otel_context, trace as otel_trace
+    from opentelemetry.propagate import extract
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    OTEL_AVAILABLE = True
+except Exception:
+    OTEL_AVAILABLE = False
+
+SERVICE_NAME = "serikalimap-backend"
+# longest SQL kept on a db span
+STATEMENT_LIMIT = 2000
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# --- built-in tracer ---
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "status", "events")
+
+    def __init__(self, name, trace_id, parent_id, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.start = time.time_ns()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.events = []
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exc):
+        self.status = "ERROR"
+        self.events.append({
+            "name": "exception",
+            "attributes": {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        })
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "context": {"trace_id": "0x" + self.trace_id, "span_id": "0x" + self.span_id},
+            "parent_id": "0x" + self.parent_id if self.parent_id else None,
+            "start_time": self.start,
+            "end_time": self.end,
+            "duration_ms": round((self.end - self.start) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"status_code": self.status},
+            "events": self.events,
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+class JsonLinesExporter:
+    def __init__(self, path=None):
+        self._fh = open(path, "a", encoding="utf-8") if path else sys.stderr
+        self._lock = Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+
+_current_span = ContextVar("current_span", default=None)
+# current span inside an unsampled trace, so nested calls don't start a new one
+UNSAMPLED = object()
+
+
+class BuiltinTracer:
+    def __init__(self, exporter, sample_rate):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_request(self, name, headers, attributes):
+        trace_id, parent_id, sampled = None, None, None
+        parts = (headers.get("traceparent") or "").split("-")
+        if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+            trace_id, parent_id, sampled = parts[1], parts[2], parts[3] == "01"
+        if sampled is None:
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return None, _current_span.set(UNSAMPLED)
+        span = Span(name, trace_id or "%032x" % random.getrandbits(128), parent_id, attributes)
+        return span, _current_span.set(span)
+
+    def end_request(self, handle, status_code, exc):
+        span, token = handle
+        if span is None:
+            _current_span.reset(token)
+            return
+        span.set_attribute("http.status_code", status_code)
+        if exc is not None:
+            span.record_exception(exc)
+        elif status_code and status_code >= 500:
+            span.status = "ERROR"
+        self._finish(span)
+        _current_span.reset(token)
+
+    def _finish(self, span):
+        span.end = time.time_ns()
+        self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name, attributes):
+        parent = _current_span.get()
+        if parent is UNSAMPLED:
+            yield NOOP_SPAN
+            return
+        if parent is None:
+            # outside a request (e.g. mail_worker.py): the root of a new trace
+            if random.random() >= self.sample_rate:
+                token = _current_span.set(UNSAMPLED)
+                try:
+                    yield NOOP_SPAN
+                finally:
+                    _current_span.reset(token)
+                return
+            child = Span(name, "%032x" % random.getrandbits(128), None, attributes)
+        else:
+            child = Span(name, parent.trace_id, parent.span_id, attributes)
+        token = _current_span.set(child)
+        try:
+            yield child
+        except Exception as e:
+            child.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(child)
+
+    def is_recording(self):
+        return _current_span.get() not in (None, UNSAMPLED)
+
+
+# --- OpenTelemetry ---
+
+class OtelTracer:
+    def __init__(self, path, sample_rate):
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": SERVICE_NAME}),
+            sampler=ParentBased(TraceIdRatioBased(sample_rate)),
+        )
+        out = open(path, "a", encoding="utf-8") if path else sys.stderr
+        provider.add_span_processor(BatchSpanProcessor(
+            ConsoleSpanExporter(out=out, formatter=lambda s: s.to_json(indent=None) + "\n")
+        ))
+        self.tracer = provider.get_tracer(__name__)
+
+    def start_request(self, name, headers, attributes):
+        span = self.tracer.start_span(name, context=extract(dict(headers)), attributes=attributes,
+                                      kind=otel_trace.SpanKind.SERVER)
+        token = otel_context.attach(otel_trace.set_span_in_context(span))
+        return span, token
+
+    def end_request(self, handle, status_code, exc):
+        span, token = handle
+        span.set_attribute("http.status_code", status_code)
+        if exc is not None:
+            span.record_exception(exc)
+        if exc is not None or (status_code and status_code >= 500):
+            span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+        span.end()
+        otel_context.detach(token)
+
+    @contextmanager
+    def span(self, name, attributes):
+        with self.tracer.start_as_current_span(name, attributes=attributes) as current:
+            yield current
+
+    def is_recording(self):
+        return otel_trace.get_current_span().is_recording()
+
+
+_tracer = None
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Child span of the current trace, or outside a request the root of a new
+    one (so mail_worker.py's deliveries and their SMTP calls are traced); a
+    no-op when tracing is off or the trace is unsampled.
+    """
+    if _tracer is None:
+        yield NOOP_SPAN
+        return
+    with _tracer.span(name, attributes) as current:
+        yield current
+
+
+# --- hooks ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _tracer.is_recording():
+        cm = _tracer.span("db.query", {
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:STATEMENT_LIMIT],
+        })
+        cm.__enter__()
+        context._trace_span = cm
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    cm = getattr(context, "_trace_span", None)
+    if cm is not None:
+        context._trace_span = None
+        cm.__exit__(None, None, None)
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    cm = getattr(context, "_trace_span", None) if context is not None else None
+    if cm is not None:
+        context._trace_span = None
+        error = exception_context.original_exception
+        cm.__exit__(type(error), error, error.__traceback__)
+
+
+def _start_request():
+    from flask import g
+
+    rule = request.url_rule.rule if request.url_rule else request.path
+    g.trace_handle = _tracer.start_request(
+        f"{request.method} {rule}", request.headers,
+        {"http.method": request.method, "http.route": rule, "http.target": request.full_path.rstrip("?")},
+    )
+
+
+def _record_status(response):
+    from flask import g
+
+    g.trace_status = response.status_code
+    return response
+
+
+def _end_request(exc=None):
+    from flask import g
+
+    handle = g.pop("trace_handle", None)
+    if handle is not None:
+        _tracer.end_request(handle, g.pop("trace_status", 500 if exc else None), exc)
+
+
+def init_tracing(app, engines):
+    global _tracer
+    exporter = app.config.get("TRACING_EXPORTER")
+    if not exporter:
+        return
+    if exporter not in ("console", "file"):
+        raise ValueError(f"TRACING_EXPORTER must be 'console' or 'file', not {exporter!r}")
+    path = app.config["TRACING_FILE"] if exporter == "file" else None
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    rate = float(app.config.get("TRACE_SAMPLE_RATE", 1.0))
+    if OTEL_AVAILABLE:
+        _tracer = OtelTracer(path, rate)
+    else:
+        _tracer = BuiltinTracer(JsonLinesExporter(path), rate)
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_end_request)
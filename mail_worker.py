@@ -0,0 +1,39 @@
+'''
+Background delivery worker for the contact-form mail outbox.
+
+Claims queued messages from mail_outbox in batches, sends them over one
+reused SMTP connection and records sent / retry / failed status; see
+services/mail_outbox.py. Safe to run several copies against Postgres.
+
+Run with: python mail_worker.py [--once]
+
+Uses DATABASE_URI and the MAIL_* settings (config.py); for local testing
+start tools/smtp_sink.py and set MAIL_SERVER=localhost MAIL_PORT=8025 MAIL_USE_TLS=0.
+'''
+
+import logging
+import argparse
+
+from app import create_app
+from services.mail_outbox import run_worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Deliver queued contact-form mail.')
+    parser.add_argument('--once', action='store_true', help='exit once no queued message is due')
+    parser.add_argument('--batch-size', type=int, help='messages claimed per batch (default: MAIL_OUTBOX_BATCH_SIZE)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    config = {'ENABLE_MIGRATIONS': False, 'RESOURCE_GROUPS': ['mail'], 'STATEMENT_TIMEOUT_MS': 0}
+    if args.batch_size:
+        config['MAIL_OUTBOX_BATCH_SIZE'] = args.batch_size
+    app = create_app(config)
+    totals = run_worker(app, once=args.once)
+    if totals:
+        print(f"Sent {totals['sent']}, retrying {totals['retried']}, failed {totals['failed']}")
+
+
+if __name__ == '__main__':
+    main()
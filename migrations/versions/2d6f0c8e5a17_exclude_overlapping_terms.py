@@ -0,0 +1,52 @@
+"""exclude overlapping elected terms for the same seat
+
+Kept separate from the tenure column so the as_of indexes can be deployed
+while existing overlaps are cleaned up (see `python audit.py --checks
+overlapping_terms`).
+
+Revision ID: 2d6f0c8e5a17
+Revises: 9e4b7a1f2c35
+Create Date: 2026-10-18 16:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d6f0c8e5a17'
+down_revision = '9e4b7a1f2c35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    overlaps = op.get_bind().execute(sa.text('''
+        SELECT count(*) FROM terms a JOIN terms b
+          ON a.id < b.id
+         AND a.position_id = b.position_id
+         AND coalesce(a.county_id, 0) = coalesce(b.county_id, 0)
+         AND coalesce(a.constituency_id, 0) = coalesce(b.constituency_id, 0)
+         AND coalesce(a.ward_id, 0) = coalesce(b.ward_id, 0)
+         AND a.tenure && b.tenure
+        WHERE a.nomination_type IS NULL AND b.nomination_type IS NULL
+    ''')).scalar()
+    if overlaps:
+        raise RuntimeError(
+            f'{overlaps} pairs of elected terms overlap for the same seat; '
+            'list them with `python audit.py --checks overlapping_terms` and fix the data first'
+        )
+
+    op.execute('''
+        ALTER TABLE terms ADD CONSTRAINT ex_terms_seat_overlap EXCLUDE USING gist (
+            position_id WITH =,
+            coalesce(county_id, 0) WITH =,
+            coalesce(constituency_id, 0) WITH =,
+            coalesce(ward_id, 0) WITH =,
+            tenure WITH &&
+        ) WHERE (nomination_type IS NULL)
+    ''')
+
+
+def downgrade():
+    op.execute('ALTER TABLE terms DROP CONSTRAINT ex_terms_seat_overlap')
@@ -0,0 +1,37 @@
+"""add trigram and full-text search indexes to officials
+
+Revision ID: 4a8c2f6e1d93
+Revises: 7b3e9d1a4c60
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '4a8c2f6e1d93'
+down_revision = '7b3e9d1a4c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.batch_alter_table('officials', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(),
+                                      sa.Computed("to_tsvector('simple', name)", persisted=True),
+                                      nullable=True))
+        batch_op.create_index('ix_officials_name_trgm', [sa.text('lower(name) gin_trgm_ops')], unique=False,
+                              postgresql_using='gin')
+        batch_op.create_index('ix_officials_search_vector', ['search_vector'], unique=False,
+                              postgresql_using='gin')
+
+
+def downgrade():
+    with op.batch_alter_table('officials', schema=None) as batch_op:
+        batch_op.drop_index('ix_officials_search_vector')
+        batch_op.drop_index('ix_officials_name_trgm')
+        batch_op.drop_column('search_vector')
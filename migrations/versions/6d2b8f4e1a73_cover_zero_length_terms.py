@@ -0,0 +1,64 @@
+"""let terms that start and end in the same year cover that year
+
+int4range(2017, 2017) is empty, so such a term was never held_in() any
+year and dropped out of ?as_of and the seat_share rollup. tenure now covers
+the start year of those terms, and the exclusion constraint compares the
+plain [start_year, end_year) ranges instead, so a holder replaced within
+the year their successor starts still doesn't conflict with them. A stored
+generated column's expression can't be altered before PostgreSQL 17, so
+the column, its indexes and the constraint are recreated.
+
+Revision ID: 6d2b8f4e1a73
+Revises: c3f7a9e2b614
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2b8f4e1a73'
+down_revision = 'c3f7a9e2b614'
+branch_labels = None
+depends_on = None
+
+
+def replace_tenure(expression, excluded_range):
+    op.execute('ALTER TABLE terms DROP CONSTRAINT IF EXISTS ex_terms_seat_overlap')
+    with op.batch_alter_table('terms', schema=None) as batch_op:
+        batch_op.drop_index('ix_terms_constituency_tenure')
+        batch_op.drop_index('ix_terms_county_tenure')
+        batch_op.drop_index('ix_terms_tenure')
+        batch_op.drop_column('tenure')
+        batch_op.add_column(sa.Column('tenure', postgresql.INT4RANGE(),
+                                      sa.Computed(expression, persisted=True),
+                                      nullable=True))
+        batch_op.create_index('ix_terms_tenure', ['tenure'], unique=False, postgresql_using='gist')
+        batch_op.create_index('ix_terms_county_tenure', ['county_id', 'tenure'], unique=False,
+                              postgresql_using='gist')
+        batch_op.create_index('ix_terms_constituency_tenure', ['constituency_id', 'tenure'], unique=False,
+                              postgresql_using='gist')
+
+    op.execute(f'''
+        ALTER TABLE terms ADD CONSTRAINT ex_terms_seat_overlap EXCLUDE USING gist (
+            position_id WITH =,
+            coalesce(county_id, 0) WITH =,
+            coalesce(constituency_id, 0) WITH =,
+            coalesce(ward_id, 0) WITH =,
+            {excluded_range} WITH &&
+        ) WHERE (nomination_type IS NULL)
+    ''')
+
+
+def upgrade():
+    replace_tenure(
+        'int4range(start_year, CASE WHEN end_year = start_year THEN end_year + 1 ELSE end_year END)',
+        'int4range(start_year, end_year)',
+    )
+    # seat_share was built from the old ranges; rebuild it with python -m seeding.rollups
+
+
+def downgrade():
+    replace_tenure('int4range(start_year, end_year)', 'tenure')
@@ -0,0 +1,33 @@
+"""add seat history indexes to terms
+
+Revision ID: 7b3e9d1a4c60
+Revises: 2d6f0c8e5a17
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3e9d1a4c60'
+down_revision = '2d6f0c8e5a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('terms', schema=None) as batch_op:
+        batch_op.create_index('ix_terms_county_seat_history', ['position_id', 'county_id', 'start_year'],
+                              unique=False)
+        batch_op.create_index('ix_terms_constituency_seat_history',
+                              ['position_id', 'constituency_id', 'start_year'], unique=False)
+        batch_op.create_index('ix_terms_ward_seat_history', ['position_id', 'ward_id', 'start_year'],
+                              unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('terms', schema=None) as batch_op:
+        batch_op.drop_index('ix_terms_ward_seat_history')
+        batch_op.drop_index('ix_terms_constituency_seat_history')
+        batch_op.drop_index('ix_terms_county_seat_history')
@@ -0,0 +1,36 @@
+"""add derived geometry attributes to counties, constituencies and wards
+
+Revision ID: 9e1f4b7c2d85
+Revises: b52d7e9a3f18
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9e1f4b7c2d85'
+down_revision = 'b52d7e9a3f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('counties', 'constituencies', 'wards'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('bbox', postgresql.ARRAY(sa.Float()), nullable=True))
+            batch_op.add_column(sa.Column('centroid', postgresql.ARRAY(sa.Float()), nullable=True))
+            batch_op.add_column(sa.Column('label_point', postgresql.ARRAY(sa.Float()), nullable=True))
+            batch_op.add_column(sa.Column('geodesic_area', sa.Float(), nullable=True))
+    # filled by the seeder; for an already seeded database run python -m seeding.geometry
+
+
+def downgrade():
+    for table in ('wards', 'constituencies', 'counties'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('geodesic_area')
+            batch_op.drop_column('label_point')
+            batch_op.drop_column('centroid')
+            batch_op.drop_column('bbox')
@@ -0,0 +1,40 @@
+"""add generated tenure range to terms with GiST indexes
+
+Revision ID: 9e4b7a1f2c35
+Revises: 5c8e41d0b9a2
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b7a1f2c35'
+down_revision = '5c8e41d0b9a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # GiST indexes mixing plain integer ids with the range need btree_gist
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+
+    with op.batch_alter_table('terms', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tenure', postgresql.INT4RANGE(),
+                                      sa.Computed('int4range(start_year, end_year)', persisted=True),
+                                      nullable=True))
+        batch_op.create_index('ix_terms_tenure', ['tenure'], unique=False, postgresql_using='gist')
+        batch_op.create_index('ix_terms_county_tenure', ['county_id', 'tenure'], unique=False,
+                              postgresql_using='gist')
+        batch_op.create_index('ix_terms_constituency_tenure', ['constituency_id', 'tenure'], unique=False,
+                              postgresql_using='gist')
+
+
+def downgrade():
+    with op.batch_alter_table('terms', schema=None) as batch_op:
+        batch_op.drop_index('ix_terms_constituency_tenure')
+        batch_op.drop_index('ix_terms_county_tenure')
+        batch_op.drop_index('ix_terms_tenure')
+        batch_op.drop_column('tenure')
@@ -0,0 +1,39 @@
+"""add map_breaks rollup table
+
+Revision ID: a4d9c6e3f127
+Revises: 6d2b8f4e1a73
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d9c6e3f127'
+down_revision = '6d2b8f4e1a73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('map_breaks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('layer', sa.String(length=32), nullable=False),
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('method', sa.String(length=16), nullable=False),
+    sa.Column('classes', sa.Integer(), nullable=False),
+    sa.Column('breaks', postgresql.ARRAY(sa.Float()), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('map_breaks', schema=None) as batch_op:
+        batch_op.create_index('ux_map_breaks_key', ['layer', 'metric', 'method', 'classes'], unique=True)
+    # filled by the seeder; for an already seeded database run python -m seeding.rollups
+
+
+def downgrade():
+    with op.batch_alter_table('map_breaks', schema=None) as batch_op:
+        batch_op.drop_index('ux_map_breaks_key')
+
+    op.drop_table('map_breaks')
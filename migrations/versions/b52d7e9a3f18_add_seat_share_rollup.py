@@ -0,0 +1,44 @@
+"""add seat_share rollup table
+
+Revision ID: b52d7e9a3f18
+Revises: 4a8c2f6e1d93
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52d7e9a3f18'
+down_revision = '4a8c2f6e1d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('seat_share',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('election_year', sa.Integer(), nullable=False),
+    sa.Column('position_id', sa.Integer(), nullable=False),
+    sa.Column('party_id', sa.Integer(), nullable=True),
+    sa.Column('county_id', sa.Integer(), nullable=True),
+    sa.Column('seats', sa.Integer(), nullable=False),
+    sa.Column('nominated', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['county_id'], ['counties.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['party_id'], ['parties.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['position_id'], ['positions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('seat_share', schema=None) as batch_op:
+        batch_op.create_index('ux_seat_share_key', ['position_id', 'election_year',
+                                                     sa.text('coalesce(party_id, 0)'),
+                                                     sa.text('coalesce(county_id, 0)')], unique=True)
+    # filled by the seeder; for an already seeded database run python -m seeding.rollups
+
+
+def downgrade():
+    with op.batch_alter_table('seat_share', schema=None) as batch_op:
+        batch_op.drop_index('ux_seat_share_key')
+
+    op.drop_table('seat_share')
@@ -0,0 +1,37 @@
+"""add message_fingerprints for contact-form duplicate detection
+
+Revision ID: c3f7a9e2b614
+Revises: 9e1f4b7c2d85
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f7a9e2b614'
+down_revision = '9e1f4b7c2d85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('message_fingerprints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=32), nullable=False),
+    sa.Column('simhash', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('message_fingerprints', schema=None) as batch_op:
+        batch_op.create_index('ix_message_fingerprints_content_hash', ['content_hash'], unique=False)
+        batch_op.create_index('ix_message_fingerprints_created_at', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('message_fingerprints', schema=None) as batch_op:
+        batch_op.drop_index('ix_message_fingerprints_created_at')
+        batch_op.drop_index('ix_message_fingerprints_content_hash')
+
+    op.drop_table('message_fingerprints')
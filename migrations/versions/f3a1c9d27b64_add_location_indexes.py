@@ -0,0 +1,42 @@
+"""add location indexes for terms, constituencies and wards
+
+Revision ID: f3a1c9d27b64
+Revises: ac9e303db342
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a1c9d27b64'
+down_revision = 'ac9e303db342'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('constituencies', schema=None) as batch_op:
+        batch_op.create_index('ix_constituencies_county', ['county_id'], unique=False)
+
+    with op.batch_alter_table('wards', schema=None) as batch_op:
+        batch_op.create_index('ix_wards_constituency', ['constituency_id'], unique=False)
+
+    with op.batch_alter_table('terms', schema=None) as batch_op:
+        batch_op.create_index('ix_terms_county_current', ['county_id', 'end_year'], unique=False)
+        batch_op.create_index('ix_terms_constituency_current', ['constituency_id', 'end_year'], unique=False)
+        batch_op.create_index('ix_terms_ward_current', ['ward_id', 'end_year'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('terms', schema=None) as batch_op:
+        batch_op.drop_index('ix_terms_ward_current')
+        batch_op.drop_index('ix_terms_constituency_current')
+        batch_op.drop_index('ix_terms_county_current')
+
+    with op.batch_alter_table('wards', schema=None) as batch_op:
+        batch_op.drop_index('ix_wards_constituency')
+
+    with op.batch_alter_table('constituencies', schema=None) as batch_op:
+        batch_op.drop_index('ix_constituencies_county')
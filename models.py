@@ -1,11 +1,13 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import CheckConstraint, UniqueConstraint, Index, text
-from sqlalchemy.orm import validates
+from sqlalchemy import CheckConstraint, UniqueConstraint, Index, Computed, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, INT4RANGE, TSVECTOR, ExcludeConstraint
+from sqlalchemy.orm import deferred, validates
 from sqlalchemy_serializer import SerializerMixin
 from geoalchemy2 import Geometry
+from extensions.replica import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 class TimestampMixin:
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -14,7 +16,20 @@ class TimestampMixin:
     )
 
 
-class County(db.Model, SerializerMixin, TimestampMixin):
+class DerivedGeometryMixin:
+    """
+    Attributes computed from ``geom`` by the seeder (seeding/geometry.py),
+    so the map endpoints serve them without touching the geometry. Points
+    are [lon, lat]; ``bbox`` is [west, south, east, north]; ``geodesic_area``
+    is in km², comparable with the ``area`` taken from the CSVs.
+    """
+    bbox = db.Column(ARRAY(db.Float), nullable=True)
+    centroid = db.Column(ARRAY(db.Float), nullable=True)
+    label_point = db.Column(ARRAY(db.Float), nullable=True)
+    geodesic_area = db.Column(db.Float, nullable=True)
+
+
+class County(db.Model, SerializerMixin, TimestampMixin, DerivedGeometryMixin):
     __tablename__ = "counties"
 
     serialize_rules = (
@@ -47,7 +62,7 @@ class County(db.Model, SerializerMixin, TimestampMixin):
         return f"<County id={self.id} name={self.name!r}>"
 
 
-class Constituency(db.Model, SerializerMixin, TimestampMixin):
+class Constituency(db.Model, SerializerMixin, TimestampMixin, DerivedGeometryMixin):
     __tablename__ = "constituencies"
 
     serialize_rules = (
@@ -81,13 +96,14 @@ class Constituency(db.Model, SerializerMixin, TimestampMixin):
     __table_args__ = (
         UniqueConstraint("name", "county_id", name="uq_constituencies_name_per_county"),
         Index("ix_constituencies_name", text("lower(name)")),
+        Index("ix_constituencies_county", "county_id"),
     )
 
     def __repr__(self):
         return f"<Constituency id={self.id} name={self.name!r}>"
 
 
-class Ward(db.Model, SerializerMixin, TimestampMixin):
+class Ward(db.Model, SerializerMixin, TimestampMixin, DerivedGeometryMixin):
     __tablename__ = "wards"
 
     serialize_rules = (
@@ -108,6 +124,7 @@ class Ward(db.Model, SerializerMixin, TimestampMixin):
 
     __table_args__ = (
         Index("ix_wards_name", text("lower(name)")),
+        Index("ix_wards_constituency", "constituency_id"),
     )
 
     def __repr__(self):
@@ -160,13 +177,17 @@ class Party(db.Model, SerializerMixin, TimestampMixin):
 class Official(db.Model, SerializerMixin, TimestampMixin):
     __tablename__ = "officials"
 
-    serialize_rules = ("-terms.official",)
+    serialize_rules = ("-terms.official", "-search_vector")
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String, nullable=False)
     gender = db.Column(db.String, nullable=False)
     photo_url = db.Column(db.String, nullable=False)
 
+    # name as words for /officials/search; 'simple' so names aren't stemmed.
+    # Only used in filters, so deferred like Term.tenure
+    search_vector = deferred(db.Column(TSVECTOR, Computed("to_tsvector('simple', name)", persisted=True)))
+
     terms = db.relationship(
         "Term",
         back_populates="official",
@@ -177,6 +198,9 @@ class Official(db.Model, SerializerMixin, TimestampMixin):
     __table_args__ = (
         CheckConstraint("gender IN ('male','female','other')", name="ck_officials_gender_valid"),
         Index("ix_officials_name", text("lower(name)")),
+        # /officials/search: misspellings and partial names (pg_trgm), whole words
+        Index("ix_officials_name_trgm", text("lower(name) gin_trgm_ops"), postgresql_using="gin"),
+        Index("ix_officials_search_vector", "search_vector", postgresql_using="gin"),
     )
 
     def __repr__(self) -> str:  # pragma: no cover
@@ -193,6 +217,7 @@ class Term(db.Model, SerializerMixin, TimestampMixin):
         "-county.terms",
         "-constituency.terms",
         "-ward.terms",
+        "-tenure",
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -222,6 +247,16 @@ class Term(db.Model, SerializerMixin, TimestampMixin):
 
     nomination_type = db.Column(db.String, nullable=True)  # e.g., Gender balance, Marginalized group, Youth, NULL if elected
 
+    # [start_year, end_year): a term ending in 2022 and its successor starting
+    # in 2022 don't overlap, and an open end_year is unbounded. A term that
+    # starts and ends in the same year (a governor who died months into
+    # office) would be an empty range, so it covers its start year instead.
+    # Only used in filters, so deferred rather than loaded with every term
+    tenure = deferred(db.Column(INT4RANGE, Computed(
+        "int4range(start_year, CASE WHEN end_year = start_year THEN end_year + 1 ELSE end_year END)",
+        persisted=True,
+    )))
+
     official = db.relationship("Official", back_populates="terms")
     position = db.relationship("Position", back_populates="terms")
     party = db.relationship("Party", back_populates="terms")
@@ -238,8 +273,43 @@ class Term(db.Model, SerializerMixin, TimestampMixin):
         ),
         Index("ix_terms_years", "start_year", "end_year"),
         Index("ix_terms_official", "official_id"),
+        # current holders of a seat: location + end_year IS NULL
+        Index("ix_terms_county_current", "county_id", "end_year"),
+        Index("ix_terms_constituency_current", "constituency_id", "end_year"),
+        Index("ix_terms_ward_current", "ward_id", "end_year"),
+        # /seats/<position>/<location>/history: one seat's terms in order
+        Index("ix_terms_county_seat_history", "position_id", "county_id", "start_year"),
+        Index("ix_terms_constituency_seat_history", "position_id", "constituency_id", "start_year"),
+        Index("ix_terms_ward_seat_history", "position_id", "ward_id", "start_year"),
+        # ?as_of=YEAR lookups: tenure @> year (GiST, needs btree_gist for the ids)
+        Index("ix_terms_tenure", "tenure", postgresql_using="gist"),
+        Index("ix_terms_county_tenure", "county_id", "tenure", postgresql_using="gist"),
+        Index("ix_terms_constituency_tenure", "constituency_id", "tenure", postgresql_using="gist"),
+        # one elected holder per seat at a time; nominated members share seats.
+        # Compares the plain [start_year, end_year) ranges, so a term that
+        # starts and ends in the year its successor starts doesn't conflict
+        ExcludeConstraint(
+            (position_id, "="),
+            (func.coalesce(county_id, 0), "="),
+            (func.coalesce(constituency_id, 0), "="),
+            (func.coalesce(ward_id, 0), "="),
+            (func.int4range(start_year, end_year), "&&"),
+            name="ex_terms_seat_overlap",
+            using="gist",
+            where=text("nomination_type IS NULL"),
+        ),
     )
 
+    @classmethod
+    def held_in(cls, year):
+        """Filter for terms that were running in ``year``."""
+        return cls.tenure.contains(year)
+
+    @classmethod
+    def serving(cls, year=None):
+        """Filter for terms running in ``year``, or still running when it is None."""
+        return cls.end_year.is_(None) if year is None else cls.held_in(year)
+
     @validates("start_year", "end_year")
     def validate_years(self, key, value):
         if value is None:
@@ -263,4 +333,113 @@ class Term(db.Model, SerializerMixin, TimestampMixin):
     def __repr__(self) -> str:  # pragma: no cover
         span = f"{self.start_year}-{self.end_year or 'present'}"
         return f"<Term id={self.id} official_id={self.official_id} position_id={self.position_id} {span}>"
-    
\ No newline at end of file
+    
+
+class SeatShare(db.Model):
+    """
+    Seats per party, position and county held in each election year; rebuilt
+    from terms by the seeder (seeding/rollups.py) and read by /stats/seat-share.
+    """
+
+    __tablename__ = "seat_share"
+
+    id = db.Column(db.Integer, primary_key=True)
+    election_year = db.Column(db.Integer, nullable=False)
+    position_id = db.Column(
+        db.Integer, db.ForeignKey("positions.id", ondelete="CASCADE"), nullable=False
+    )
+    party_id = db.Column(
+        db.Integer, db.ForeignKey("parties.id", ondelete="CASCADE"), nullable=True
+    )  # NULL: independents / unknown party
+    county_id = db.Column(
+        db.Integer, db.ForeignKey("counties.id", ondelete="CASCADE"), nullable=True
+    )  # NULL: national seats
+    seats = db.Column(db.Integer, nullable=False, default=0)  # elected
+    nominated = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # one row per key; position first so a position's cycles are one range
+        Index(
+            "ux_seat_share_key",
+            "position_id",
+            "election_year",
+            text("coalesce(party_id, 0)"),
+            text("coalesce(county_id, 0)"),
+            unique=True,
+        ),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<SeatShare {self.election_year} position={self.position_id} party={self.party_id} seats={self.seats}>"
+
+
+class MapBreaks(db.Model):
+    """
+    Class edges of a numeric map metric for one method and class count;
+    computed by the seeder (seeding/rollups.py) and read by
+    /maps/<layer>/values.
+    """
+
+    __tablename__ = "map_breaks"
+
+    id = db.Column(db.Integer, primary_key=True)
+    layer = db.Column(db.String(32), nullable=False)  # counties / constituencies
+    metric = db.Column(db.String(32), nullable=False)
+    method = db.Column(db.String(16), nullable=False)  # quantile / jenks
+    classes = db.Column(db.Integer, nullable=False)
+    breaks = db.Column(ARRAY(db.Float), nullable=False)
+
+    __table_args__ = (
+        Index("ux_map_breaks_key", "layer", "metric", "method", "classes", unique=True),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<MapBreaks {self.layer} {self.metric} {self.method} classes={self.classes}>"
+
+
+class MessageFingerprint(db.Model):
+    """Fingerprint of an accepted contact-form message (see services/spam_fingerprint.py)."""
+
+    __tablename__ = "message_fingerprints"
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(32), nullable=False)
+    simhash = db.Column(db.BigInteger, nullable=False)  # 64 bits, stored signed
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_message_fingerprints_content_hash", "content_hash"),
+        Index("ix_message_fingerprints_created_at", "created_at"),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<MessageFingerprint id={self.id} content_hash={self.content_hash}>"
+
+
+class MailOutbox(db.Model, TimestampMixin):
+    """Contact-form mail waiting for (or done with) delivery by mail_worker.py."""
+
+    __tablename__ = "mail_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    sender = db.Column(db.String, nullable=False)
+    recipients = db.Column(db.String, nullable=False)  # comma separated
+    subject = db.Column(db.String, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    status = db.Column(db.String, nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # earliest time a worker may (re)try; also the lease end while "sending"
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending','sending','sent','failed')", name="ck_mail_outbox_status_valid"
+        ),
+        Index("ix_mail_outbox_due", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<MailOutbox id={self.id} status={self.status} attempts={self.attempts}>"
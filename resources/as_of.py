@@ -0,0 +1,13 @@
+"""``?as_of=YEAR`` for the leader endpoints; see ``Term.held_in``."""
+from flask import request
+from flask_restful import abort
+
+
+def as_of_year():
+    """The ``as_of`` query argument as a year, or None when it isn't given."""
+    value = request.args.get("as_of", "").strip()
+    if not value:
+        return None
+    if not value.isdigit() or not 1900 <= int(value) <= 2100:
+        abort(400, message="as_of must be a year between 1900 and 2100, e.g. ?as_of=2017")
+    return int(value)
@@ -0,0 +1,14 @@
+"""ETag/Cache-Control for read endpoints whose payload only changes on a reseed."""
+from flask import current_app, jsonify, request
+
+
+def conditional_json(payload):
+    """
+    ``payload`` as JSON with a strong ETag over the body; a matching
+    If-None-Match gets an empty 304 instead.
+    """
+    response = jsonify(payload)
+    response.add_etag()
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config["CACHE_MAX_AGE"]
+    return response.make_conditional(request)
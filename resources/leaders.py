@@ -1,23 +1,38 @@
 from flask_restful import Resource
 from flask import jsonify
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import contains_eager, joinedload, load_only
+from extensions.replica import replica_reads
+from extensions.limiter import read_budget
+from resources.as_of import as_of_year
 from models import db, County, Constituency, Term, Official, Position, Party
 
 
 class CountyOfficialsResource(Resource):
+    method_decorators = {"get": [replica_reads]}
+
     def get(self, county_id):
         """
         Fetch all county-level officials (Governor, Senator, Women Rep, etc.)
         for a specific county, including past and present leaders.
         """
-        terms = (
+        as_of = as_of_year()
+        query = (
             db.session.query(Term)
             .join(Official)
             .join(Position)
             .outerjoin(Party)
             .filter(Term.county_id == county_id, Position.level == "county")
-            .all()
+            # everything the loop reads, in this one query
+            .options(
+                contains_eager(Term.official),
+                contains_eager(Term.position),
+                contains_eager(Term.party),
+                joinedload(Term.county).load_only(County.id, County.name),
+            )
         )
+        if as_of:
+            query = query.filter(Term.held_in(as_of))
+        terms = query.all()
 
         results = []
         for term in terms:
@@ -54,20 +69,35 @@ class CountyOfficialsResource(Resource):
 
 
 class CountyMPsResource(Resource):
+    method_decorators = {"get": [replica_reads]}
+
     def get(self, county_id):
         """
         Fetch all MPs (constituency-level officials) for a specific county,
         including past and present leaders.
         """
-        terms = (
+        as_of = as_of_year()
+        query = (
             db.session.query(Term)
             .join(Official)
             .join(Position)
             .outerjoin(Party)
             .join(Constituency)
             .filter(Constituency.county_id == county_id, Position.level == "constituency")
-            .all()
+            # everything the loop reads, in this one query
+            .options(
+                contains_eager(Term.official),
+                contains_eager(Term.position),
+                contains_eager(Term.party),
+                contains_eager(Term.constituency).options(
+                    load_only(Constituency.id, Constituency.name, Constituency.county_id),
+                    joinedload(Constituency.county).load_only(County.id, County.name),
+                ),
+            )
         )
+        if as_of:
+            query = query.filter(Term.held_in(as_of))
+        terms = query.all()
 
         results = []
         for term in terms:
@@ -123,8 +153,12 @@ def party_key(party):
 
 
 class AllCountyOfficials(Resource):
+    decorators = [read_budget("officials.all")]
+    method_decorators = {"get": [replica_reads]}
+
     def get(self):
-        terms = (
+        as_of = as_of_year()
+        query = (
             Term.query.join(Position)
             .filter(Position.level == "county")
             .options(
@@ -133,8 +167,10 @@ class AllCountyOfficials(Resource):
                 joinedload(Term.party),
                 joinedload(Term.county),
             )
-            .all()
         )
+        if as_of:
+            query = query.filter(Term.held_in(as_of))
+        terms = query.all()
 
         officials_data = []
         stats = {}
@@ -173,8 +209,11 @@ class AllCountyOfficials(Resource):
                     "party_distribution": {},
                 }
 
+            # stats cover the holders at the time: current ones, or everyone serving in as_of
+            serving = as_of is not None or term.end_year is None
+
             # Gender counts
-            if term.end_year == None and term.official.gender in stats[pos_name]["gender_counts"]:
+            if serving and term.official.gender in stats[pos_name]["gender_counts"]:
                 stats[pos_name]["gender_counts"][term.official.gender] += 1
             else:
                 stats[pos_name]["gender_counts"]["other"] += 1
@@ -187,7 +226,7 @@ class AllCountyOfficials(Resource):
                     "abbrev": pabbrev,
                     "count": 0,
                 }
-            if term.end_year is None:
+            if serving:
                 stats[pos_name]["party_distribution"][pname]["count"] += 1
 
         # Convert party_distribution dicts to lists
@@ -201,8 +240,12 @@ class AllCountyOfficials(Resource):
 
 
 class AllMPs(Resource):
+    decorators = [read_budget("officials.all")]
+    method_decorators = {"get": [replica_reads]}
+
     def get(self):
-        terms = (
+        as_of = as_of_year()
+        query = (
             Term.query.join(Position)
             .filter(Position.name == "MP")
             .options(
@@ -211,8 +254,10 @@ class AllMPs(Resource):
                 joinedload(Term.party),
                 joinedload(Term.constituency).joinedload(Constituency.county),
             )
-            .all()
         )
+        if as_of:
+            query = query.filter(Term.held_in(as_of))
+        terms = query.all()
 
         officials_data = []
         gender_counts_all = {"male": 0, "female": 0, "other": 0}
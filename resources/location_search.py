@@ -1,25 +1,41 @@
 # routes/location_routes.py
 from flask_restful import Resource, reqparse
 from flask import request
+from functools import lru_cache
 from services.mapbox_geocoding import MapboxGeocodingService
+from extensions.replica import replica_reads
+from extensions.tracing import span
+from extensions.limiter import read_budget
+from resources.as_of import as_of_year
+
+
+@lru_cache(maxsize=None)
+def get_geo_service():
+    # built on first use rather than at import, so the token is read after load_dotenv()
+    return MapboxGeocodingService()
 
-geo_service = MapboxGeocodingService()
 
 parser = reqparse.RequestParser()
 parser.add_argument("place", type=str, required=True, location="args")
 
 class LocationLookup(Resource):
+    # every lookup is a billed Mapbox request
+    decorators = [read_budget("location_search")]
+    method_decorators = {"get": [replica_reads]}
+
     def get(self):
         args = parser.parse_args()
         place = args.get("place")
+        as_of = as_of_year()
 
         # Lookup constituency
-        constituency = geo_service.search_place_and_lookup(place)
+        with span("location_search.lookup", place=place):
+            constituency = get_geo_service().search_place_and_lookup(place)
         if not constituency:
             return {"message": "No constituency found for this place"}, 404
 
         # Get leaders
-        leaders = geo_service.get_current_leaders(constituency["constituency_id"]) or {}
+        leaders = get_geo_service().get_current_leaders(constituency["constituency_id"], as_of) or {}
 
         return {
             "location": {
@@ -1,7 +1,10 @@
 from flask import request, jsonify, make_response
 from flask_restful import Resource
 from extensions.limiter import limiter
-from services.mail_config import send_contact_email, is_spam
+from services.mail_config import is_spam
+from services.mail_outbox import enqueue_contact_email
+from services.spam_fingerprint import fingerprint, find_repeat, remember
+from models import db
 import uuid
 
 
@@ -24,15 +27,23 @@ class Mail(Resource):
         if is_spam(message, honeypot):
             return {"error": "Spam detected"}, 400
 
-        # Send email (service function)
+        # Same (or nearly the same) message again, e.g. from rotating IPs
+        message_fingerprint = fingerprint(message)
+        if find_repeat(message_fingerprint):
+            return {"error": "Duplicate message"}, 409
+
+        # Queue for mail_worker.py; SMTP happens outside the request. The
+        # fingerprint commits with the outbox row, so a failed enqueue can be retried
         try:
-            send_contact_email(email, message)
+            remember(message_fingerprint)
+            enqueue_contact_email(email, message)
         except Exception as e:
+            db.session.rollback()
             print("Email error:", e)
             return {"error": "Failed to send email"}, 500
 
         # Issue client_id cookie if missing
-        response = make_response({"success": True, "message": "Email sent"})
+        response = make_response({"success": True, "message": "Email queued"})
 
         if not request.cookies.get("client_id"):
             response.set_cookie(
@@ -1,36 +1,41 @@
-from flask_restful import Resource
-from flask import jsonify
-from sqlalchemy import func, cast
+from flask_restful import Resource, abort
+from flask import jsonify, request
+from sqlalchemy import func, cast, select, Float
+from sqlalchemy.orm import defer
 from geoalchemy2 import Geometry
-from models import db, County, Constituency, Term, Position, Official, Party
+from extensions.replica import replica_reads
+from extensions.limiter import read_budget
+from resources.as_of import as_of_year
+from resources.etag import conditional_json
+from services import choropleth
+from models import db, County, Constituency, Term, Position, Official, Party, MapBreaks
 
+# layer -> (model, Term column for its seats, the seat whose holder colours it)
+MAP_LAYERS = {
+    "counties": (County, Term.county_id, "Governor"),
+    "constituencies": (Constituency, Term.constituency_id, "MP"),
+}
+CATEGORICAL_METRICS = ("party", "gender")
+NUMERIC_METRICS = ("population_density", "population_per_mp")
 
-def geom_to_svg(geom):
-    return db.session.scalar(
-        func.ST_AsSVG(cast(geom, Geometry("MULTIPOLYGON", 4326)), 0, 2)
-    )
 
+def svg_path(model):
+    """``svgPath`` of each row, computed in the query that loads it rather than one query per area."""
+    return func.ST_AsSVG(cast(model.geom, Geometry("MULTIPOLYGON", 4326)), 0, 2).label("svg_path")
 
-def get_leader_by_position(position_name, county_id=None, constituency_id=None):
-    """Fetch leader info by position (e.g., Governor, MP)."""
-    q = (
-        db.session.query(Term, Official, Party, Position)
-        .join(Official, Term.official_id == Official.id)
-        .outerjoin(Party, Term.party_id == Party.id)  # <-- outer join instead of inner
-        .join(Position, Term.position_id == Position.id)
-        .filter(Position.name.ilike(position_name))
-    )
 
-    if county_id:
-        q = q.filter(Term.county_id == county_id)
-    if constituency_id:
-        q = q.filter(Term.constituency_id == constituency_id)
+def areas_with_svg(model, *criteria):
+    """``[(area, svg_path)]``; the geometry itself stays in the database."""
+    query = select(model, svg_path(model)).options(defer(model.geom)).where(*criteria).order_by(model.id)
+    return db.session.execute(query).all()
+
+
+def derived_geometry(area):
+    """Zoom extent and label position, precomputed by the seeder (seeding/geometry.py)."""
+    return {"bbox": area.bbox, "centroid": area.centroid, "labelPoint": area.label_point}
 
-    term = q.first()
-    if not term:
-        return None
 
-    t, official, party, position = term
+def leader_info(term, official, party, position):
     if party and party.abbreviation:
         abbrev = party.abbreviation.split(",")[0].strip()
         abbrv = abbrev.replace("{", "").replace("}", "")
@@ -46,48 +51,105 @@ def get_leader_by_position(position_name, county_id=None, constituency_id=None):
             "name": party.name if party else "Independent",
             "abbreviation": abbrv,
         },
-        "term": f"{t.start_year}-{t.end_year or 'present'}",
+        "term": f"{term.start_year}-{term.end_year or 'present'}",
     }
 
 
+def get_leader_by_position(position_name, county_id=None, constituency_id=None, as_of=None):
+    """
+    Fetch leader info by position (e.g., Governor, MP): the holder in
+    ``as_of`` if given, otherwise the current holder, falling back to the
+    most recent one.
+    """
+    q = (
+        db.session.query(Term, Official, Party, Position)
+        .join(Official, Term.official_id == Official.id)
+        .outerjoin(Party, Term.party_id == Party.id)  # <-- outer join instead of inner
+        .join(Position, Term.position_id == Position.id)
+        .filter(Position.name.ilike(position_name))
+    )
+
+    if county_id:
+        q = q.filter(Term.county_id == county_id)
+    if constituency_id:
+        q = q.filter(Term.constituency_id == constituency_id)
+    if as_of:
+        q = q.filter(Term.held_in(as_of))
+
+    term = q.order_by(Term.end_year.desc().nulls_first(), Term.start_year.desc()).first()
+    if not term:
+        return None
+    return leader_info(*term)
+
+
+def leaders_by_location(location, position_name, *criteria, as_of=None):
+    """
+    ``{location id: leader info}`` for every seat of ``position_name`` in
+    one query (DISTINCT ON the location), picking the same term as
+    get_leader_by_position; ``criteria`` narrow the terms.
+    """
+    query = (
+        select(location.label("area_id"), Term, Official, Party, Position)
+        .join(Official, Term.official_id == Official.id)
+        .outerjoin(Party, Term.party_id == Party.id)
+        .join(Position, Term.position_id == Position.id)
+        .where(func.lower(Position.name) == position_name.lower(), location.is_not(None), *criteria)
+        .distinct(location)
+        .order_by(location, Term.end_year.desc().nulls_first(), Term.start_year.desc())
+    )
+    if as_of:
+        query = query.where(Term.held_in(as_of))
+    return {row.area_id: leader_info(*row[1:]) for row in db.session.execute(query).all()}
+
+
 class CountiesMap(Resource):
+    decorators = [read_budget("maps.counties")]
+    method_decorators = {"get": [replica_reads]}
+
     def get(self):
-        counties = County.query.all()
         data = []
-        for county in counties:
-            svg_path = geom_to_svg(county.geom)
+        for county, svg in areas_with_svg(County):
             data.append(
                 {
                     "id": county.id,
                     "name": county.name,
                     "code": county.code,
-                    "svgPath": svg_path,
+                    "svgPath": svg,
+                    **derived_geometry(county),
                 }
             )
         return jsonify(data)
 
 
 class CountyDetailMap(Resource):
-    def get(self, county_id):
-        county = County.query.get_or_404(county_id)
+    method_decorators = {"get": [replica_reads]}
 
-        # County SVG
-        county_svg = geom_to_svg(county.geom)
+    def get(self, county_id):
+        as_of = as_of_year()
+        found = areas_with_svg(County, County.id == county_id)
+        if not found:
+            abort(404, message=f"No county with id {county_id}")
+        [(county, county_svg)] = found
 
         # Leaders at county level
         leaders = {
-            "governor": get_leader_by_position("Governor", county_id=county.id),
-            "deputy_governor": get_leader_by_position("Deputy Governor", county_id=county.id),
-            "senator": get_leader_by_position("Senator", county_id=county.id),
-            "women_rep": get_leader_by_position("Women Representative", county_id=county.id),
+            "governor": get_leader_by_position("Governor", county_id=county.id, as_of=as_of),
+            "deputy_governor": get_leader_by_position("Deputy Governor", county_id=county.id, as_of=as_of),
+            "senator": get_leader_by_position("Senator", county_id=county.id, as_of=as_of),
+            "women_rep": get_leader_by_position("Women Representative", county_id=county.id, as_of=as_of),
         }
 
-        # Constituencies + MPs
+        # Constituencies + MPs, one query each
+        constituencies = areas_with_svg(Constituency, Constituency.county_id == county.id)
+        county_mps = leaders_by_location(
+            Term.constituency_id, "MP",
+            Term.constituency_id.in_([c.id for c, _ in constituencies]),
+            as_of=as_of,
+        )
         constituencies_data = []
         mps = []
-        for c in county.constituencies:
-            svg_path = geom_to_svg(c.geom)
-            mp = get_leader_by_position("MP", constituency_id=c.id)
+        for c, svg in constituencies:
+            mp = county_mps.get(c.id)
             if mp:
                 mps.append(mp)
             constituencies_data.append(
@@ -95,7 +157,8 @@ class CountyDetailMap(Resource):
                     "id": c.id,
                     "name": c.name,
                     "code": c.code,
-                    "svgPath": svg_path,
+                    "svgPath": svg,
+                    **derived_geometry(c),
                     "mp": mp,
                 }
             )
@@ -106,9 +169,11 @@ class CountyDetailMap(Resource):
                 "name": county.name,
                 "code": county.code,
                 "svgPath": county_svg,
+                **derived_geometry(county),
                 "population": county.population,
                 "population_density": county.population_density,
                 "area": county.area,
+                "geodesic_area": county.geodesic_area,
             },
             "leaders": {**leaders, "mps": mps},
             "constituencies": constituencies_data,
@@ -118,20 +183,153 @@ class CountyDetailMap(Resource):
 
 
 class ConstituenciesMap(Resource):
+    decorators = [read_budget("maps.constituencies")]
+    method_decorators = {"get": [replica_reads]}
+
     def get(self):
-        constituencies = Constituency.query.all()
+        as_of = as_of_year()
+        mps = leaders_by_location(Term.constituency_id, "MP", as_of=as_of)
         data = []
-        for c in constituencies:
-            svg_path = geom_to_svg(c.geom)
-            mp = get_leader_by_position("MP", constituency_id=c.id)
+        for c, svg in areas_with_svg(Constituency):
             data.append(
                 {
                     "id": c.id,
                     "name": c.name,
                     "code": c.code,
                     "county_id": c.county_id,
-                    "svgPath": svg_path,
-                    "mp": mp,
+                    "svgPath": svg,
+                    **derived_geometry(c),
+                    "mp": mps.get(c.id),
                 }
             )
-        return jsonify(data)
\ No newline at end of file
+        return jsonify(data)
+
+
+def seat_holders_query(location, position_name, as_of=None):
+    """
+    The holder of every seat of ``position_name`` in one pass: DISTINCT ON
+    the location, picking the same term as get_leader_by_position.
+    """
+    query = (
+        select(
+            location.label("area_id"),
+            Official.gender,
+            Party.id.label("party_id"),
+            Party.name.label("party_name"),
+            Party.abbreviation.label("party_abbreviation"),
+            Party.colors.label("party_colors"),
+        )
+        .join(Official, Term.official_id == Official.id)
+        .join(Position, Term.position_id == Position.id)
+        .outerjoin(Party, Term.party_id == Party.id)
+        .where(func.lower(Position.name) == position_name.lower(), location.is_not(None))
+        .distinct(location)
+        .order_by(location, Term.end_year.desc().nulls_first(), Term.start_year.desc())
+    )
+    if as_of:
+        query = query.where(Term.held_in(as_of))
+    return query
+
+
+def metric_query(model, metric):
+    if metric == "population_density":
+        return select(model.id, model.population_density)
+    if model is County:
+        # one MP per constituency
+        seats = select(func.count(Constituency.id)).where(Constituency.county_id == County.id).scalar_subquery()
+        return select(County.id, cast(County.population, Float) / func.nullif(seats, 0))
+    return select(Constituency.id, Constituency.population)
+
+
+def metric_values(model, metric):
+    """``{area id: value}`` of a numeric metric, rounded as served."""
+    return {
+        area_id: round(value, 2) if value is not None else None
+        for area_id, value in db.session.execute(metric_query(model, metric)).all()
+    }
+
+
+def categorical_values(rows, metric):
+    values, classes = {}, {}
+    for row in rows:
+        if row.area_id in values:
+            continue
+        if metric == "gender":
+            key, label, color = row.gender, row.gender, choropleth.GENDER_COLORS.get(row.gender)
+            extra = {}
+        elif row.party_id is None:
+            key, label, color = "independent", "Independent", choropleth.INDEPENDENT_COLOR
+            extra = {"abbreviation": "Independent"}
+        else:
+            key, label = str(row.party_id), row.party_name
+            color = choropleth.party_color(row.party_colors, row.party_id)
+            abbrev = row.party_abbreviation.split(",")[0].strip() if row.party_abbreviation else ""
+            extra = {"abbreviation": abbrev.replace("{", "").replace("}", "") or row.party_name}
+        values[row.area_id] = key
+        if key not in classes:
+            classes[key] = {"key": key, "label": label, **extra, "color": color, "count": 0}
+        classes[key]["count"] += 1
+    return values, sorted(classes.values(), key=lambda c: (-c["count"], c["label"]))
+
+
+class MapValues(Resource):
+    method_decorators = {"get": [replica_reads]}
+
+    def get(self, layer):
+        """
+        Per-area values for colouring a layer, without geometry:
+        /maps/constituencies/values?metric=party|gender|population_density|population_per_mp
+        (&method=quantile|jenks&classes=5 for the numeric ones, &as_of=YEAR for party/gender).
+        """
+        if layer not in MAP_LAYERS:
+            abort(404, message=f"Unknown layer {layer!r}; one of {', '.join(MAP_LAYERS)}")
+        model, location, seat = MAP_LAYERS[layer]
+        metric = request.args.get("metric", "party").strip().lower()
+        if metric not in CATEGORICAL_METRICS + NUMERIC_METRICS:
+            abort(400, message=f"metric must be one of {', '.join(CATEGORICAL_METRICS + NUMERIC_METRICS)}")
+
+        if metric in CATEGORICAL_METRICS:
+            as_of = as_of_year()
+            rows = db.session.execute(seat_holders_query(location, seat, as_of)).all()
+            values, classes = categorical_values(rows, metric)
+            return conditional_json({
+                "layer": layer,
+                "metric": metric,
+                "type": "categorical",
+                "seat": seat,
+                "as_of": as_of,
+                "values": values,
+                "classes": classes,
+                "no_data_color": choropleth.NO_DATA_COLOR,
+            })
+
+        method = request.args.get("method", "quantile").strip().lower()
+        if method not in choropleth.METHODS:
+            abort(400, message=f"method must be one of {', '.join(choropleth.METHODS)}")
+        classes = request.args.get("classes", 5, type=int)
+        classes = max(choropleth.MIN_CLASSES, min(classes, choropleth.MAX_CLASSES))
+
+        values = metric_values(model, metric)
+        # computed by the seeder, see seeding/rollups.py
+        breaks = db.session.scalar(
+            select(MapBreaks.breaks).where(
+                MapBreaks.layer == layer,
+                MapBreaks.metric == metric,
+                MapBreaks.method == method,
+                MapBreaks.classes == classes,
+            )
+        )
+        if breaks is None and any(value is not None for value in values.values()):
+            abort(503, message="Map breaks have not been computed; run python -m seeding.rollups")
+        breaks = breaks or []
+        legend = choropleth.numeric_legend(values.values(), breaks)
+        return conditional_json({
+            "layer": layer,
+            "metric": metric,
+            "type": "numeric",
+            "method": method,
+            "values": values,
+            "breaks": breaks,
+            "classes": legend,
+            "no_data_color": choropleth.NO_DATA_COLOR,
+        })
@@ -0,0 +1,184 @@
+import re
+from flask_restful import Resource, abort
+from flask import request, jsonify
+from sqlalchemy import func, select, literal, literal_column, or_, case
+from sqlalchemy.orm import joinedload
+from extensions.replica import replica_reads
+from extensions.limiter import read_budget
+from resources.etag import conditional_json
+from resources.seats import clean_abbreviation
+from models import db, County, Constituency, Ward, Term, Official, Position
+
+LEVELS = ("national", "county", "constituency", "ward")
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+WORD = re.compile(r"\w+")
+
+
+def profile_query(official_id):
+    """
+    The official and their whole career in one SELECT: terms joined to
+    position, party and location. Locations load id and name only, so
+    no boundary geometry comes back.
+    """
+    return (
+        select(Official)
+        .where(Official.id == official_id)
+        .options(
+            joinedload(Official.terms).options(
+                joinedload(Term.position),
+                joinedload(Term.party),
+                joinedload(Term.county).load_only(County.id, County.name),
+                joinedload(Term.constituency).load_only(Constituency.id, Constituency.name),
+                joinedload(Term.ward).load_only(Ward.id, Ward.name),
+            )
+        )
+    )
+
+
+def place(location):
+    return {"id": location.id, "name": location.name} if location else None
+
+
+class OfficialProfile(Resource):
+    method_decorators = {"get": [replica_reads]}
+
+    def get(self, official_id):
+        """One official with every term they have held, oldest first."""
+        official = db.session.execute(profile_query(official_id)).unique().scalar_one_or_none()
+        if official is None:
+            abort(404, message=f"No official with id {official_id}")
+
+        terms = sorted(official.terms, key=lambda term: (term.start_year, term.id))
+        career = []
+        for term in terms:
+            career.append({
+                "term": {
+                    "id": term.id,
+                    "start_year": term.start_year,
+                    "end_year": term.end_year,
+                    "nomination_type": term.nomination_type,
+                    "current": term.end_year is None,
+                },
+                "position": {
+                    "id": term.position.id,
+                    "name": term.position.name,
+                    "level": term.position.level,
+                },
+                "party": {
+                    "id": term.party.id,
+                    "name": term.party.name,
+                    "abbreviation": clean_abbreviation(term.party.abbreviation),
+                } if term.party else None,
+                "county": place(term.county),
+                "constituency": place(term.constituency),
+                "ward": place(term.ward),
+            })
+
+        return conditional_json({
+            "official": {
+                "id": official.id,
+                "name": official.name,
+                "gender": official.gender,
+                "photo_url": official.photo_url,
+            },
+            "terms": career,
+            "current_positions": sorted({t["position"]["name"] for t in career if t["term"]["current"]}),
+            "first_elected": terms[0].start_year if terms else None,
+        })
+
+
+def flag(name):
+    value = request.args.get(name, "").strip().lower()
+    if not value:
+        return None
+    if value not in ("true", "false", "1", "0"):
+        abort(400, message=f"{name} must be true or false")
+    return value in ("true", "1")
+
+
+def search_query(text, position=None, level=None, current=None, limit=SEARCH_LIMIT):
+    """
+    Officials whose name matches ``text``: every word as a prefix of a name
+    word (ix_officials_search_vector), or close enough by trigram word
+    similarity to catch misspellings (ix_officials_name_trgm, the ``<%``
+    operator). Whole-word matches rank first, then by similarity.
+    """
+    needle = text.lower()
+    name = func.lower(Official.name)
+    words = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{word}:*" for word in WORD.findall(needle)))
+    word_match = Official.search_vector.op("@@")(words)
+    similarity = func.word_similarity(needle, name)
+
+    query = (
+        select(Official.id, Official.name, Official.gender, Official.photo_url, similarity.label("score"))
+        .where(or_(word_match, literal(needle).op("<%")(name)))
+        .order_by(case((word_match, 0), else_=1), similarity.desc(), Official.name)
+        .limit(limit)
+    )
+
+    held = select(Term.official_id).join(Position, Term.position_id == Position.id)
+    if position:
+        held = held.where(
+            Position.id == int(position) if position.isdigit()
+            else func.lower(Position.name) == position.replace("-", " ").lower()
+        )
+    if level:
+        held = held.where(Position.level == level)
+    if current is not None:
+        running = Official.id.in_(held.where(Term.end_year.is_(None)))
+        query = query.where(running if current else ~running)
+    if position or level:
+        query = query.where(Official.id.in_(held))
+    return query
+
+
+class OfficialSearch(Resource):
+    decorators = [read_budget("officials.search")]
+    method_decorators = {"get": [replica_reads]}
+
+    def get(self):
+        """
+        /officials/search?q=sifuna, optionally narrowed with position (id or
+        name, e.g. women-representative), level and current=true|false.
+        """
+        text = request.args.get("q", "").strip()
+        if len(text) < 2 or not WORD.search(text):
+            abort(400, message="q must have at least two characters, e.g. ?q=sifuna")
+        level = request.args.get("level", "").strip().lower() or None
+        if level and level not in LEVELS:
+            abort(400, message=f"level must be one of {', '.join(LEVELS)}")
+        limit = request.args.get("limit", SEARCH_LIMIT, type=int)
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+        rows = db.session.execute(search_query(
+            text[:100],
+            position=request.args.get("position", "").strip() or None,
+            level=level,
+            current=flag("current"),
+            limit=limit,
+        )).all()
+
+        # what each match holds now, for the result list; one indexed lookup
+        # (ix_terms_official) for the page rather than per official
+        holding = {}
+        if rows:
+            current_terms = db.session.execute(
+                select(Term.official_id, Position.name)
+                .join(Position, Term.position_id == Position.id)
+                .where(Term.official_id.in_([row.id for row in rows]), Term.end_year.is_(None))
+            ).all()
+            for official_id, position_name in current_terms:
+                holding.setdefault(official_id, []).append(position_name)
+
+        return jsonify({
+            "query": text,
+            "results": [{
+                "id": row.id,
+                "name": row.name,
+                "gender": row.gender,
+                "photo_url": row.photo_url,
+                "current_positions": sorted(holding.get(row.id, [])),
+                "score": round(row.score, 3),
+            } for row in rows],
+        })
@@ -1,19 +1,26 @@
 from flask_restful import Resource
 from flask import jsonify
+from extensions.replica import replica_reads
+from resources.as_of import as_of_year
 from models import db, Term, Position, Official, Party
 
 
 class PresidentsResource(Resource):
+    method_decorators = {"get": [replica_reads]}
+
     def get(self):
-        # Query all national-level leaders
-        terms = (
+        as_of = as_of_year()
+        # Query all national-level leaders (only those serving in as_of, if given)
+        query = (
             db.session.query(Term)
             .join(Official)
             .join(Position)
             .outerjoin(Party)
             .filter(Position.level == "national")
-            .all()
         )
+        if as_of:
+            query = query.filter(Term.held_in(as_of))
+        terms = query.all()
 
         current_leaders = []
         all_leaders = []
@@ -38,8 +45,8 @@ class PresidentsResource(Resource):
             # Add to all_leaders
             all_leaders.append(leader_data)
 
-            # Add to current_leaders if still serving
-            if term.end_year is None:
+            # Add to current_leaders if still serving (or serving in as_of)
+            if as_of or term.end_year is None:
                 current_leaders.append(
                     {
                         "name": term.official.name,
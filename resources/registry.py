@@ -0,0 +1,61 @@
+"""
+Resource groups and their routes.
+
+Each group is mounted as its own blueprint, and a group's resource modules
+are only imported when the group is registered, so an app created with a
+subset of groups (tests, benchmarks, single-purpose workers) never pays for
+the rest.
+"""
+from importlib import import_module
+from flask import Blueprint
+from flask_restful import Api
+
+RESOURCE_GROUPS = {
+    "location": [
+        ("resources.location_search:LocationLookup", "/location_search"),
+    ],
+    "mail": [
+        ("resources.mail:Mail", "/send_mail"),
+    ],
+    "presidents": [
+        ("resources.presidents:PresidentsResource", "/presidents"),
+    ],
+    "officials": [
+        ("resources.leaders:CountyOfficialsResource", "/officials/counties/<int:county_id>"),
+        ("resources.leaders:CountyMPsResource", "/officials/mps/<int:county_id>"),
+        ("resources.leaders:AllCountyOfficials", "/officials/counties"),
+        ("resources.leaders:AllMPs", "/officials/mps"),
+        ("resources.officials:OfficialProfile", "/officials/<int:official_id>"),
+        ("resources.officials:OfficialSearch", "/officials/search"),
+    ],
+    "maps": [
+        ("resources.maps:CountiesMap", "/maps/counties"),
+        ("resources.maps:CountyDetailMap", "/maps/counties/<int:county_id>"),
+        ("resources.maps:ConstituenciesMap", "/maps/constituencies"),
+        ("resources.maps:MapValues", "/maps/<string:layer>/values"),
+    ],
+    "stats": [
+        ("resources.stats:SeatShareResource", "/stats/seat-share"),
+        ("resources.stats:SeatShareYears", "/stats/seat-share/years"),
+    ],
+    "seats": [
+        ("resources.seats:SeatHistory", "/seats/<string:position>/<int:location_id>/history"),
+    ],
+}
+
+
+def load_resource(target):
+    module_name, _, attr = target.partition(":")
+    return getattr(import_module(module_name), attr)
+
+
+def register_resource_groups(app, groups=None):
+    """Register ``groups`` (default: all) as blueprints on ``app``."""
+    for group in groups or RESOURCE_GROUPS:
+        if group not in RESOURCE_GROUPS:
+            raise KeyError(f"Unknown resource group {group!r}")
+        blueprint = Blueprint(group, __name__)
+        api = Api(blueprint)
+        for target, url in RESOURCE_GROUPS[group]:
+            api.add_resource(load_resource(target), url)
+        app.register_blueprint(blueprint)
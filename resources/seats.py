@@ -0,0 +1,150 @@
+from datetime import date
+from flask_restful import Resource, abort
+from flask import jsonify
+from sqlalchemy import func, select
+from extensions.replica import replica_reads
+from models import db, County, Constituency, Ward, Term, Position, Official, Party
+
+# position level -> (Term column holding the seat's location, location model)
+SEAT_LOCATIONS = {
+    "county": (Term.county_id, County),
+    "constituency": (Term.constituency_id, Constituency),
+    "ward": (Term.ward_id, Ward),
+}
+
+
+def find_position(position):
+    """A position by id or by name, case-insensitive, with "-" for spaces (e.g. women-representative)."""
+    if position.isdigit():
+        return db.session.get(Position, int(position))
+    name = position.replace("-", " ").lower()
+    return db.session.execute(
+        select(Position).where(func.lower(Position.name) == name)
+    ).scalar_one_or_none()
+
+
+def clean_abbreviation(party_abbreviation):
+    if not party_abbreviation:
+        return "Independent"
+    return party_abbreviation.split(",")[0].strip().replace("{", "").replace("}", "")
+
+
+def history_query(position, location_id):
+    """
+    One statement for the whole timeline of a seat. The window functions
+    compare each term with the one before it and keep a running total of
+    each holder's years in the seat. The ix_terms_*_seat_history indexes
+    find the seat's terms by start year; the windows still sort them (by
+    holder for the running total, by id within a start year), but only the
+    few rows of one seat.
+    """
+    this_year = date.today().year
+    tenure_years = func.coalesce(Term.end_year, this_year) - Term.start_year
+    timeline = (Term.start_year, Term.id)
+    previous_official = func.lag(Term.official_id).over(order_by=timeline)
+    previous_party = func.lag(Term.party_id).over(order_by=timeline)
+    years_so_far = func.sum(tenure_years).over(partition_by=Term.official_id, order_by=timeline)
+
+    query = (
+        select(
+            Term.id,
+            Term.start_year,
+            Term.end_year,
+            tenure_years.label("tenure_years"),
+            Official.id.label("official_id"),
+            Official.name.label("official_name"),
+            Official.gender,
+            Official.photo_url,
+            Term.party_id,
+            Party.name.label("party_name"),
+            Party.abbreviation.label("party_abbreviation"),
+            func.row_number().over(order_by=timeline).label("ordinal"),
+            previous_official.label("previous_official_id"),
+            previous_party.label("previous_party_id"),
+            years_so_far.label("years_in_seat"),
+        )
+        .join(Official, Term.official_id == Official.id)
+        .outerjoin(Party, Term.party_id == Party.id)
+        .where(Term.position_id == position.id, Term.nomination_type.is_(None))
+        .order_by(*timeline)
+    )
+    if position.level in SEAT_LOCATIONS:
+        column, _ = SEAT_LOCATIONS[position.level]
+        query = query.where(column == location_id)
+    return query
+
+
+class SeatHistory(Resource):
+    method_decorators = {"get": [replica_reads]}
+
+    def get(self, position, location_id):
+        """
+        Who has held one seat, in order: /seats/mp/<constituency_id>/history,
+        /seats/governor/<county_id>/history, /seats/president/0/history.
+        """
+        seat_position = find_position(position)
+        if seat_position is None:
+            abort(404, message=f"Unknown position {position!r}")
+
+        location = None
+        if seat_position.level in SEAT_LOCATIONS:
+            _, model = SEAT_LOCATIONS[seat_position.level]
+            # id and name only; the boundary geometry is not needed here
+            location = db.session.execute(
+                select(model.id, model.name).where(model.id == location_id)
+            ).first()
+            if location is None:
+                abort(404, message=f"No {seat_position.level} with id {location_id}")
+
+        rows = db.session.execute(history_query(seat_position, location_id)).all()
+
+        terms = []
+        for row in rows:
+            first = row.ordinal == 1
+            same_holder = not first and row.previous_official_id == row.official_id
+            party_changed = not first and row.previous_party_id != row.party_id
+            terms.append({
+                "term_id": row.id,
+                "start_year": row.start_year,
+                "end_year": row.end_year,
+                "tenure_years": row.tenure_years,
+                "official": {
+                    "id": row.official_id,
+                    "name": row.official_name,
+                    "gender": row.gender,
+                    "photo_url": row.photo_url,
+                },
+                "party": {
+                    "name": row.party_name or "Independent",
+                    "abbreviation": clean_abbreviation(row.party_abbreviation),
+                },
+                # years this holder had spent in the seat by the end of this term
+                "years_in_seat": row.years_in_seat,
+                "re_elected": same_holder,
+                # the seat went to a different party than the previous term
+                "party_changed": party_changed,
+                # the same holder came back under a different party
+                "party_switch": same_holder and party_changed,
+            })
+
+        return jsonify({
+            "seat": {
+                "position": {
+                    "id": seat_position.id,
+                    "name": seat_position.name,
+                    "level": seat_position.level,
+                },
+                "location": {
+                    "type": seat_position.level,
+                    "id": location.id,
+                    "name": location.name,
+                } if location is not None else None,
+            },
+            "terms": terms,
+            "summary": {
+                "terms": len(terms),
+                "holders": len({t["official"]["id"] for t in terms}),
+                "party_changes": sum(t["party_changed"] for t in terms),
+                "party_switches": sum(t["party_switch"] for t in terms),
+            },
+        })
@@ -0,0 +1,154 @@
+from flask_restful import Resource, abort
+from flask import request
+from sqlalchemy import func, select
+from extensions.replica import replica_reads
+from resources.etag import conditional_json
+from resources.seats import find_position, clean_abbreviation
+from models import db, County, Position, Party, SeatShare
+
+
+def year_arg(name):
+    value = request.args.get(name, "").strip()
+    if not value:
+        return None
+    if not value.isdigit() or not 1900 <= int(value) <= 2100:
+        abort(400, message=f"{name} must be a year between 1900 and 2100, e.g. ?{name}=2017")
+    return int(value)
+
+
+def seat_share_query(position_id, year, compare=None, county_id=None, by_county=False):
+    """
+    Seats per party (and county) in ``year`` and, when given, ``compare``,
+    side by side: one pass over seat_share with a filtered sum per year.
+    """
+    elected = func.coalesce(func.sum(SeatShare.seats).filter(SeatShare.election_year == year), 0)
+    nominated = func.coalesce(func.sum(SeatShare.nominated).filter(SeatShare.election_year == year), 0)
+    columns = [
+        Party.id.label("party_id"),
+        Party.name.label("party_name"),
+        Party.abbreviation.label("party_abbreviation"),
+        Party.colors.label("party_colors"),
+        elected.label("seats"),
+        nominated.label("nominated"),
+    ]
+    group_by = [Party.id, Party.name, Party.abbreviation, Party.colors]
+    if compare is not None:
+        columns.append(func.coalesce(
+            func.sum(SeatShare.seats).filter(SeatShare.election_year == compare), 0
+        ).label("compare_seats"))
+    if by_county:
+        columns += [County.id.label("county_id"), County.name.label("county_name")]
+        group_by += [County.id, County.name]
+
+    query = (
+        select(*columns)
+        .select_from(SeatShare)
+        .outerjoin(Party, SeatShare.party_id == Party.id)
+        .where(
+            SeatShare.position_id == position_id,
+            SeatShare.election_year.in_([y for y in (year, compare) if y is not None]),
+        )
+        .group_by(*group_by)
+    )
+    if by_county:
+        query = query.outerjoin(County, SeatShare.county_id == County.id).order_by(County.name)
+    query = query.order_by(elected.desc(), Party.name)
+    if county_id is not None:
+        query = query.where(SeatShare.county_id == county_id)
+    return query
+
+
+def party_entry(row):
+    return {
+        "id": row.party_id,
+        "name": row.party_name or "Independent",
+        "abbreviation": clean_abbreviation(row.party_abbreviation),
+        "colors": row.party_colors,
+    }
+
+
+def ratio(part, total):
+    return round(part / total, 4) if total else 0.0
+
+
+class SeatShareResource(Resource):
+    method_decorators = {"get": [replica_reads]}
+
+    def get(self):
+        """
+        /stats/seat-share?position=mp&year=2022[&compare=2017][&county=<id>][&by=county]
+        """
+        position = request.args.get("position", "").strip()
+        if not position:
+            abort(400, message="position is required, e.g. ?position=mp")
+        seat_position = find_position(position)
+        if seat_position is None:
+            abort(404, message=f"Unknown position {position!r}")
+        by_county = request.args.get("by", "").strip().lower() == "county"
+        county_id = request.args.get("county", type=int)
+        compare = year_arg("compare")
+        year = year_arg("year")
+        if year is None:
+            year = db.session.execute(
+                select(func.max(SeatShare.election_year)).where(SeatShare.position_id == seat_position.id)
+            ).scalar()
+            if year is None:
+                abort(404, message=f"No seat share recorded for {seat_position.name}")
+
+        rows = db.session.execute(
+            seat_share_query(seat_position.id, year, compare, county_id, by_county)
+        ).all()
+        # parties with seats only in the comparison year still come back, with 0 now.
+        # Shares are within the county when broken down by county
+        totals, compare_totals = {}, {}
+        for row in rows:
+            group = row.county_id if by_county else None
+            totals[group] = totals.get(group, 0) + row.seats
+            if compare is not None:
+                compare_totals[group] = compare_totals.get(group, 0) + row.compare_seats
+
+        parties = []
+        for row in rows:
+            group = row.county_id if by_county else None
+            entry = {
+                "party": party_entry(row),
+                "seats": row.seats,
+                "nominated": row.nominated,
+                "share": ratio(row.seats, totals[group]),
+            }
+            if by_county:
+                entry["county"] = {"id": row.county_id, "name": row.county_name} if row.county_id else None
+            if compare is not None:
+                entry["compare"] = {
+                    "seats": row.compare_seats,
+                    "share": ratio(row.compare_seats, compare_totals[group]),
+                    "change": row.seats - row.compare_seats,
+                }
+            parties.append(entry)
+
+        payload = {
+            "position": {"id": seat_position.id, "name": seat_position.name, "level": seat_position.level},
+            "year": year,
+            "total_seats": sum(totals.values()),
+            "parties": parties,
+        }
+        if compare is not None:
+            payload["compare"] = {"year": compare, "total_seats": sum(compare_totals.values())}
+        return conditional_json(payload)
+
+
+class SeatShareYears(Resource):
+    method_decorators = {"get": [replica_reads]}
+
+    def get(self):
+        """Election years with seat share, per position."""
+        rows = db.session.execute(
+            select(Position.name, SeatShare.election_year)
+            .join(Position, SeatShare.position_id == Position.id)
+            .distinct()
+            .order_by(Position.name, SeatShare.election_year)
+        ).all()
+        years = {}
+        for name, year in rows:
+            years.setdefault(name, []).append(year)
+        return conditional_json(years)
@@ -0,0 +1,61 @@
+'''
+Derived geometry attributes, computed in the database after every seed.
+
+For counties, constituencies and wards this stores the bounding box
+(``ST_Envelope``), the centroid, a label point guaranteed to fall inside the
+polygon (``ST_PointOnSurface``; a centroid can land in the sea or in a
+neighbour) and the geodesic area in km² (``ST_Area`` on geography, rather than
+square degrees). The map endpoints then hand out zoom extents and label
+positions as plain columns instead of clients parsing SVG paths, and
+``python audit.py --checks area_discrepancies`` compares the computed area
+with the ``area`` loaded from the CSVs.
+
+One UPDATE per table; invalid polygons go through ``ST_MakeValid`` first, and
+rows without a geometry get NULLs.
+
+Run on its own, after editing boundaries by hand: python -m seeding.geometry
+'''
+
+from sqlalchemy import text
+
+GEOMETRY_TABLES = ('counties', 'constituencies', 'wards')
+
+DERIVED_ATTRIBUTES = '''
+    UPDATE {table} AS t
+    SET bbox = CASE WHEN d.geom IS NOT NULL THEN ARRAY[
+            ST_XMin(d.envelope), ST_YMin(d.envelope), ST_XMax(d.envelope), ST_YMax(d.envelope)
+        ] END,
+        centroid = CASE WHEN d.geom IS NOT NULL THEN ARRAY[ST_X(d.centroid), ST_Y(d.centroid)] END,
+        label_point = CASE WHEN d.geom IS NOT NULL THEN ARRAY[ST_X(d.label_point), ST_Y(d.label_point)] END,
+        geodesic_area = ST_Area(d.geom::geography) / 1e6
+    FROM (
+        SELECT id, geom, ST_Envelope(geom) AS envelope, ST_Centroid(geom) AS centroid,
+               ST_PointOnSurface(geom) AS label_point
+        FROM (
+            SELECT id, CASE WHEN ST_IsValid(geom) THEN geom ELSE ST_MakeValid(geom) END AS geom
+            FROM {table}
+        ) valid
+    ) d
+    WHERE d.id = t.id
+'''
+
+
+def refresh_geometry_attributes():
+    """Recompute the derived columns in the current transaction; return rows updated per table."""
+    from models import db
+
+    return {
+        table: db.session.execute(text(DERIVED_ATTRIBUTES.format(table=table))).rowcount
+        for table in GEOMETRY_TABLES
+    }
+
+
+if __name__ == '__main__':
+    from seed import create_seed_app
+    from models import db
+
+    app = create_seed_app()
+    with app.app_context():
+        counts = refresh_geometry_attributes()
+        db.session.commit()
+    print(f"Refreshed geometry attributes: {counts}")
@@ -0,0 +1,82 @@
+'''
+Loads the declarative source manifest (seeding/sources.toml).
+
+The manifest replaces the old build_seed.py code generation: adding an
+election year means adding [sources.*] tables, not editing Python.
+'''
+
+import tomllib
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MANIFEST = Path(__file__).resolve().parent / 'sources.toml'
+
+REFERENCE_KINDS = ('counties', 'constituency_stats', 'parties')
+GEOMETRY_KINDS = ('county_geometry', 'constituency_geometry', 'ward_geometry')
+SOURCE_KINDS = REFERENCE_KINDS + GEOMETRY_KINDS + ('officials',)
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def _normalize_source(name, spec):
+    spec = dict(spec)
+    kind = spec.get('kind')
+    if kind not in SOURCE_KINDS:
+        raise ManifestError(f"source {name!r} has unknown kind {kind!r}")
+    if not spec.get('path'):
+        raise ManifestError(f"source {name!r} has no path")
+
+    spec['name'] = name
+    spec['path'] = str(BASE_DIR / spec['path'])
+    # a single header may be given as a string; parsers always get a list
+    spec['columns'] = {
+        key: [value] if isinstance(value, str) else list(value)
+        for key, value in spec.get('columns', {}).items()
+    }
+    spec.setdefault('geometry_keys', {})
+    spec.setdefault('default', True)
+    spec.setdefault('optional', False)
+    return spec
+
+
+def load_manifest(path=DEFAULT_MANIFEST):
+    """Return ``{'positions': [...], 'sources': {name: spec}}`` in file order."""
+    with open(path, 'rb') as fh:
+        raw = tomllib.load(fh)
+
+    positions = raw.get('positions', [])
+    for pos in positions:
+        if not pos.get('name') or not pos.get('level'):
+            raise ManifestError(f"position entries need a name and level: {pos!r}")
+
+    sources = {
+        name: _normalize_source(name, spec)
+        for name, spec in raw.get('sources', {}).items()
+    }
+    return {'positions': positions, 'sources': sources}
+
+
+def select_sources(manifest, names=None):
+    """
+    Pick the sources to load.
+
+    With no ``names`` every source not marked ``default = false`` is used.
+    Reference data and boundaries are always included: officials resolve
+    against them, and the writer reloads every table.
+    """
+    sources = manifest['sources']
+    if names:
+        unknown = sorted(set(names) - set(sources))
+        if unknown:
+            raise ManifestError(f"unknown sources: {', '.join(unknown)}")
+        wanted = set(names)
+    else:
+        wanted = {name for name, spec in sources.items() if spec['default']}
+
+    return {
+        name: spec
+        for name, spec in sources.items()
+        if name in wanted or spec['kind'] in REFERENCE_KINDS + GEOMETRY_KINDS
+    }
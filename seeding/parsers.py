@@ -0,0 +1,251 @@
+'''
+Source parsers for the seeder.
+
+Every parser is a pure function of a manifest source spec (see
+seeding/sources.toml) and a CSV path or a slice of GeoJSON features, and
+returns a list of plain dicts. Nothing here touches the database, so the
+parsers can run in worker processes and their results pickled back to
+the parent for the write phase.
+'''
+
+import ast
+import csv
+import json
+from pathlib import Path
+
+# try shapely for geo handling
+try:
+    from shapely.geometry import shape, Polygon, MultiPolygon
+    SHAPELY_AVAILABLE = True
+except Exception:
+    SHAPELY_AVAILABLE = False
+
+PLACEHOLDER_PHOTO = 'https://placehold.co/600x800?text=Portrait'
+
+# utility helpers
+
+def parse_party_abbr(raw):
+    if raw is None:
+        return []
+    raw = raw.strip()
+    if not raw:
+        return []
+
+    # Case 1: already looks like a Python list string, e.g. "['UDA', 'WDM']"
+    try:
+        parsed = ast.literal_eval(raw)
+        if isinstance(parsed, (list, tuple)):
+            return list(parsed)
+    except Exception:
+        pass
+
+    # Case 2: comma/semicolon separated abbreviations
+    if ',' in raw or ';' in raw:
+        return [p.strip() for p in raw.replace(';', ',').split(',') if p.strip()]
+
+    # Case 3: single abbreviation
+    return [raw]
+
+
+def safe_int(val):
+    try:
+        if val is None or val == '':
+            return None
+        return int(float(val))
+    except Exception:
+        return val
+
+
+def safe_float(val):
+    try:
+        if val is None or val == '':
+            return None
+        return float(val)
+    except Exception:
+        return None
+
+
+def format_const_code(code):
+    return str(code).zfill(3)
+
+
+def format_ward_code(code):
+    return str(code).zfill(4)
+
+
+def load_geojson(path):
+    if not Path(path).exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def geometry_to_wkt(geometry):
+    """Return ``(wkt, is_valid)`` for a GeoJSON geometry, forced to MultiPolygon."""
+    if not SHAPELY_AVAILABLE or not geometry:
+        return None, None
+    geom_shape = shape(geometry)
+    if isinstance(geom_shape, Polygon):
+        geom_shape = MultiPolygon([geom_shape])
+    return geom_shape.wkt, geom_shape.is_valid
+
+
+def pick(row, spec, key):
+    """Value of the first non-empty header mapped to ``key``, stripped."""
+    for column in spec['columns'].get(key, ()):
+        value = row.get(column)
+        if value is not None and str(value).strip():
+            return str(value).strip()
+    return ''
+
+
+def read_rows(spec):
+    with open(spec['path'], newline='', encoding=spec.get('encoding', 'utf-8')) as fh:
+        for row in csv.DictReader(fh):
+            if spec.get('lowercase_headers'):
+                row = {k.strip().lower(): v for k, v in row.items()}
+            yield row
+
+
+# --- GeoJSON feature chunks ---
+
+def parse_geometry_features(spec, features):
+    """Boundary records keyed by the manifest's ``geometry_keys``."""
+    keys = spec['geometry_keys']
+    kind = spec['kind']
+    records = []
+    for feat in features:
+        props = feat.get('properties') or {}
+        record = {}
+        if kind == 'ward_geometry':
+            wcode = safe_int(props.get(keys['code']))
+            if not wcode:
+                continue
+            record['code'] = format_ward_code(wcode)
+        else:
+            name = (props.get(keys['name']) or '').strip()
+            if not name:
+                continue
+            record['name'] = name
+        if kind == 'constituency_geometry':
+            code = props.get(keys['code'])
+            county_code = props.get(keys['county_code'])
+            record['code'] = format_const_code(code) if code else None
+            record['county_code'] = format_const_code(county_code) if county_code else None
+            record['county_name'] = (props.get(keys['county_name']) or '').strip()
+        record['geom'], record['geom_valid'] = geometry_to_wkt(feat.get('geometry'))
+        records.append(record)
+    return records
+
+
+# --- CSV sources ---
+
+def parse_counties(spec):
+    records = []
+    for row in read_rows(spec):
+        name = pick(row, spec, 'name')
+        if not name:
+            continue
+        records.append({
+            'name': name,
+            'code': pick(row, spec, 'code') or None,
+            'population': safe_int(pick(row, spec, 'population')),
+            'area': safe_float(pick(row, spec, 'area')),
+            'population_density': safe_int(pick(row, spec, 'population_density')),
+        })
+    return records
+
+
+def parse_constituency_stats(spec):
+    skip = {n.upper() for n in spec.get('skip_names', [])}
+    records = []
+    for row in read_rows(spec):
+        name = pick(row, spec, 'name')
+        if not name or name.upper() in skip:
+            continue
+        records.append({
+            'name': name,
+            'population': safe_int(pick(row, spec, 'population')),
+            'area': safe_float(pick(row, spec, 'area')),
+            'population_density': safe_float(pick(row, spec, 'population_density')),
+        })
+    return records
+
+
+def parse_parties(spec):
+    records = []
+    for row in read_rows(spec):
+        name = pick(row, spec, 'name')
+        if not name:
+            continue
+        records.append({'name': name, 'abbreviation': parse_party_abbr(pick(row, spec, 'abbreviation'))})
+    return records
+
+
+def parse_officials(spec):
+    """
+    One record per official + term.
+
+    ``position`` and ``election_year`` come from the manifest unless the
+    file has its own columns for them (presidents.csv does). Rows whose name
+    is blank, dashes, or starts with a ``skip_prefixes`` entry are dropped.
+    """
+    required = spec.get('require', ['name'])
+    skip_prefixes = tuple(p.upper() for p in spec.get('skip_prefixes', []))
+    no_location = {v.upper() for v in spec.get('no_location_values', [])}
+    term_requires_any = spec.get('term_requires_any')
+
+    records = []
+    for row in read_rows(spec):
+        values = {key: pick(row, spec, key) for key in spec['columns']}
+        values.setdefault('position', '')
+        values['position'] = values['position'] or spec.get('position', '')
+
+        name = values.get('name', '')
+        if not name.strip('- ') or name.upper().startswith(skip_prefixes):
+            continue
+        if spec.get('title_case_names'):
+            name = name.title()
+        if any(not values.get(key) for key in required):
+            continue
+
+        county = values.get('county') or None
+        if county and county.upper() in no_location:
+            county = None
+
+        position = values['position']
+        if term_requires_any and not any(values.get(key) for key in term_requires_any):
+            position = None
+
+        record = {
+            'source': spec['name'],
+            'name': name,
+            'position': position,
+            'gender': (values.get('gender') or spec.get('default_gender') or 'other').lower(),
+            'photo_url': values.get('photo_url') or PLACEHOLDER_PHOTO,
+            'party': values.get('party') or None,
+            'party_name': values.get('party_name') or None,
+            'party_from': spec.get('party_from'),
+            'county': county,
+            'constituency': values.get('constituency') or None,
+            'start_year': safe_int(values.get('start_year')) or spec.get('election_year'),
+            'end_year': safe_int(values.get('end_year')),
+            'nomination_type': values.get('nomination_type') or None,
+        }
+        if values.get('ward_code'):
+            record.update({
+                'county_code': format_const_code(safe_int(values.get('county_code'))),
+                'constituency_code': format_const_code(safe_int(values.get('constituency_code'))),
+                'ward_code': format_ward_code(safe_int(values['ward_code'])),
+                'ward_name': values.get('ward_name', ''),
+            })
+        records.append(record)
+    return records
+
+
+CSV_PARSERS = {
+    'counties': parse_counties,
+    'constituency_stats': parse_constituency_stats,
+    'parties': parse_parties,
+    'officials': parse_officials,
+}
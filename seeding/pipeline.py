@@ -0,0 +1,79 @@
+'''
+Parse phase of the seeder.
+
+Sources come from the manifest (seeding/sources.toml) and are parsed in a
+process pool; GeoJSON files are split into chunks of features so that the
+shapely work for large files spreads across cores. Workers return plain
+picklable records which are merged back in manifest order for the write
+phase (see seeding/writer.py).
+'''
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from seeding import parsers
+from seeding.manifest import GEOMETRY_KINDS, ManifestError
+
+# features per worker task; small enough to balance, large enough to amortise pickling
+GEOMETRY_CHUNK_SIZE = 64
+
+
+def plan_jobs(sources, chunk_size=GEOMETRY_CHUNK_SIZE):
+    """
+    Yield ``(source, chunk_index, parser, args)`` for every unit of parse work.
+
+    A missing file is an error unless its source is marked ``optional``.
+    """
+    for name, spec in sources.items():
+        if not Path(spec['path']).exists():
+            if not spec['optional']:
+                raise ManifestError(f"source {name!r}: {spec['path']} does not exist")
+            # stderr, so the --dry-run JSON report on stdout stays parseable
+            print(f"Warning: {spec['path']} does not exist, skipping optional source {name!r}.", file=sys.stderr)
+            continue
+        if spec['kind'] in GEOMETRY_KINDS:
+            features = parsers.load_geojson(spec['path']).get('features', [])
+            for index, start in enumerate(range(0, len(features), chunk_size)):
+                yield name, index, parsers.parse_geometry_features, (spec, features[start:start + chunk_size])
+        else:
+            yield name, 0, parsers.CSV_PARSERS[spec['kind']], (spec,)
+
+
+def parse_sources(sources, workers=None, chunk_size=GEOMETRY_CHUNK_SIZE):
+    """
+    Parse every source into ``{source_name: [record, ...]}``.
+
+    ``workers=1`` parses inline, which is handy under a debugger; otherwise
+    the work runs in a process pool sized to ``workers`` (default: all cores).
+    """
+    jobs = list(plan_jobs(sources, chunk_size))
+    chunks = {}
+
+    if workers == 1 or len(jobs) <= 1:
+        for name, index, func, args in jobs:
+            chunks[(name, index)] = func(*args)
+    else:
+        max_workers = min(workers or os.cpu_count() or 1, len(jobs))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(func, *args): (name, index)
+                for name, index, func, args in jobs
+            }
+            for future in as_completed(futures):
+                chunks[futures[future]] = future.result()
+
+    order = list(sources)
+    records = {name: [] for name in sources}
+    for name, index in sorted(chunks, key=lambda k: (order.index(k[0]), k[1])):
+        records[name].extend(chunks[(name, index)])
+    return records
+
+
+def records_by_kind(sources, records):
+    """Concatenate parsed records per source kind, keeping manifest order."""
+    grouped = {}
+    for name, spec in sources.items():
+        grouped.setdefault(spec['kind'], []).extend(records.get(name, []))
+    return grouped
@@ -0,0 +1,99 @@
+'''
+Rollups rebuilt after every seed.
+
+``seat_share`` holds, for each election year, the seats every party held
+per position and county, so /stats/seat-share reads a few hundred
+pre-aggregated rows instead of walking every term. Election years come from
+the terms themselves: a start year counts as one when it opens at least half
+as many elected terms of some position as that position's busiest year, which
+keeps by-elections out. The snapshot for a year is the terms running in it
+(``Term.held_in``), so a term ending in 2022 belongs to 2017, not 2022. A
+term that starts and ends in one year counts for that year unless another
+elected holder of the seat does too (their successor started the same year).
+
+``map_breaks`` holds the class edges of every numeric map metric, per layer,
+method and class count, so /maps/<layer>/values does not run Fisher-Jenks
+(quadratic in the number of areas) on every request.
+
+Run on its own, after editing terms by hand: python -m seeding.rollups
+'''
+
+from sqlalchemy import text
+
+SEAT_SHARE = text("""
+    INSERT INTO seat_share (election_year, position_id, party_id, county_id, seats, nominated)
+    WITH starts AS (
+        SELECT position_id, start_year, count(*) AS n
+        FROM terms
+        WHERE nomination_type IS NULL
+        GROUP BY position_id, start_year
+    ),
+    cycles AS (
+        SELECT DISTINCT start_year AS election_year
+        FROM starts s
+        WHERE s.n * 2 >= (SELECT max(b.n) FROM starts b WHERE b.position_id = s.position_id)
+    )
+    SELECT y.election_year, t.position_id, t.party_id,
+           coalesce(t.county_id, c.county_id, wc.county_id),
+           count(*) FILTER (WHERE t.nomination_type IS NULL),
+           count(*) FILTER (WHERE t.nomination_type IS NOT NULL)
+    FROM cycles y
+    JOIN terms t ON t.tenure @> y.election_year
+     AND NOT (t.start_year = t.end_year AND t.nomination_type IS NULL AND EXISTS (
+        SELECT 1 FROM terms o
+        WHERE o.id <> t.id
+          AND o.nomination_type IS NULL
+          AND o.position_id = t.position_id
+          AND coalesce(o.county_id, 0) = coalesce(t.county_id, 0)
+          AND coalesce(o.constituency_id, 0) = coalesce(t.constituency_id, 0)
+          AND coalesce(o.ward_id, 0) = coalesce(t.ward_id, 0)
+          AND int4range(o.start_year, o.end_year) @> y.election_year
+     ))
+    LEFT JOIN constituencies c ON c.id = t.constituency_id
+    LEFT JOIN wards w ON w.id = t.ward_id
+    LEFT JOIN constituencies wc ON wc.id = w.constituency_id
+    GROUP BY 1, 2, 3, 4
+""")
+
+
+def refresh_seat_share():
+    """Rebuild seat_share from terms in the current transaction; return the row count."""
+    from models import db
+
+    db.session.execute(text('DELETE FROM seat_share'))
+    return db.session.execute(SEAT_SHARE).rowcount
+
+
+def refresh_map_breaks():
+    """Rebuild map_breaks from the current area data; return the row count."""
+    from models import db, MapBreaks
+    from resources.maps import MAP_LAYERS, NUMERIC_METRICS, metric_values
+    from services import choropleth
+
+    db.session.execute(text('DELETE FROM map_breaks'))
+    rows = []
+    for layer, (model, _, _) in MAP_LAYERS.items():
+        for metric in NUMERIC_METRICS:
+            values = metric_values(model, metric).values()
+            for method in choropleth.METHODS:
+                for classes, breaks in choropleth.class_breaks(values, method).items():
+                    rows.append({'layer': layer, 'metric': metric, 'method': method,
+                                 'classes': classes, 'breaks': breaks})
+    if rows:
+        db.session.execute(MapBreaks.__table__.insert(), rows)
+    return len(rows)
+
+
+def refresh_rollups():
+    return {'seat_share': refresh_seat_share(), 'map_breaks': refresh_map_breaks()}
+
+
+if __name__ == '__main__':
+    from seed import create_seed_app
+    from models import db
+
+    app = create_seed_app()
+    with app.app_context():
+        counts = refresh_rollups()
+        db.session.commit()
+    print(f"Refreshed rollups: {counts}")
@@ -0,0 +1,319 @@
+'''
+In-memory staging model for the seeder.
+
+Staging takes the parsed records grouped by source kind and resolves every
+foreign key (county, constituency, ward, party, position) with plain dicts.
+Rows get the ids they will have after TRUNCATE ... RESTART IDENTITY, so the
+writer can insert them as-is and a dry run never needs a database.
+
+Anything that cannot be resolved is recorded in ``Staging.issues`` rather
+than printed, so it can be reported as JSON (see seed.py --dry-run).
+'''
+
+INDEPENDENT = ('independent', 'ind', '-', '')
+
+ISSUE_KINDS = (
+    'unknown_counties',
+    'unknown_constituencies',
+    'unknown_positions',
+    'unmatched_parties',
+    'unresolved_party_from',
+    'duplicate_officials',
+    'duplicate_terms',
+    'overlapping_terms',
+    'duplicate_ward_codes',
+    'invalid_geometries',
+    'missing_geometries',
+    'officials_without_term',
+)
+
+# insert order; every table only references tables before it
+TABLES = ('positions', 'counties', 'constituencies', 'wards', 'parties', 'officials', 'terms')
+
+
+class Staging:
+    def __init__(self):
+        self.tables = {table: [] for table in TABLES}
+        self.issues = {kind: [] for kind in ISSUE_KINDS}
+
+    def add(self, table, row):
+        """Append ``row`` to ``table`` and return the id it will be inserted with."""
+        rows = self.tables[table]
+        row['id'] = len(rows) + 1
+        rows.append(row)
+        return row['id']
+
+    def issue(self, kind, **details):
+        self.issues[kind].append(details)
+
+    def report(self):
+        return {
+            'counts': {table: len(rows) for table, rows in self.tables.items()},
+            'issues': self.issues,
+            'issue_counts': {kind: len(items) for kind, items in self.issues.items()},
+        }
+
+
+def _check_geometry(staging, source, key, record):
+    if record is None:
+        staging.issue('missing_geometries', source=source, key=key)
+    elif record['geom_valid'] is False:
+        staging.issue('invalid_geometries', source=source, key=key)
+
+
+def stage_records(records, positions):
+    """Resolve ``records`` (grouped by kind) into a populated :class:`Staging`."""
+    staging = Staging()
+
+    # --- Positions ---
+    position_id = {
+        p['name'].lower(): staging.add('positions', {'name': p['name'], 'level': p['level']})
+        for p in positions
+    }
+
+    # --- Counties ---
+    county_geo = {r['name'].upper(): r for r in records.get('county_geometry', [])}
+    county_by_name = {}
+    county_by_code = {}
+    for r in records.get('counties', []):
+        key = r['name'].upper()
+        geo = county_geo.get(key)
+        if county_geo:
+            _check_geometry(staging, 'county_geometry', r['name'], geo)
+        cid = staging.add('counties', {**r, 'geom': geo['geom'] if geo else None})
+        county_by_name[key] = cid
+        county_by_code[str(r['code'])] = cid
+
+    # --- Constituencies ---
+    # geojson is authoritative; later features with the same name win
+    constituency_extra = {r['name'].upper(): r for r in records.get('constituency_stats', [])}
+    constituency_features = {r['name'].upper(): r for r in records.get('constituency_geometry', [])}
+    constituency_by_name = {}
+    constituency_by_code = {}
+    for key, r in constituency_features.items():
+        county_id = county_by_code.get(r['county_code']) or county_by_name.get(r['county_name'].upper())
+        if not county_id:
+            staging.issue('unknown_counties', source='constituency_geometry',
+                          constituency=r['name'], county=r['county_name'] or r['county_code'])
+            continue
+        if r['geom_valid'] is False:
+            staging.issue('invalid_geometries', source='constituency_geometry', key=r['name'])
+        extra = constituency_extra.get(key) or {}
+        cid = staging.add('constituencies', {
+            'name': r['name'],
+            'county_id': county_id,
+            'code': r['code'],
+            'population': extra.get('population'),
+            'area': extra.get('area'),
+            'population_density': extra.get('population_density'),
+            'geom': r['geom'],
+        })
+        constituency_by_name[key] = (cid, county_id)
+        constituency_by_code[str(r['code'])] = (cid, county_id)
+
+    # --- Wards ---
+    # keyed on zero-padded CAW codes from the MCA source, joined with ward boundaries
+    leaders = records.get('officials', [])
+    ward_geo = {r['code']: r for r in records.get('ward_geometry', [])}
+    ward_by_code = {}
+    for r in leaders:
+        wcode = r.get('ward_code')
+        if not wcode:
+            continue
+        if r['constituency_code'] not in constituency_by_code:
+            staging.issue('unknown_constituencies', source=r['source'], official=r['name'],
+                          constituency=r['constituency_code'], ward=r['ward_name'])
+            continue
+        constituency_id, county_id = constituency_by_code[r['constituency_code']]
+        if county_by_code.get(r['county_code']) != county_id:
+            staging.issue('unknown_constituencies', source=r['source'], official=r['name'],
+                          constituency=r['constituency_code'], county=r['county_code'],
+                          reason='constituency is in another county')
+        if wcode in ward_by_code:
+            if ward_by_code[wcode][1] != constituency_id:
+                staging.issue('duplicate_ward_codes', source=r['source'], code=wcode,
+                              ward=r['ward_name'], constituency=r['constituency_code'])
+            continue
+        geo = ward_geo.get(wcode)
+        if ward_geo:
+            _check_geometry(staging, 'ward_geometry', wcode, geo)
+        wid = staging.add('wards', {
+            'name': r['ward_name'],
+            'constituency_id': constituency_id,
+            'code': wcode,
+            'geom': geo['geom'] if geo else None,
+        })
+        ward_by_code[wcode] = (wid, constituency_id)
+
+    # --- Parties ---
+    party_by_name = {}
+    party_by_abbrev = {}
+    for r in records.get('parties', []):
+        pid = staging.add('parties', {'name': r['name'], 'abbreviation': r['abbreviation']})
+        party_by_name[r['name'].upper()] = pid
+        for ab in r['abbreviation']:
+            party_by_abbrev[ab.upper()] = pid
+
+    party_cache = {}
+
+    def match_party(abbr, name):
+        party_id = party_by_abbrev.get(abbr)
+        if not party_id and abbr:
+            # attempt fuzzy match: check if abbreviation appears in any stored list
+            for known, pid in party_by_abbrev.items():
+                if abbr in known:
+                    party_id = pid
+                    break
+        return party_id or party_by_name.get(name)
+
+    def resolve_party(r):
+        key = ((r['party'] or '').strip().upper(), (r.get('party_name') or '').strip().upper())
+        if key not in party_cache:
+            party_cache[key] = match_party(*key)
+        if not party_cache[key] and key[0].lower() not in INDEPENDENT:
+            staging.issue('unmatched_parties', source=r['source'], official=r['name'], party=r['party'])
+        return party_cache[key]
+
+    # --- Officials ---
+    # deduplicated by case-insensitive name; the first occurrence wins
+    official_by_name = {}
+    appearances = {}
+    for r in leaders:
+        key = r['name'].strip().upper()
+        appearances.setdefault(key, []).append({
+            'source': r['source'],
+            'position': r['position'],
+            'start_year': r['start_year'],
+        })
+        if key not in official_by_name:
+            official_by_name[key] = staging.add('officials', {
+                'name': r['name'].strip(),
+                'gender': r['gender'],
+                'photo_url': r['photo_url'],
+            })
+    for key, seen in appearances.items():
+        # several terms or seats are normal (Kibaki, Kenyatta, Ruto); the same
+        # term listed twice is a data error
+        terms = {(a['source'], a['position'], a['start_year']) for a in seen}
+        if len(terms) < len(seen):
+            staging.issue('duplicate_officials', name=key, appearances=seen)
+
+    # --- Terms ---
+    # records that copy another seat's party (Deputy Governors) go last, so
+    # every source for that seat has been resolved regardless of manifest order
+    seat_party = {}
+    party_sources = {r['party_from'] for r in leaders if r.get('party_from')}
+    seen_ward_terms = set()
+    # one holder listed twice for the same seat and end year (e.g. once for the
+    # general election and again after a by-election) is one term; the later
+    # start wins, so the rows cannot overlap under ex_terms_seat_overlap
+    term_by_seat = {}
+    elected_by_seat = {}
+    for r in sorted(leaders, key=lambda r: bool(r.get('party_from'))):
+        if not r['position']:
+            staging.issue('officials_without_term', source=r['source'], official=r['name'])
+            continue
+        official_id = official_by_name[r['name'].strip().upper()]
+        pid = position_id.get(r['position'].lower())
+        if not pid:
+            staging.issue('unknown_positions', source=r['source'], official=r['name'], position=r['position'])
+            continue
+
+        county_id = None
+        constituency_id = None
+        ward_id = None
+        if r.get('ward_code'):
+            if r['constituency_code'] not in constituency_by_code:
+                continue
+            if (official_id, r['ward_code']) in seen_ward_terms:
+                continue
+            seen_ward_terms.add((official_id, r['ward_code']))
+            constituency_id, county_id = constituency_by_code[r['constituency_code']]
+            ward_id, ward_constituency_id = ward_by_code.get(r['ward_code'], (None, None))
+            # a reused ward code belongs to another constituency; leave ward_id empty
+            if ward_constituency_id != constituency_id:
+                ward_id = None
+        elif r['county']:
+            county_id = county_by_name.get(r['county'].strip().upper())
+            if not county_id:
+                staging.issue('unknown_counties', source=r['source'], official=r['name'], county=r['county'])
+            elif r['constituency']:
+                # Look up constituency but also validate county match
+                cid, cons_county_id = constituency_by_name.get(r['constituency'].strip().upper(), (None, None))
+                if cid and cons_county_id == county_id:
+                    constituency_id = cid
+                else:
+                    staging.issue('unknown_constituencies', source=r['source'], official=r['name'],
+                                  constituency=r['constituency'], county=r['county'])
+
+        if r.get('party_from'):
+            latest = seat_party.get((r['party_from'], county_id))
+            if not latest:
+                staging.issue('unresolved_party_from', source=r['source'], official=r['name'],
+                              party_from=r['party_from'], county=r['county'])
+                continue
+            party_id = latest[1]
+        else:
+            party_id = resolve_party(r)
+
+        start_year = r['start_year'] or 2022
+        if county_id and not constituency_id and r['position'] in party_sources:
+            latest = seat_party.get((r['position'], county_id))
+            if latest is None or start_year >= latest[0]:
+                seat_party[(r['position'], county_id)] = (start_year, party_id)
+
+        term = {
+            'official_id': official_id,
+            'position_id': pid,
+            'party_id': party_id,
+            'start_year': start_year,
+            'end_year': r['end_year'],
+            'county_id': county_id,
+            'constituency_id': constituency_id,
+            'ward_id': ward_id,
+            'nomination_type': r['nomination_type'],
+        }
+        key = (official_id, pid, county_id, constituency_id, ward_id, r['end_year'])
+        existing = term_by_seat.get(key)
+        if existing is None:
+            staging.add('terms', term)
+            term_by_seat[key] = term
+            if term['nomination_type'] is None:
+                elected_by_seat.setdefault(key[1:5], []).append((term, r))
+            continue
+        staging.issue('duplicate_terms', source=r['source'], official=r['name'], position=r['position'],
+                      start_years=sorted({existing['start_year'], start_year}))
+        if start_year >= existing['start_year']:
+            existing.update(term)
+
+    for terms in elected_by_seat.values():
+        _resolve_overlaps(staging, terms)
+
+    return staging
+
+
+def _resolve_overlaps(staging, terms):
+    '''
+    End each elected term of one seat no later than the next one starts.
+
+    ``terms`` are (term, record) pairs. Sources sometimes list a holder who
+    left mid-term with the full term (both Nyamira governors of 2017 run
+    2017-2022); the earlier term is cut at its successor's start year, which
+    is what ex_terms_seat_overlap needs, and each cut is reported as
+    ``overlapping_terms`` so the source can be corrected. Terms starting in
+    the same year keep their listing order.
+    '''
+    def end(term):
+        return float('inf') if term['end_year'] is None else term['end_year']
+
+    # zero-length terms (start_year == end_year) never overlap under the constraint
+    running = [(t, r) for t, r in terms if end(t) > t['start_year']]
+    running.sort(key=lambda pair: (pair[0]['start_year'], end(pair[0])))
+    for (term, r), (successor, successor_r) in zip(running, running[1:]):
+        if end(term) <= successor['start_year']:
+            continue
+        staging.issue('overlapping_terms', source=r['source'], official=r['name'], position=r['position'],
+                      years=[term['start_year'], term['end_year']],
+                      successor=successor_r['name'], successor_source=successor_r['source'],
+                      successor_years=[successor['start_year'], successor['end_year']])
+        term['end_year'] = successor['start_year']
@@ -0,0 +1,73 @@
+'''
+Write phase of the seeder.
+
+Inserts the rows of a resolved :class:`seeding.staging.Staging` with bulk
+INSERTs, computes the derived geometry attributes (seeding/geometry.py) and
+rebuilds the rollups (seeding/rollups.py), all inside a single transaction:
+if any stage fails, the existing data is left intact. Staged rows already
+carry their ids, so the identity sequences are moved past them once the rows
+are in.
+'''
+
+from sqlalchemy import text, insert
+from colorama import Fore
+
+from models import db, County, Constituency, Ward, Party, Official, Position, Term
+from seeding.geometry import refresh_geometry_attributes
+from seeding.rollups import refresh_rollups
+
+try:
+    from geoalchemy2.elements import WKTElement
+except Exception:
+    WKTElement = None
+
+MODELS = {
+    'positions': Position,
+    'counties': County,
+    'constituencies': Constituency,
+    'wards': Ward,
+    'parties': Party,
+    'officials': Official,
+    'terms': Term,
+}
+
+GEOMETRY_TABLES = ('counties', 'constituencies', 'wards')
+
+
+def to_geom(wkt):
+    if not wkt or WKTElement is None:
+        return None
+    return WKTElement(wkt, srid=4326)
+
+
+def truncate_tables():
+    print('Truncating tables: terms -> officials -> parties -> wards -> constituencies -> counties -> positions')
+    conn = db.session.connection()
+    # Use raw SQL TRUNCATE for speed and to reset identity
+    for table in ('terms', 'officials', 'parties', 'wards', 'constituencies', 'counties', 'positions'):
+        conn.execute(text(f'TRUNCATE TABLE {table} RESTART IDENTITY CASCADE'))
+
+
+def write_records(staging):
+    """Truncate and reload every table from ``staging`` in one transaction."""
+    try:
+        truncate_tables()
+        for table, model in MODELS.items():
+            rows = staging.tables[table]
+            if table in GEOMETRY_TABLES:
+                rows = [{**row, 'geom': to_geom(row['geom'])} for row in rows]
+            if rows:
+                db.session.execute(insert(model), rows)
+                db.session.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), :last)"
+                ), {'last': len(rows)})
+            print(f"{Fore.GREEN}Successfully inserted {len(rows)} {table}!")
+        for table, count in refresh_geometry_attributes().items():
+            print(f"{Fore.GREEN}Computed geometry attributes for {count} {table}")
+        for rollup, count in refresh_rollups().items():
+            print(f"{Fore.GREEN}Rebuilt {rollup} ({count} rows)")
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    print(f"{Fore.GREEN}Seeding complete.")
@@ -0,0 +1,165 @@
+"""
+Class breaks and colours for choropleth layers (see /maps/<layer>/values).
+
+Numeric metrics are split into classes by quantile (equal counts) or
+Fisher-Jenks natural breaks (least squared deviation within classes) and
+coloured with the ColorBrewer YlOrRd ramp; categorical ones (party, gender)
+get one colour per category. ``breaks`` are class edges, lowest first:
+class ``i`` covers ``(breaks[i], breaks[i + 1]]`` and the first class also
+takes ``breaks[0]``.
+
+Breaks only change when the data does, so the seeder computes them for
+every method and class count (the ``map_breaks`` rollup, see
+seeding/rollups.py) and requests only count values into classes.
+"""
+from bisect import bisect_left
+from math import ceil
+
+MIN_CLASSES = 2
+MAX_CLASSES = 9
+METHODS = ("quantile", "jenks")
+
+NO_DATA_COLOR = "#d9d9d9"
+INDEPENDENT_COLOR = "#9e9e9e"
+
+# ColorBrewer YlOrRd, by number of classes
+SEQUENTIAL = {
+    3: ["#ffeda0", "#feb24c", "#f03b20"],
+    4: ["#ffffb2", "#fecc5c", "#fd8d3c", "#e31a1c"],
+    5: ["#ffffb2", "#fecc5c", "#fd8d3c", "#f03b20", "#bd0026"],
+    6: ["#ffffb2", "#fed976", "#feb24c", "#fd8d3c", "#f03b20", "#bd0026"],
+    7: ["#ffffb2", "#fed976", "#feb24c", "#fd8d3c", "#fc4e2a", "#e31a1c", "#b10026"],
+    8: ["#ffffcc", "#ffeda0", "#fed976", "#feb24c", "#fd8d3c", "#fc4e2a", "#e31a1c", "#b10026"],
+    9: ["#ffffcc", "#ffeda0", "#fed976", "#feb24c", "#fd8d3c", "#fc4e2a", "#e31a1c", "#bd0026", "#800026"],
+}
+
+# ColorBrewer Paired; parties without colours of their own cycle through it
+CATEGORICAL = [
+    "#1f78b4", "#33a02c", "#e31a1c", "#ff7f00", "#6a3d9a", "#b15928",
+    "#a6cee3", "#b2df8a", "#fb9a99", "#fdbf6f", "#cab2d6", "#ffff99",
+]
+
+GENDER_COLORS = {"male": "#1f78b4", "female": "#e31a1c", "other": "#6a3d9a"}
+
+
+def sequential_colors(count):
+    if count >= 3:
+        return SEQUENTIAL[count]
+    return [SEQUENTIAL[3][0], SEQUENTIAL[3][-1]][-count:]
+
+
+def quantile_breaks(values, classes):
+    """Edges putting about the same number of ``values`` (sorted) in each class."""
+    n = len(values)
+    edges = [values[0]]
+    for q in range(1, classes):
+        edge = values[max(0, ceil(q * n / classes) - 1)]
+        if edge > edges[-1]:
+            edges.append(edge)
+    if values[-1] > edges[-1] or len(edges) == 1:
+        edges.append(values[-1])
+    return edges
+
+
+def _jenks_starts(values, classes):
+    """
+    ``starts[c][j]``: where the last class begins in the least-deviation
+    split of ``values[:j]`` into ``c`` classes, for every ``c`` up to
+    ``classes``. For a fixed ``c`` that start never moves left as ``j``
+    grows, so each row is filled by divide and conquer: O(n log n) per
+    class count rather than the O(n^2) of the plain dynamic programme.
+    """
+    n = len(values)
+    sums, squares = [0.0], [0.0]
+    for value in values:
+        sums.append(sums[-1] + value)
+        squares.append(squares[-1] + value * value)
+
+    inf = float("inf")
+    previous = [0.0] + [inf] * n  # least deviation of values[:j] in c - 1 classes
+    starts = [None]
+    for c in range(1, classes + 1):
+        current, start = [inf] * (n + 1), [0] * (n + 1)
+        # (first j, last j, lowest start, highest start) still to fill
+        pending = [(c, n, c - 1, n - 1)]
+        while pending:
+            low, high, first, last = pending.pop()
+            if low > high:
+                continue
+            j = (low + high) // 2
+            sum_j, square_j = sums[j], squares[j]
+            lowest, lowest_at = inf, first
+            for i in range(first, min(last, j - 1) + 1):
+                total = sum_j - sums[i]
+                cost = previous[i] + square_j - squares[i] - total * total / (j - i)
+                if cost < lowest:
+                    lowest, lowest_at = cost, i
+            current[j], start[j] = lowest, lowest_at
+            pending.append((low, j - 1, first, lowest_at))
+            pending.append((j + 1, high, lowest_at, last))
+        starts.append(start)
+        previous = current
+    return starts
+
+
+def jenks_breaks(values, classes):
+    """Fisher-Jenks edges for ``values`` (sorted) in ``classes`` classes."""
+    return jenks_all_breaks(values, classes)[classes]
+
+
+def jenks_all_breaks(values, max_classes):
+    """``{classes: edges}`` for 1..``max_classes`` classes, from one pass over ``values`` (sorted)."""
+    distinct = len(set(values))
+    starts = _jenks_starts(values, min(max_classes, distinct))
+    result = {}
+    for classes in range(1, max_classes + 1):
+        used = min(classes, distinct)
+        if used < 2:
+            result[classes] = [values[0], values[-1]]
+            continue
+        upper = []
+        j = len(values)
+        for c in range(used, 0, -1):
+            upper.append(values[j - 1])
+            j = starts[c][j]
+        result[classes] = [values[0]] + upper[::-1]
+    return result
+
+
+def class_breaks(values, method, min_classes=MIN_CLASSES, max_classes=MAX_CLASSES):
+    """``{classes: edges}`` for every class count, for the non-null ``values``; empty without data."""
+    data = sorted(v for v in values if v is not None)
+    if not data:
+        return {}
+    if method == "jenks":
+        edges = jenks_all_breaks(data, max_classes)
+        return {classes: edges[classes] for classes in range(min_classes, max_classes + 1)}
+    return {classes: quantile_breaks(data, classes) for classes in range(min_classes, max_classes + 1)}
+
+
+def class_of(value, breaks):
+    return min(max(0, bisect_left(breaks, value) - 1), len(breaks) - 2)
+
+
+def numeric_legend(values, breaks):
+    """``[{"min", "max", "color", "count"}, ...]`` for the non-null ``values`` classed by ``breaks``."""
+    if len(breaks) < 2:
+        return []
+    colors = sequential_colors(len(breaks) - 1)
+    counts = [0] * (len(breaks) - 1)
+    for value in values:
+        if value is not None:
+            counts[class_of(value, breaks)] += 1
+    return [
+        {"min": breaks[i], "max": breaks[i + 1], "color": colors[i], "count": counts[i]}
+        for i in range(len(breaks) - 1)
+    ]
+
+
+def party_color(colors, index):
+    """First colour listed in ``Party.colors`` (e.g. "{#ff6600,#000000}"), or a palette one."""
+    if colors:
+        first = colors.replace("{", "").replace("}", "").split(",")[0].strip()
+        if first:
+            return first
+    return CATEGORICAL[index % len(CATEGORICAL)]
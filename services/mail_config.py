@@ -1,16 +1,26 @@
 from flask_mail import Message
 from flask_mail import Mail
+from extensions.metrics import timed
+from extensions.tracing import span
 
 mail = Mail()
 
-def send_contact_email(user_email, message_content):
-    msg = Message(
-        subject="New Form Submission",
+CONTACT_RECIPIENT = "serikalimap@proton.me"
+CONTACT_SUBJECT = "New Form Submission"
+
+def contact_message(user_email, message_content, recipients=None, subject=CONTACT_SUBJECT):
+    return Message(
+        subject=subject,
         sender=user_email,
-        recipients=["serikalimap@proton.me"],
+        recipients=recipients or [CONTACT_RECIPIENT],
         body=message_content
     )
-    mail.send(msg)
+
+def send_contact_email(user_email, message_content):
+    """Send straight away; the contact form queues through services/mail_outbox.py instead."""
+    msg = contact_message(user_email, message_content)
+    with span("smtp.send", **{"messaging.destination": msg.recipients[0]}), timed("smtp"):
+        mail.send(msg)
 
 def is_spam(message, honeypot):
     if honeypot:
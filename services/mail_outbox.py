@@ -0,0 +1,168 @@
+"""
+Persistent outbox for contact-form mail.
+
+``enqueue_contact_email`` writes a row to ``mail_outbox`` and returns, so the
+request never waits on SMTP. ``mail_worker.py`` runs :func:`run_worker`,
+which claims due rows in batches (``FOR UPDATE SKIP LOCKED`` on Postgres, so
+several workers can share the table), sends them over one SMTP connection
+that stays open across batches, and records the outcome. Failed sends are
+retried with exponential backoff up to ``MAIL_OUTBOX_MAX_ATTEMPTS``.
+"""
+import logging
+import smtplib
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from extensions.mail import mail
+from extensions.metrics import timed
+from extensions.tracing import span
+from models import db, MailOutbox
+from services.mail_config import contact_message, CONTACT_RECIPIENT, CONTACT_SUBJECT
+
+logger = logging.getLogger(__name__)
+
+# retry n waits BACKOFF_BASE * 2 ** (n - 1), capped at BACKOFF_MAX
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+# a "sending" row whose worker died becomes claimable again after this
+LEASE = timedelta(minutes=5)
+
+
+def enqueue_contact_email(user_email, message_content):
+    row = MailOutbox(
+        sender=user_email,
+        recipients=CONTACT_RECIPIENT,
+        subject=CONTACT_SUBJECT,
+        body=message_content,
+    )
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def claim_batch(limit, now=None):
+    """Mark up to ``limit`` due rows as sending and return them."""
+    now = now or datetime.utcnow()
+    query = (
+        db.session.query(MailOutbox)
+        .filter(
+            MailOutbox.status.in_(("pending", "sending")),
+            MailOutbox.next_attempt_at <= now,
+        )
+        .order_by(MailOutbox.next_attempt_at, MailOutbox.id)
+        .limit(limit)
+    )
+    if db.engine.dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+    rows = query.all()
+    for row in rows:
+        row.status = "sending"
+        row.next_attempt_at = now + LEASE
+    db.session.commit()
+    return rows
+
+
+class SmtpSession:
+    """One Flask-Mail connection kept open between batches, reopened on demand."""
+
+    def __init__(self):
+        self.connection = None
+        self.last_used = 0.0
+
+    def send(self, message):
+        for retry in (False, True):
+            if self.connection is None:
+                with timed("smtp"):
+                    self.connection = mail.connect().__enter__()
+            try:
+                with timed("smtp"):
+                    self.connection.send(message)
+                break
+            except smtplib.SMTPServerDisconnected:
+                # idle connection dropped by the server; one fresh attempt
+                self.connection = None
+                if retry:
+                    raise
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.__exit__(None, None, None)
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.connection = None
+
+    def idle_for(self):
+        return time.monotonic() - self.last_used
+
+
+def deliver_batch(session, limit):
+    """Send one batch; return ``{"sent": n, "retried": n, "failed": n}``."""
+    max_attempts = current_app.config["MAIL_OUTBOX_MAX_ATTEMPTS"]
+    counts = {"sent": 0, "retried": 0, "failed": 0}
+    for row in claim_batch(limit):
+        message = contact_message(row.sender, row.body, recipients=row.recipients.split(","), subject=row.subject)
+        with span("mail_outbox.deliver", outbox_id=row.id, attempt=row.attempts + 1) as current:
+            try:
+                session.send(message)
+            except Exception as e:
+                current.record_exception(e)
+                # a connection in an unknown state is not worth reusing
+                session.close()
+                row.attempts += 1
+                row.last_error = f"{type(e).__name__}: {e}"[:500]
+                if row.attempts >= max_attempts:
+                    row.status = "failed"
+                    counts["failed"] += 1
+                    logger.error("Giving up on outbox message %s after %s attempts: %s",
+                                 row.id, row.attempts, row.last_error)
+                else:
+                    row.status = "pending"
+                    row.next_attempt_at = datetime.utcnow() + backoff(row.attempts)
+                    counts["retried"] += 1
+                    logger.warning("Outbox message %s failed (attempt %s), retrying at %s: %s",
+                                   row.id, row.attempts, row.next_attempt_at, row.last_error)
+            else:
+                row.attempts += 1
+                row.status = "sent"
+                row.sent_at = datetime.utcnow()
+                row.last_error = None
+                counts["sent"] += 1
+        # record each outcome straight away so a crash can't resend delivered mail
+        db.session.commit()
+    return counts
+
+
+def run_worker(app, once=False):
+    """Deliver until interrupted (or, with ``once``, until no message is due)."""
+    batch_size = app.config["MAIL_OUTBOX_BATCH_SIZE"]
+    poll = app.config["MAIL_OUTBOX_POLL_SECONDS"]
+    idle_timeout = app.config["MAIL_SMTP_IDLE_SECONDS"]
+    session = SmtpSession()
+    totals = {"sent": 0, "retried": 0, "failed": 0}
+    try:
+        with app.app_context():
+            while True:
+                counts = deliver_batch(session, batch_size)
+                for key, value in counts.items():
+                    totals[key] += value
+                if any(counts.values()):
+                    logger.info("Outbox batch: %s", counts)
+                    continue
+                if once:
+                    return totals
+                # keep the connection for the next burst, but not past the
+                # point where the server would drop it anyway
+                if session.connection is not None and session.idle_for() > idle_timeout:
+                    session.close()
+                db.session.remove()
+                time.sleep(poll)
+    finally:
+        session.close()
@@ -1,13 +1,15 @@
 import os
-import requests
 from sqlalchemy import func, or_
 from models import db, Constituency, Term, Position, Official
 from sqlalchemy.orm import joinedload    
+from extensions.metrics import timed
+from extensions.tracing import span
 
 class MapboxGeocodingService:
     def __init__(self):
         self.api_key = os.getenv("MAPBOX_ACCESS_TOKEN")
-        self.base_url = "https://api.mapbox.com/search/geocode/v6/forward"
+        # MAPBOX_GEOCODE_URL points the service at a stub server (tools/loadtest.py)
+        self.base_url = os.getenv("MAPBOX_GEOCODE_URL", "https://api.mapbox.com/search/geocode/v6/forward")
 
     def search_place_and_lookup(self, place: str):
         """Forward geocode with Mapbox, then find constituency in DB."""
@@ -16,27 +18,38 @@ class MapboxGeocodingService:
             return None
 
         lng, lat = coords  # Mapbox returns [lng, lat]
-        constituency = self._get_constituency_by_point(lng, lat)
+        with span("geocoding.constituency_by_point", **{"geo.lng": lng, "geo.lat": lat}) as current:
+            constituency = self._get_constituency_by_point(lng, lat)
+            current.set_attribute("geocoding.found", constituency is not None)
         return constituency
     
     def _forward_geocode(self, place: str):
         """Call Mapbox API to get [lng, lat]."""
-        url = "https://api.mapbox.com/search/geocode/v6/forward"
+        # requests (and certifi) are only needed once a lookup runs; importing
+        # them here keeps them off the app's startup path
+        import requests
+
+        url = self.base_url
         params = {
             "q": place,
             "access_token": self.api_key,
             "limit": 1
         }
 
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()  # raise if not 200
-
-            data = response.json()
-        except Exception as e:
-            print("Mapbox error:", e)
-            print("Raw response:", getattr(response, "text", "No response"))
-            return None
+        with span("mapbox.forward_geocode", **{"http.method": "GET", "http.url": url}) as current:
+            try:
+                with timed("mapbox"):
+                    response = requests.get(url, params=params)
+                current.set_attribute("http.status_code", response.status_code)
+                response.raise_for_status()  # raise if not 200
+
+                data = response.json()
+            except Exception as e:
+                current.record_exception(e)
+                print("Mapbox error:", e)
+                print("Raw response:", getattr(response, "text", "No response"))
+                return None
+            current.set_attribute("mapbox.features", len(data.get("features") or []))
 
         if not data.get("features"):
             return None
@@ -63,8 +76,12 @@ class MapboxGeocodingService:
             "county_name": constituency.county.name,
         }
     
-    def get_current_leaders(self, constituency_id: int):
-        """Fetch current leaders for a constituency and its county, including photo and party."""
+    def get_current_leaders(self, constituency_id: int, as_of: int = None):
+        """Fetch current (or ``as_of`` year) leaders for a constituency and its county, including photo and party."""
+        with span("geocoding.current_leaders", constituency_id=constituency_id):
+            return self._current_leaders(constituency_id, as_of)
+
+    def _current_leaders(self, constituency_id: int, as_of: int = None):
 
         constituency = Constituency.query.get(constituency_id)
         if not constituency:
@@ -82,7 +99,7 @@ class MapboxGeocodingService:
                 joinedload(Term.party),
             )
             .filter(
-                Term.end_year.is_(None),
+                Term.serving(as_of),
                 Term.constituency_id == constituency_id,
                 Position.level == "constituency",
                 or_(
@@ -104,7 +121,7 @@ class MapboxGeocodingService:
                 joinedload(Term.party),
             )
             .filter(
-                Term.end_year.is_(None),
+                Term.serving(as_of),
                 Term.constituency_id.is_(None),  # ensure it's county-level only
                 Term.county_id == county_id,
                 Position.level == "county",
@@ -0,0 +1,130 @@
+"""
+Duplicate and near-duplicate detection for contact-form messages.
+
+Each message is normalised (case, accents, punctuation, whitespace, URLs)
+and fingerprinted twice: a content hash for exact resubmissions and a 64-bit
+SimHash over character 5-grams for lightly edited ones. Fingerprints of
+accepted messages live in the ``message_fingerprints`` table, so every
+worker sees the same ones. They are kept for ``SPAM_FINGERPRINT_WINDOW``
+seconds, and a check only looks at the newest ``SPAM_FINGERPRINT_MAX_ENTRIES``:
+one round trip with an indexed lookup of the hash and a Hamming-distance
+scan (``bit_count``, PostgreSQL 14+) over at most that many SimHashes.
+
+``SPAM_SIMHASH_DISTANCE`` defaults to 3 bits, from the distances measured
+by ``python -m tools.simhash_distances``. Two legitimate reports that differ
+only in a place name ("no water in Kisauni" and "no water in Nyali") are a
+median of 10 bits apart, and 2% of them are within 4. A resubmission with
+a greeting, sign-off or typo is a median of 4 bits from the original.
+Rejecting a real constituent is worse than letting a variant through (the
+rate limit still applies), so the threshold is the largest one that
+rejects at most about 1% of such pairs: 0.5% at 3 bits. Edits that only
+touch case, punctuation or spacing normalise to the same text and are
+caught as exact duplicates.
+
+A fingerprint is recorded with :func:`remember` in the same transaction as
+the outbox row, so a message that fails to queue can be sent again.
+"""
+import hashlib
+import itertools
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import BigInteger, cast, delete, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import BIT
+
+from models import db, MessageFingerprint
+
+# longer messages are fingerprinted on their first MAX_CHARS characters
+MAX_CHARS = 5000
+# expired and surplus fingerprints are deleted after this many writes (per process)
+SWEEP_EVERY = 100
+
+URL = re.compile(r"\b(?:https?://|www\.)\S+")
+NON_WORD = re.compile(r"[^\w\s]+")
+SPACE = re.compile(r"\s+")
+
+_writes = itertools.count(1)
+
+
+def normalize(message):
+    text = unicodedata.normalize("NFKD", message[:MAX_CHARS])
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = URL.sub(" url ", text)
+    text = NON_WORD.sub(" ", text)
+    return SPACE.sub(" ", text).strip()
+
+
+def content_hash(normalized):
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+def simhash(normalized):
+    """64-bit SimHash over the distinct character 5-grams of ``normalized``."""
+    shingles = {normalized[i:i + 5] for i in range(max(1, len(normalized) - 4))}
+    blob = b"".join(hashlib.blake2b(s.encode(), digest_size=8).digest() for s in shingles)
+    # count set bits per position a byte value at a time, which keeps the
+    # Python-level work independent of the message length
+    ones = [0] * 64
+    for position in range(8):
+        for byte, count in Counter(blob[position::8]).items():
+            for bit in range(8):
+                if byte >> bit & 1:
+                    ones[position * 8 + bit] += count
+    half = len(shingles) / 2
+    return sum(1 << bit for bit in range(64) if ones[bit] > half)
+
+
+def signed(value):
+    """A 64-bit SimHash as the signed value a BIGINT column holds (same bits)."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def fingerprint(message):
+    """``(content hash, SimHash)`` of ``message`` after normalisation."""
+    normalized = normalize(message)
+    return content_hash(normalized), signed(simhash(normalized))
+
+
+def find_repeat(fingerprint):
+    """Return "duplicate" or "near-duplicate" if a recent message matches ``fingerprint``, else None."""
+    digest, value = fingerprint
+    config = current_app.config
+    exact = MessageFingerprint.content_hash == digest
+    distance = func.bit_count(cast(MessageFingerprint.simhash.op("#")(literal(value, BigInteger)), BIT(64)))
+    newest = select(func.max(MessageFingerprint.id)).scalar_subquery()
+    since = datetime.utcnow() - timedelta(seconds=config["SPAM_FINGERPRINT_WINDOW"])
+    exact_match = db.session.execute(
+        select(exact)
+        .where(
+            MessageFingerprint.id > newest - config["SPAM_FINGERPRINT_MAX_ENTRIES"],
+            MessageFingerprint.created_at > since,
+            or_(exact, distance <= config["SPAM_SIMHASH_DISTANCE"]),
+        )
+        .order_by(exact.desc())
+        .limit(1)
+    ).scalar()
+    if exact_match is None:
+        return None
+    return "duplicate" if exact_match else "near-duplicate"
+
+
+def remember(fingerprint):
+    """Add ``fingerprint`` to the session; it is stored when the caller commits."""
+    digest, value = fingerprint
+    db.session.add(MessageFingerprint(content_hash=digest, simhash=value))
+    if next(_writes) % SWEEP_EVERY == 0:
+        sweep()
+
+
+def sweep():
+    """Delete fingerprints that are past the window or beyond the newest MAX_ENTRIES."""
+    config = current_app.config
+    since = datetime.utcnow() - timedelta(seconds=config["SPAM_FINGERPRINT_WINDOW"])
+    newest = select(func.max(MessageFingerprint.id)).scalar_subquery()
+    db.session.execute(delete(MessageFingerprint).where(or_(
+        MessageFingerprint.created_at <= since,
+        MessageFingerprint.id <= newest - config["SPAM_FINGERPRINT_MAX_ENTRIES"],
+    )))
@@ -0,0 +1,183 @@
+"""
+pytest fixtures backed by a seeded template database.
+
+Enabled by the top-level conftest.py (``pytest_plugins = ["testing.fixtures"]``);
+point ``TEST_DATABASE_ADMIN_URI`` at a PostGIS server (a role allowed to
+CREATE DATABASE, connected to e.g. ``postgres``).
+
+* The first run builds ``serikali_tpl_<hash>`` by running the bulk seeder
+  against every source in ``data/``. The hash covers models.py, the seed
+  manifest and the data files, so the template is rebuilt only when one of
+  them changes (or with ``--rebuild-template``).
+* Each test session clones it with ``CREATE DATABASE ... TEMPLATE``, which
+  is a file copy and takes well under a second.
+* Each test runs inside an outer transaction that is rolled back, and
+  ``db.session`` joins it through a SAVEPOINT, so code under test can
+  commit freely without leaking into the next test.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# inputs that change what the template contains
+TEMPLATE_INPUTS = ("models.py", "seeding", "data")
+
+TEST_CONFIG = {
+    "TESTING": True,
+    "ENABLE_MIGRATIONS": False,
+    "SQLALCHEMY_BINDS": {},
+    "RATELIMIT_ENABLED": False,
+    "STATEMENT_TIMEOUT_MS": 0,
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption("--rebuild-template", action="store_true",
+                     help="drop and rebuild the seeded template database")
+
+
+def template_hash():
+    digest = hashlib.sha1()
+    for entry in TEMPLATE_INPUTS:
+        path = ROOT / entry
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for f in files:
+            if "__pycache__" in f.parts:
+                continue
+            # contents rather than mtimes, which change on every checkout
+            digest.update(str(f.relative_to(ROOT)).encode())
+            digest.update(f.read_bytes())
+    return digest.hexdigest()[:10]
+
+
+def database_uri(admin_uri, name):
+    return make_url(admin_uri).set(database=name).render_as_string(hide_password=False)
+
+
+def build_template(uri):
+    """Create the schema in ``uri`` and load ``data/`` through the bulk seeder."""
+    from app import create_app
+    from models import db
+    from seeding.manifest import load_manifest, select_sources
+    from seeding.pipeline import parse_sources, records_by_kind
+    from seeding.staging import stage_records
+    from seeding.writer import write_records
+
+    manifest = load_manifest()
+    # every source, including the historical ones marked default = false
+    sources = select_sources(manifest, list(manifest["sources"]))
+    staging = stage_records(records_by_kind(sources, parse_sources(sources)), manifest["positions"])
+
+    app = create_app({**TEST_CONFIG, "SQLALCHEMY_DATABASE_URI": uri})
+    with app.app_context():
+        db.session.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        db.session.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        db.session.commit()
+        db.create_all()
+        write_records(staging)
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        db.session.remove()
+        # CREATE DATABASE ... TEMPLATE needs the template to have no connections
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def test_database_uri(request):
+    admin_uri = os.getenv("TEST_DATABASE_ADMIN_URI")
+    if not admin_uri:
+        pytest.skip("TEST_DATABASE_ADMIN_URI is not set")
+
+    template = f"serikali_tpl_{template_hash()}"
+    worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+    name = f"serikali_test_{worker}_{os.getpid()}"
+
+    admin = create_engine(admin_uri, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        # one builder at a time when several sessions (or xdist workers) start together
+        conn.execute(text("SELECT pg_advisory_lock(hashtext('serikali_tpl'))"))
+        try:
+            exists = conn.execute(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": template}
+            ).scalar()
+            if exists and request.config.getoption("--rebuild-template"):
+                conn.execute(text(f'DROP DATABASE "{template}" WITH (FORCE)'))
+                exists = False
+            if not exists:
+                # build under a temporary name so a failed build never looks finished
+                building = f"{template}_building"
+                conn.execute(text(f'DROP DATABASE IF EXISTS "{building}" WITH (FORCE)'))
+                conn.execute(text(f'CREATE DATABASE "{building}"'))
+                build_template(database_uri(admin_uri, building))
+                conn.execute(text(f'ALTER DATABASE "{building}" RENAME TO "{template}"'))
+            conn.execute(text(f'CREATE DATABASE "{name}" TEMPLATE "{template}"'))
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext('serikali_tpl'))"))
+
+    yield database_uri(admin_uri, name)
+
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    admin.dispose()
+
+
+@pytest.fixture(scope="session")
+def app(test_database_uri):
+    from app import create_app
+
+    app = create_app({**TEST_CONFIG, "SQLALCHEMY_DATABASE_URI": test_database_uri})
+    yield app
+    from models import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def db_session(app):
+    """``db.session`` joined to a per-test transaction that is rolled back afterwards."""
+    from models import db
+    from extensions.replica import RoutingSession
+
+    class BoundSession(RoutingSession):
+        # Flask-SQLAlchemy's get_bind() looks up engines and ignores
+        # Session(bind=...); send everything through the test connection
+        def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+            return bind if bind is not None else self.bind
+
+    with app.app_context():
+        connection = db.engine.connect()
+    transaction = connection.begin()
+    original = db.session
+    db.session = scoped_session(sessionmaker(
+        class_=BoundSession, db=db, bind=connection, join_transaction_mode="create_savepoint",
+    ))
+    try:
+        yield db.session
+    finally:
+        db.session.remove()
+        db.session = original
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def client(app, db_session):
+    return app.test_client()
+
+
+@pytest.fixture
+def query_budget(app):
+    """``with query_budget(3): client.get(...)``; see testing/queries.py."""
+    from testing.queries import assert_max_queries
+
+    return lambda limit: assert_max_queries(limit, app)
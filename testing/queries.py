@@ -0,0 +1,74 @@
+"""
+Query-budget assertions for tests.
+
+    with assert_max_queries(5):
+        client.get("/maps/counties")
+
+    @query_budget(5)
+    def test_counties_map(client):
+        client.get("/maps/counties")
+
+Statements are counted on every engine of ``db`` (primary and replica), so
+the app (or an app context) must exist when the block starts. Savepoints
+(which the ``db_session`` fixture wraps every session transaction in) are
+not queries and don't count.
+"""
+from contextlib import contextmanager
+from functools import wraps
+
+from sqlalchemy import event
+
+SAVEPOINT_STATEMENTS = ("SAVEPOINT ", "RELEASE SAVEPOINT ", "ROLLBACK TO SAVEPOINT ")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(SAVEPOINT_STATEMENTS):
+            self.statements.append(statement)
+
+
+@contextmanager
+def assert_max_queries(limit, app=None):
+    """Fail if the block runs more than ``limit`` SQL statements."""
+    from flask import current_app
+    from models import db
+
+    app = app or current_app._get_current_object()
+    with app.app_context():
+        engines = list(db.engines.values())
+    recorder = QueryRecorder()
+    for engine in engines:
+        event.listen(engine, "after_cursor_execute", recorder)
+    try:
+        yield recorder
+    finally:
+        for engine in engines:
+            event.remove(engine, "after_cursor_execute", recorder)
+    if recorder.count > limit:
+        listing = "\n\n".join(f"{i}. {s}" for i, s in enumerate(recorder.statements, 1))
+        raise QueryBudgetExceeded(f"{recorder.count} queries, budget was {limit}:\n\n{listing}")
+
+
+def query_budget(limit):
+    """Decorator form of :func:`assert_max_queries` for test functions taking an ``app`` fixture."""
+
+    def decorator(test):
+        @wraps(test)
+        def wrapper(*args, **kwargs):
+            with assert_max_queries(limit, kwargs.get("app")):
+                return test(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,141 @@
+"""
+Class breaks and colours for map layers (services/choropleth.py). Pure
+Python; no database needed.
+"""
+import itertools
+import random
+
+import pytest
+
+from services import choropleth
+from services.choropleth import (
+    CATEGORICAL, MAX_CLASSES, MIN_CLASSES, SEQUENTIAL,
+    class_breaks, class_of, jenks_breaks, numeric_legend, party_color, quantile_breaks, sequential_colors,
+)
+
+
+def deviation(values, breaks):
+    """Sum of squared deviations from the class means."""
+    groups = {}
+    for value in values:
+        groups.setdefault(class_of(value, breaks), []).append(value)
+    return sum(sum((v - sum(g) / len(g)) ** 2 for v in g) for g in groups.values())
+
+
+def least_deviation(values, classes):
+    """The best split of ``values`` (sorted) into ``classes`` runs, by trying them all."""
+    best = None
+    for cuts in itertools.combinations(range(1, len(values)), classes - 1):
+        bounds = [0, *cuts, len(values)]
+        total = 0
+        for start, end in zip(bounds, bounds[1:]):
+            run = values[start:end]
+            mean = sum(run) / len(run)
+            total += sum((v - mean) ** 2 for v in run)
+        best = total if best is None else min(best, total)
+    return best
+
+
+# --- quantile ---
+
+def test_quantile_breaks_split_evenly():
+    assert quantile_breaks(list(range(1, 11)), 5) == [1, 2, 4, 6, 8, 10]
+    # the lowest class already takes breaks[0], so it is not repeated
+    assert quantile_breaks([1, 2, 3], 3) == [1, 2, 3]
+
+
+def test_quantile_breaks_skip_repeated_edges():
+    assert quantile_breaks([1, 1, 1, 1, 2], 4) == [1, 2]
+    assert quantile_breaks([7], 5) == [7, 7]
+
+
+# --- jenks ---
+
+def test_jenks_finds_the_natural_groups():
+    values = [1, 2, 3, 10, 11, 12, 30, 31]
+    assert jenks_breaks(values, 3) == [1, 3, 12, 31]
+    assert jenks_breaks(values, 2) == [1, 12, 31]
+
+
+def test_jenks_is_optimal():
+    rng = random.Random(49)
+    for _ in range(200):
+        values = sorted(rng.choice([rng.randint(0, 20), rng.uniform(0, 100)]) for _ in range(rng.randint(2, 10)))
+        for classes in range(2, min(5, len(set(values))) + 1):
+            breaks = jenks_breaks(values, classes)
+            assert len(breaks) == classes + 1
+            assert deviation(values, breaks) == pytest.approx(least_deviation(values, classes), abs=1e-6)
+
+
+def test_jenks_with_fewer_distinct_values_than_classes():
+    assert jenks_breaks([3, 3, 5, 5, 5], 4) == [3, 3, 5]
+    assert jenks_breaks([4, 4, 4], 3) == [4, 4]
+
+
+# --- class_breaks ---
+
+@pytest.mark.parametrize("method", choropleth.METHODS)
+def test_class_breaks_cover_every_class_count(method):
+    values = [None] + [float(v * v) for v in range(50)]
+    breaks = class_breaks(values, method)
+    assert sorted(breaks) == list(range(MIN_CLASSES, MAX_CLASSES + 1))
+    for classes, edges in breaks.items():
+        assert len(edges) == classes + 1
+        assert edges == sorted(edges)
+        assert (edges[0], edges[-1]) == (0.0, 49.0 ** 2)
+
+
+def test_class_breaks_match_jenks_breaks():
+    values = [float(v) for v in random.Random(5).sample(range(1000), 80)]
+    breaks = class_breaks(values, "jenks")
+    for classes in range(MIN_CLASSES, MAX_CLASSES + 1):
+        assert breaks[classes] == jenks_breaks(sorted(values), classes)
+
+
+def test_class_breaks_without_data():
+    assert class_breaks([None, None], "jenks") == {}
+    assert class_breaks([], "quantile") == {}
+
+
+# --- classes and legend ---
+
+def test_class_of_boundaries():
+    breaks = [0, 10, 20, 30]
+    assert [class_of(v, breaks) for v in (-5, 0, 10, 10.01, 20, 30, 99)] == [0, 0, 0, 1, 1, 2, 2]
+
+
+def test_numeric_legend():
+    legend = numeric_legend([1, 2, None, 15, 30, 30], [1, 10, 20, 30])
+    assert [c["count"] for c in legend] == [2, 1, 2]
+    assert [(c["min"], c["max"]) for c in legend] == [(1, 10), (10, 20), (20, 30)]
+    assert [c["color"] for c in legend] == SEQUENTIAL[3]
+    assert numeric_legend([None], []) == []
+
+
+# --- palette ---
+
+@pytest.mark.parametrize("count", range(1, MAX_CLASSES + 1))
+def test_sequential_colors(count):
+    colors = sequential_colors(count)
+    assert len(colors) == count
+    assert all(c.startswith("#") and len(c) == 7 for c in colors)
+
+
+def test_sequential_colors_keep_the_ends_of_the_ramp():
+    assert sequential_colors(2) == [SEQUENTIAL[3][0], SEQUENTIAL[3][-1]]
+    assert sequential_colors(1) == [SEQUENTIAL[3][-1]]
+
+
+@pytest.mark.parametrize("colors, expected", [
+    ("{#ff6600,#000000}", "#ff6600"),
+    ("#008000", "#008000"),
+    (" { #123456 } ", "#123456"),
+])
+def test_party_color_uses_the_first_listed(colors, expected):
+    assert party_color(colors, 0) == expected
+
+
+@pytest.mark.parametrize("colors", [None, "", "{}"])
+def test_party_color_falls_back_to_the_palette(colors):
+    assert party_color(colors, 3) == CATEGORICAL[3]
+    assert party_color(colors, len(CATEGORICAL) + 3) == CATEGORICAL[3]
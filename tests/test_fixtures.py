@@ -0,0 +1,51 @@
+"""
+The template database and per-test rollback from testing/fixtures.py. Each
+test stands on its own; none relies on another having run first.
+"""
+import pytest
+from sqlalchemy import func, select
+
+from models import db, County, Constituency, Official, Term
+
+NAME = "Isolation Check Official"
+
+
+def add_official(db_session):
+    official = Official(name=NAME, gender="other", photo_url="https://example.com/official.webp")
+    db_session.add(official)
+    db_session.commit()
+    return official
+
+
+def test_template_is_seeded(db_session):
+    for model in (County, Constituency, Official, Term):
+        assert db_session.scalar(select(func.count()).select_from(model)) > 0
+
+
+def test_committed_write_is_served_within_the_test(client, db_session):
+    official = add_official(db_session)
+
+    response = client.get(f"/officials/{official.id}")
+    assert response.status_code == 200
+    assert response.get_json()["official"]["name"] == NAME
+
+
+def test_committed_write_is_invisible_to_other_connections(app, db_session):
+    official = add_official(db_session)
+    assert db_session.get(Official, official.id) is not None
+
+    # a pooled connection of its own, outside the test's transaction
+    with app.app_context():
+        other = db.engine.connect()
+    try:
+        assert other.scalar(select(func.count()).where(Official.name == NAME)) == 0
+    finally:
+        other.close()
+
+
+# twice, so whichever runs second sees what the first left behind: nothing
+@pytest.mark.parametrize("attempt", [1, 2])
+def test_each_test_starts_from_the_template(db_session, attempt):
+    assert db_session.scalar(select(func.count()).where(Official.name == NAME)) == 0
+    add_official(db_session)
+    assert db_session.scalar(select(func.count()).where(Official.name == NAME)) == 1
@@ -0,0 +1,26 @@
+"""
+The Prometheus endpoint is off unless configured and honours METRICS_TOKEN.
+Runs on SQLite; no database needed.
+"""
+from app import create_app
+
+
+def metrics_client(**config):
+    return create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", **config}).test_client()
+
+
+def test_metrics_endpoint_is_off_by_default():
+    assert metrics_client().get("/metrics").status_code == 404
+
+
+def test_metrics_endpoint_without_token():
+    response = metrics_client(METRICS_ENDPOINT="/metrics").get("/metrics")
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.get_data(as_text=True)
+
+
+def test_metrics_endpoint_requires_token():
+    client = metrics_client(METRICS_ENDPOINT="/metrics", METRICS_TOKEN="scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
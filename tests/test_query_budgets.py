@@ -0,0 +1,73 @@
+"""
+Statements per request for the map, leader, seat and official routes,
+against the template database (see testing/queries.py). Every budget is a
+fixed number: a route whose count grows with the number of counties,
+constituencies or terms fails here.
+"""
+import pytest
+from sqlalchemy import func, select
+
+from models import County, Constituency, Official, Term
+
+ROUTES = [
+    # maps: areas and their svgPath in one query, seat holders in another
+    ("/maps/counties", 1),
+    ("/maps/counties/{county}", 7),  # county, four county seats, constituencies, MPs
+    ("/maps/constituencies", 2),
+    ("/maps/constituencies?as_of=2017", 2),
+    ("/maps/counties/values?metric=party", 1),
+    ("/maps/constituencies/values?metric=gender&as_of=2017", 1),
+    ("/maps/counties/values?metric=population_density&method=jenks&classes=7", 2),
+    ("/maps/constituencies/values?metric=population_per_mp", 2),
+    # leaders
+    ("/officials/counties/{county}", 1),
+    ("/officials/counties/{county}?as_of=2017", 1),
+    ("/officials/mps/{county}", 1),
+    ("/officials/counties", 1),
+    ("/officials/mps?as_of=2017", 1),
+    # seats
+    ("/seats/governor/{county}/history", 3),
+    ("/seats/mp/{constituency}/history", 3),
+    # officials
+    ("/officials/{official}", 1),
+    ("/officials/search?q=khalwale", 2),
+]
+
+
+@pytest.fixture
+def ids(db_session):
+    return {
+        "county": db_session.scalar(select(func.min(County.id))),
+        "constituency": db_session.scalar(select(func.min(Constituency.id))),
+        "official": db_session.scalar(select(func.min(Term.official_id))),
+    }
+
+
+@pytest.mark.parametrize("route, budget", ROUTES)
+def test_query_budget(client, query_budget, ids, route, budget):
+    url = route.format(**ids)
+    with query_budget(budget):
+        response = client.get(url)
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def test_lazy_load_raise_only_applies_to_the_app_that_asked():
+    from app import create_app
+    from extensions.query_watch import _raiseload_everything
+
+    config = {"SQLALCHEMY_DATABASE_URI": "sqlite://", "ENABLE_MIGRATIONS": False, "SQLALCHEMY_BINDS": {}}
+    strict = create_app({**config, "LAZY_LOAD_RAISE": True})
+    relaxed = create_app(config)
+    statement = select(Official)
+
+    class State:
+        is_select = True
+        is_relationship_load = False
+        is_column_load = False
+
+    for app, raises in ((strict, True), (relaxed, False)):
+        state = State()
+        state.statement = statement
+        with app.app_context():
+            _raiseload_everything(state)
+        assert (state.statement is not statement) == raises
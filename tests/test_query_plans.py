@@ -0,0 +1,29 @@
+"""
+Plans of the hot queries against the seeded test database, checked with
+tools/query_plans.py: no sequential scan on a watched table big enough for
+an index, and no estimated cost more than 50% above (or missing from)
+tools/query_plans.json.
+"""
+import pytest
+
+from tools.query_plans import SEQ_SCAN_MIN_ROWS, check_plans, hot_queries, load_baseline
+
+
+@pytest.fixture(scope="module")
+def result(app):
+    return check_plans(app, load_baseline())
+
+
+def test_baseline_covers_every_hot_query():
+    assert set(load_baseline()) == set(hot_queries())
+
+
+def test_every_watched_table_is_checked(result):
+    # a limit above the seeded row count would never flag anything
+    small = {table: rows for table, rows in result["rows"].items() if rows < SEQ_SCAN_MIN_ROWS[table]}
+    assert set(result["rows"]) == set(SEQ_SCAN_MIN_ROWS)
+    assert not small, f"seeded tables below their SEQ_SCAN_MIN_ROWS: {small}"
+
+
+def test_hot_query_plans(result):
+    assert not result["failures"], "\n".join(result["failures"])
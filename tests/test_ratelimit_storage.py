@@ -0,0 +1,142 @@
+"""
+The Postgres limiter storage (extensions/ratelimit_storage.py): fixed and
+sliding window boundaries, the expiry sweep, and the in-memory fallback
+when the database is down. The clock is the module's ``time``, replaced by
+a settable one.
+"""
+import types
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from extensions import ratelimit_storage
+from extensions.ratelimit_storage import SCHEME_PREFIX, TABLE, PostgresStorage
+
+# nothing listens on port 1; connecting fails at once
+UNREACHABLE = SCHEME_PREFIX + "postgresql+psycopg2://nobody@127.0.0.1:1/none"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=1_000_000.0)
+    fake.time = lambda: fake.now
+    monkeypatch.setattr(ratelimit_storage, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def storage(test_database_uri, clock):
+    storage = PostgresStorage(SCHEME_PREFIX + test_database_uri)
+    assert storage.check()  # creates the table and rate_limit_acquire()
+    storage.reset()
+    yield storage
+    storage.reset()
+    storage.engine.dispose()
+
+
+def rows(storage):
+    with storage.engine.connect() as conn:
+        return dict(conn.execute(text(f"SELECT key, count FROM {TABLE}")).all())
+
+
+# --- fixed window ---
+
+def test_fixed_window_counts_until_expiry(storage, clock):
+    assert storage.incr("k", expiry=60) == 1
+    assert storage.incr("k", expiry=60, amount=2) == 3
+    assert storage.get_expiry("k") == 1_000_060.0
+
+    clock.now += 59.999
+    assert storage.get("k") == 3
+    assert storage.incr("k", expiry=60) == 4
+
+    # expires_at is exclusive: at the boundary the window starts over
+    clock.now = 1_000_060.0
+    assert storage.get("k") == 0
+    assert storage.get_expiry("k") == clock.now
+    assert storage.incr("k", expiry=60) == 1
+    assert storage.get_expiry("k") == 1_000_120.0
+
+
+def test_clear(storage):
+    storage.incr("k", expiry=60)
+    storage.incr("other", expiry=60)
+    storage.clear("k")
+    assert storage.get("k") == 0 and storage.get("other") == 1
+
+
+# --- sliding window counter ---
+
+def test_sliding_window_stops_at_the_limit(storage):
+    assert all(storage.acquire_sliding_window_entry("s", limit=5, expiry=60) for _ in range(5))
+    assert not storage.acquire_sliding_window_entry("s", limit=5, expiry=60)
+    assert not storage.acquire_sliding_window_entry("t", limit=5, expiry=60, amount=6)
+    assert storage.get_sliding_window("s", 60)[2] == 5
+
+
+def test_sliding_window_weighs_the_previous_window(storage, clock):
+    clock.now = 60 * 20_000.0  # start of a window
+    for _ in range(10):
+        assert storage.acquire_sliding_window_entry("s", limit=10, expiry=60)
+
+    # first instant of the next window: the previous one still counts in full
+    clock.now += 60
+    assert not storage.acquire_sliding_window_entry("s", limit=10, expiry=60)
+
+    # halfway through: 10 * 0.5 = 5 used, so 5 more fit
+    clock.now += 30
+    assert all(storage.acquire_sliding_window_entry("s", limit=10, expiry=60) for _ in range(5))
+    assert not storage.acquire_sliding_window_entry("s", limit=10, expiry=60)
+    previous, _, current, _ = storage.get_sliding_window("s", 60)
+    assert (previous, current) == (10, 5)
+
+    # two windows on, the first one no longer counts
+    clock.now += 60
+    previous, _, current, _ = storage.get_sliding_window("s", 60)
+    assert (previous, current) == (5, 0)
+    assert all(storage.acquire_sliding_window_entry("s", limit=10, expiry=60) for _ in range(7))
+
+
+def test_clear_sliding_window(storage):
+    storage.acquire_sliding_window_entry("s", limit=5, expiry=60)
+    storage.clear_sliding_window("s", 60)
+    assert storage.get_sliding_window("s", 60)[2] == 0
+
+
+# --- expiry sweep ---
+
+def test_expired_counters_are_swept(storage, clock, monkeypatch):
+    monkeypatch.setattr(ratelimit_storage, "SWEEP_EVERY", 3)
+    storage.incr("old", expiry=10)
+    clock.now += 10
+    storage.incr("live", expiry=60)
+    assert set(rows(storage)) == {"old", "live"}
+
+    # the third write sweeps; "old" expired at the current time
+    storage.acquire_sliding_window_entry("s", limit=5, expiry=60)
+    assert "old" not in rows(storage)
+    assert rows(storage)["live"] == 1
+
+
+# --- fallback ---
+
+def test_unreachable_storage_raises_sqlalchemy_errors():
+    storage = PostgresStorage(UNREACHABLE)
+    assert storage.check() is False
+    with pytest.raises(SQLAlchemyError):
+        storage.incr("k", expiry=60)
+    assert storage.base_exceptions is SQLAlchemyError
+
+
+def test_limits_fall_back_to_memory_when_the_database_is_down():
+    from app import create_app
+    from extensions.limiter import limiter
+
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "RATELIMIT_STORAGE_URI": UNREACHABLE,
+    })
+    app.add_url_rule("/limited", "limited", limiter.limit("2 per minute")(lambda: "ok"))
+    client = app.test_client()
+    assert [client.get("/limited").status_code for _ in range(3)] == [200, 200, 429]
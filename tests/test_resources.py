@@ -0,0 +1,192 @@
+"""
+One or more requests per resource group (resources/registry.py), answered
+from the template database. Mapbox is the only thing replaced: the forward
+geocode returns a fixed point, and the constituency lookup runs as usual.
+"""
+import pytest
+from sqlalchemy import func, select
+
+from models import County, Constituency, MailOutbox, MessageFingerprint, Official, Position, Term
+from services.mapbox_geocoding import MapboxGeocodingService
+
+# Nairobi CBD, [lng, lat] as Mapbox returns it
+NAIROBI = [36.8219, -1.2921]
+MESSAGE = "Which office handles the water shortage in our ward? We have had none for a month."
+
+
+def first_id(db_session, column):
+    return db_session.scalar(select(func.min(column)))
+
+
+# --- location ---
+
+@pytest.fixture
+def geocode(monkeypatch):
+    found = {"coords": NAIROBI}
+    monkeypatch.setattr(MapboxGeocodingService, "_forward_geocode", lambda self, place: found["coords"])
+    return found
+
+
+def test_location_search(client, geocode):
+    response = client.get("/location_search?place=Nairobi CBD")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["location"]["county"] == "Nairobi"
+    assert body["location"]["constituency"]
+
+
+def test_location_search_outside_every_constituency(client, geocode):
+    geocode["coords"] = [0.0, 0.0]
+    assert client.get("/location_search?place=Null Island").status_code == 404
+
+
+def test_location_search_needs_a_place(client):
+    assert client.get("/location_search").status_code == 400
+
+
+# --- mail ---
+
+def test_mail_is_queued_once(client, db_session):
+    queued = db_session.scalar(select(func.count(MailOutbox.id)))
+
+    response = client.post("/send_mail", json={"email": "resident@example.com", "message": MESSAGE})
+    assert response.status_code == 200
+    assert response.get_json()["success"] is True
+    assert db_session.scalar(select(func.count(MailOutbox.id))) == queued + 1
+    assert db_session.scalar(select(func.count(MessageFingerprint.id))) >= 1
+
+    again = client.post("/send_mail", json={"email": "other@example.com", "message": MESSAGE.upper()})
+    assert again.status_code == 409
+    assert db_session.scalar(select(func.count(MailOutbox.id))) == queued + 1
+
+
+@pytest.mark.parametrize("payload", [
+    {"email": "resident@example.com"},
+    {"email": "resident@example.com", "message": "too short"},
+    {"email": "resident@example.com", "message": MESSAGE, "middleName": "bot"},
+    {"email": "resident@example.com", "message": MESSAGE + " https://spam.example"},
+])
+def test_mail_rejects(client, payload):
+    assert client.post("/send_mail", json=payload).status_code == 400
+
+
+# --- presidents ---
+
+def test_presidents(client):
+    body = client.get("/presidents").get_json()
+    assert {leader["position"] for leader in body["all_leaders"]} >= {"President"}
+    assert any(leader["position"] == "President" for leader in body["current_leaders"])
+    serving = {leader["name"] for leader in body["all_leaders"] if leader["end_year"] is None}
+    assert {leader["name"] for leader in body["current_leaders"]} == serving
+
+
+def test_presidents_as_of(client):
+    body = client.get("/presidents?as_of=2005").get_json()
+    for leader in body["all_leaders"]:
+        assert leader["start_year"] <= 2005
+        assert leader["end_year"] is None or leader["end_year"] >= 2005
+
+
+# --- officials ---
+
+def test_official_profile(client, db_session):
+    official_id = first_id(db_session, Term.official_id)
+    body = client.get(f"/officials/{official_id}").get_json()
+    assert body["official"]["id"] == official_id
+    starts = [t["term"]["start_year"] for t in body["terms"]]
+    assert starts and starts == sorted(starts)
+
+
+def test_official_profile_not_found(client, db_session):
+    missing = db_session.scalar(select(func.max(Official.id))) + 1
+    assert client.get(f"/officials/{missing}").status_code == 404
+
+
+def test_official_search_finds_the_name(client, db_session):
+    name = db_session.get(Official, first_id(db_session, Term.official_id)).name
+    body = client.get("/officials/search", query_string={"q": name}).get_json()
+    assert name in [result["name"] for result in body["results"]]
+
+
+def test_county_officials(client, db_session):
+    county_id = first_id(db_session, Term.county_id)
+    body = client.get(f"/officials/counties/{county_id}").get_json()
+    assert body
+    assert {entry["county"]["id"] for entry in body} == {county_id}
+    assert {entry["position"]["level"] for entry in body} == {"county"}
+
+
+# --- maps ---
+
+def test_counties_map(client, db_session):
+    body = client.get("/maps/counties").get_json()
+    assert len(body) == db_session.scalar(select(func.count(County.id)))
+    assert all(county["svgPath"] for county in body)
+
+
+def test_county_detail_map(client, db_session):
+    county_id = db_session.scalar(select(County.id).where(func.lower(County.name) == "nairobi"))
+    body = client.get(f"/maps/counties/{county_id}").get_json()
+    assert body["county"]["name"] == "Nairobi"
+    constituencies = db_session.scalar(select(func.count(Constituency.id)).where(Constituency.county_id == county_id))
+    assert len(body["constituencies"]) == constituencies
+    assert len(body["leaders"]["mps"]) == sum(1 for c in body["constituencies"] if c["mp"])
+    assert body["leaders"]["governor"]["position"] == "Governor"
+
+
+def test_county_detail_map_not_found(client, db_session):
+    missing = db_session.scalar(select(func.max(County.id))) + 1
+    assert client.get(f"/maps/counties/{missing}").status_code == 404
+
+
+@pytest.mark.parametrize("method", ["quantile", "jenks"])
+def test_numeric_map_values(client, method):
+    body = client.get(f"/maps/constituencies/values?metric=population_per_mp&method={method}&classes=5").get_json()
+    assert body["type"] == "numeric"
+    assert body["breaks"] == sorted(body["breaks"])
+    assert len(body["classes"]) == len(body["breaks"]) - 1 <= 5
+    known = [value for value in body["values"].values() if value is not None]
+    assert sum(c["count"] for c in body["classes"]) == len(known)
+
+
+def test_party_map_values(client, db_session):
+    body = client.get("/maps/counties/values?metric=party").get_json()
+    assert body["type"] == "categorical" and body["seat"] == "Governor"
+    assert sum(c["count"] for c in body["classes"]) == len(body["values"])
+
+
+# --- stats ---
+
+def test_seat_share(client):
+    years = client.get("/stats/seat-share/years").get_json()
+    assert years["MP"]
+    year = years["MP"][-1]
+
+    body = client.get(f"/stats/seat-share?position=mp&year={year}").get_json()
+    assert body["year"] == year
+    assert body["total_seats"] == sum(party["seats"] for party in body["parties"]) > 0
+
+
+def test_seat_share_rejects_bad_years(client):
+    assert client.get("/stats/seat-share?position=mp&year=twenty").status_code == 400
+    assert client.get("/stats/seat-share").status_code == 400
+
+
+# --- seats ---
+
+def test_seat_history(client, db_session):
+    mp = db_session.scalar(select(Position.id).where(Position.name == "MP"))
+    constituency_id = db_session.scalar(
+        select(Term.constituency_id).where(Term.position_id == mp, Term.nomination_type.is_(None))
+        .group_by(Term.constituency_id).order_by(func.count().desc(), Term.constituency_id).limit(1)
+    )
+    body = client.get(f"/seats/mp/{constituency_id}/history").get_json()
+    assert body["seat"]["location"]["id"] == constituency_id
+    starts = [term["start_year"] for term in body["terms"]]
+    assert len(starts) >= 2 and starts == sorted(starts)
+    assert body["summary"]["terms"] == len(starts)
+    assert not body["terms"][0]["re_elected"]
+
+
+def test_seat_history_unknown_position(client):
+    assert client.get("/seats/emperor/1/history").status_code == 404
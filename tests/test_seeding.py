@@ -0,0 +1,213 @@
+"""
+Manifest validation, source parsing and staging of the seeder. Pure Python;
+no database needed.
+"""
+import pytest
+
+from seeding.manifest import ManifestError, load_manifest, select_sources
+from seeding.parsers import load_geojson, parse_geometry_features, parse_officials, parse_party_abbr
+from seeding.pipeline import plan_jobs
+from seeding.staging import stage_records
+
+POSITIONS = [{"name": "Governor", "level": "county"}, {"name": "MP", "level": "constituency"}]
+
+
+def write_manifest(tmp_path, body):
+    path = tmp_path / "sources.toml"
+    path.write_text(body, encoding="utf-8")
+    return path
+
+
+# --- manifest ---
+
+def test_manifest_defaults(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, """
+[[positions]]
+name = "Governor"
+level = "county"
+
+[sources.governors]
+kind = "officials"
+path = "data/governors.csv"
+
+[sources.governors.columns]
+name = "Name"
+county = ["county", "County"]
+"""))
+    spec = manifest["sources"]["governors"]
+    assert spec["name"] == "governors"
+    assert spec["path"].endswith("data/governors.csv")
+    assert spec["columns"] == {"name": ["Name"], "county": ["county", "County"]}
+    assert spec["default"] is True
+    assert spec["optional"] is False
+    assert spec["geometry_keys"] == {}
+
+
+@pytest.mark.parametrize("body, message", [
+    ('[sources.x]\nkind = "tweets"\npath = "x.csv"\n', "unknown kind"),
+    ('[sources.x]\nkind = "officials"\n', "has no path"),
+    ('[[positions]]\nname = "Governor"\n', "need a name and level"),
+])
+def test_manifest_rejects(tmp_path, body, message):
+    with pytest.raises(ManifestError, match=message):
+        load_manifest(write_manifest(tmp_path, body))
+
+
+def test_select_sources():
+    manifest = load_manifest()
+    default = select_sources(manifest)
+    assert "governors_2017" not in default
+    assert "counties" in default and "ward_boundaries" in default
+
+    subset = select_sources(manifest, ["governors_2017"])
+    assert "governors_2017" in subset and "governors_2022" not in subset
+    # reference data and boundaries are always loaded
+    assert "counties" in subset and "county_boundaries" in subset
+
+    with pytest.raises(ManifestError, match="unknown sources: nope"):
+        select_sources(manifest, ["governors_2017", "nope"])
+
+
+def test_missing_source_file(tmp_path):
+    spec = {"name": "gone", "kind": "officials", "path": str(tmp_path / "gone.csv"), "optional": False}
+    with pytest.raises(ManifestError, match="gone.csv does not exist"):
+        list(plan_jobs({"gone": spec}))
+    assert list(plan_jobs({"gone": {**spec, "optional": True}})) == []
+
+
+# --- parsers ---
+
+def officials_spec(tmp_path, csv_text, **extra):
+    path = tmp_path / "officials.csv"
+    path.write_text(csv_text, encoding="utf-8")
+    return {
+        "name": "governors", "kind": "officials", "path": str(path), "position": "Governor",
+        "election_year": 2022, "require": ["name", "county"],
+        "columns": {"name": ["name"], "county": ["county"], "party": ["party"],
+                    "start_year": ["start"], "end_year": ["end"]},
+        **extra,
+    }
+
+
+def test_parse_officials_skips_unusable_rows(tmp_path):
+    spec = officials_spec(tmp_path, "\n".join([
+        "name,county,party,start,end",
+        "Jane Doe,Nyeri,UDA,2017,2022",
+        "---,Nyeri,UDA,,",                # placeholder name
+        ",Kisumu,ODM,,",                  # blank name
+        "No County,,ODM,,",               # missing a required column
+        "VACANT seat,Mombasa,,,",         # skip_prefixes
+        "Diaspora Rep,Diaspora,ODM,,",    # no_location_values
+    ]), skip_prefixes=["vacant"], no_location_values=["diaspora"])
+    records = parse_officials(spec)
+    assert [r["name"] for r in records] == ["Jane Doe", "Diaspora Rep"]
+    jane, diaspora = records
+    assert (jane["start_year"], jane["end_year"]) == (2017, 2022)
+    assert jane["gender"] == "other" and jane["photo_url"].startswith("https://placehold.co/")
+    assert diaspora["county"] is None
+    # no start year in the file: the manifest's election year
+    assert diaspora["start_year"] == 2022
+
+
+def test_parse_officials_term_requires_any(tmp_path):
+    spec = officials_spec(tmp_path, "name,county,party,start,end\nJane Doe,Nyeri,,,\n",
+                          term_requires_any=["party"])
+    assert parse_officials(spec)[0]["position"] is None
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (None, []),
+    ("  ", []),
+    ("['UDA', 'WDM']", ["UDA", "WDM"]),
+    ("UDA; ODM,", ["UDA", "ODM"]),
+    ("['UDA'", ["['UDA'"]),  # not a valid list literal, so one abbreviation
+    ("JP", ["JP"]),
+])
+def test_parse_party_abbr(raw, expected):
+    assert parse_party_abbr(raw) == expected
+
+
+def test_geometry_features_without_a_key_are_skipped():
+    spec = {"kind": "ward_geometry", "geometry_keys": {"code": "CODE"}}
+    features = [
+        {"properties": {"CODE": "12"}, "geometry": None},
+        {"properties": {"CODE": ""}, "geometry": None},
+        {"properties": None, "geometry": None},
+    ]
+    assert parse_geometry_features(spec, features) == [{"code": "0012", "geom": None, "geom_valid": None}]
+
+
+def test_load_geojson_missing_file(tmp_path):
+    assert load_geojson(tmp_path / "missing.json") == {}
+
+
+# --- staging ---
+
+def official(name, start_year, end_year=None, source="governors", position="Governor", county="Nyeri"):
+    return {
+        "source": source, "name": name, "position": position, "gender": "other",
+        "photo_url": "https://example.com/p.webp", "party": None, "party_name": None,
+        "party_from": None, "county": county, "constituency": None,
+        "start_year": start_year, "end_year": end_year, "nomination_type": None,
+    }
+
+
+def stage(*officials):
+    records = {
+        "counties": [{"name": "Nyeri", "code": "019", "population": None, "area": None,
+                      "population_density": None}],
+        "officials": list(officials),
+    }
+    return stage_records(records, POSITIONS)
+
+
+def years(staging):
+    names = {o["id"]: o["name"] for o in staging.tables["officials"]}
+    return sorted((names[t["official_id"]], t["start_year"], t["end_year"]) for t in staging.tables["terms"])
+
+
+def test_holder_listed_twice_for_one_seat_is_one_term():
+    staging = stage(official("Jane Doe", 2022), official("Jane Doe", 2023, source="by_elections"))
+    assert years(staging) == [("Jane Doe", 2023, None)]
+    assert staging.issues["duplicate_terms"] == [
+        {"source": "by_elections", "official": "Jane Doe", "position": "Governor", "start_years": [2022, 2023]},
+    ]
+    # two sources, two start years: not a duplicate official
+    assert staging.issues["duplicate_officials"] == []
+
+
+def test_same_term_listed_twice_is_a_duplicate_official():
+    staging = stage(official("Jane Doe", 2022), official("JANE DOE", 2022))
+    assert len(staging.tables["officials"]) == 1
+    [issue] = staging.issues["duplicate_officials"]
+    assert issue["name"] == "JANE DOE" and len(issue["appearances"]) == 2
+
+
+def test_successive_terms_are_not_duplicates():
+    staging = stage(official("Jane Doe", 2017, 2022), official("Jane Doe", 2022))
+    assert years(staging) == [("Jane Doe", 2017, 2022), ("Jane Doe", 2022, None)]
+    assert staging.issues["duplicate_terms"] == [] and staging.issues["duplicate_officials"] == []
+
+
+def test_overlapping_terms_end_at_the_successors_start():
+    staging = stage(
+        official("First Holder", 2017, 2022),
+        official("Second Holder", 2019, 2022),
+        official("Caretaker", 2017, 2017),
+        official("Next Holder", 2022),
+    )
+    assert years(staging) == [
+        ("Caretaker", 2017, 2017),
+        ("First Holder", 2017, 2019),
+        ("Next Holder", 2022, None),
+        ("Second Holder", 2019, 2022),
+    ]
+    assert staging.issues["overlapping_terms"] == [{
+        "source": "governors", "official": "First Holder", "position": "Governor", "years": [2017, 2022],
+        "successor": "Second Holder", "successor_source": "governors", "successor_years": [2019, 2022],
+    }]
+
+
+def test_overlaps_are_per_seat():
+    staging = stage(official("Jane Doe", 2017, 2022), official("John Doe", 2017, 2022, position="MP"))
+    assert staging.issues["overlapping_terms"] == []
@@ -0,0 +1,120 @@
+"""
+Contact-form fingerprints (services/spam_fingerprint.py). normalize and
+simhash are pure Python; find_repeat runs against the test database.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import Config
+from models import MessageFingerprint
+from services.spam_fingerprint import (
+    MAX_CHARS, content_hash, find_repeat, fingerprint, normalize, remember, signed, simhash,
+)
+
+REPORT = "There has been no water in Kisauni for three weeks. Please tell me which county officials are responsible."
+NEIGHBOUR = "There has been no water in Nyali for three weeks. Please tell me which county officials are responsible."
+# within the default 3 bits of REPORT; most sign-offs are not (see tools/simhash_distances.py)
+EDITED = REPORT + " asap"
+UNRELATED = "Your map shows the wrong boundary for Likoni; the ward office is on the other side of the river."
+
+
+def bits_apart(a, b):
+    return bin(simhash(normalize(a)) ^ simhash(normalize(b))).count("1")
+
+
+# --- normalize ---
+
+@pytest.mark.parametrize("raw, expected", [
+    ("  Hello,   WORLD!! ", "hello world"),
+    ("Café naïve résumé", "cafe naive resume"),
+    ("see https://spam.example/x?y=1 and www.example.com now", "see url and url now"),
+    ("line one\n\tline two", "line one line two"),
+    ("under_score stays", "under_score stays"),
+    ("!!!", ""),
+])
+def test_normalize(raw, expected):
+    assert normalize(raw) == expected
+
+
+def test_normalize_truncates_long_messages():
+    assert normalize("a" * MAX_CHARS + "b") == "a" * MAX_CHARS
+
+
+def test_cosmetic_edits_are_exact_duplicates():
+    assert fingerprint(REPORT) == fingerprint(REPORT.upper().replace(".", "...") + "   ")
+    assert content_hash(normalize(REPORT)) != content_hash(normalize(NEIGHBOUR))
+
+
+# --- simhash ---
+
+def test_simhash_is_a_stable_64_bit_value():
+    value = simhash(normalize(REPORT))
+    assert 0 <= value < 1 << 64
+    assert value == simhash(normalize(REPORT))
+    assert simhash("") == simhash("")
+
+
+def test_signed_keeps_the_bits():
+    assert signed(5) == 5
+    assert signed((1 << 64) - 1) == -1
+    assert signed(1 << 63) == -(1 << 63)
+    for value in (5, (1 << 64) - 1, 1 << 63):
+        assert signed(value) % (1 << 64) == value
+
+
+def test_small_edit_stays_within_the_default_distance():
+    assert bits_apart(REPORT, EDITED) <= Config.SPAM_SIMHASH_DISTANCE
+
+
+def test_reports_about_neighbouring_places_are_not_near_duplicates():
+    assert bits_apart(REPORT, NEIGHBOUR) > Config.SPAM_SIMHASH_DISTANCE
+
+
+def test_unrelated_messages_are_far_apart():
+    assert bits_apart(REPORT, UNRELATED) >= 20
+
+
+# --- find_repeat ---
+
+@pytest.fixture
+def fingerprints(app, db_session):
+    with app.test_request_context():
+        yield db_session
+
+
+def test_find_repeat(fingerprints):
+    assert find_repeat(fingerprint(REPORT)) is None
+    remember(fingerprint(REPORT))
+    fingerprints.flush()
+
+    assert find_repeat(fingerprint(REPORT)) == "duplicate"
+    assert find_repeat(fingerprint(REPORT.lower() + "!")) == "duplicate"
+    assert find_repeat(fingerprint(EDITED)) == "near-duplicate"
+    assert find_repeat(fingerprint(NEIGHBOUR)) is None
+    assert find_repeat(fingerprint(UNRELATED)) is None
+
+
+def test_find_repeat_prefers_the_exact_match(fingerprints):
+    remember(fingerprint(EDITED))
+    remember(fingerprint(REPORT))
+    fingerprints.flush()
+    assert find_repeat(fingerprint(REPORT)) == "duplicate"
+
+
+def test_find_repeat_ignores_expired_fingerprints(app, fingerprints):
+    digest, value = fingerprint(REPORT)
+    expired = datetime.utcnow() - timedelta(seconds=app.config["SPAM_FINGERPRINT_WINDOW"] + 60)
+    fingerprints.add(MessageFingerprint(content_hash=digest, simhash=value, created_at=expired))
+    fingerprints.flush()
+    assert find_repeat((digest, value)) is None
+
+
+def test_find_repeat_only_checks_the_newest_entries(app, fingerprints, monkeypatch):
+    monkeypatch.setitem(app.config, "SPAM_FINGERPRINT_MAX_ENTRIES", 2)
+    remember(fingerprint(REPORT))
+    remember(fingerprint(UNRELATED))
+    remember(fingerprint(NEIGHBOUR))
+    fingerprints.flush()
+    assert find_repeat(fingerprint(REPORT)) is None
+    assert find_repeat(fingerprint(NEIGHBOUR)) == "duplicate"
@@ -0,0 +1,22 @@
+"""
+Cold-start budget for create_app(), measured under ``python -X importtime``
+in a fresh interpreter (see tools/check_startup.py). Needs no database.
+"""
+import subprocess
+import sys
+
+from tools.check_startup import ROOT, best_of, budget_ms
+
+
+def test_create_app_within_startup_budget():
+    wall_ms, imports = best_of(repeat=3)
+    budget = budget_ms()
+    slowest = ", ".join(f"{name} {us / 1000:.0f} ms" for us, name in sorted(imports, reverse=True)[:5])
+    assert wall_ms <= budget, f"create_app() took {wall_ms:.0f} ms (budget {budget:.0f} ms); slowest: {slowest}"
+
+
+def test_importing_app_is_cheap():
+    # models, GeoAlchemy2 and the resources are only imported by create_app()
+    probe = "import sys, app; print(' '.join(m for m in ('models', 'geoalchemy2', 'resources.maps') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
@@ -0,0 +1,68 @@
+"""
+Term tenure ranges against the seeded test database: a term that starts and
+ends in the same year is held in that year, and still doesn't conflict with
+a successor starting in it.
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from models import County, Official, Position, SeatShare, Term
+
+
+def governor_terms(db_session, county_name, year):
+    return db_session.execute(
+        select(Official.name)
+        .join(Term.official)
+        .join(Term.position)
+        .join(Term.county)
+        .where(Position.name == "Governor", County.name == county_name, Term.held_in(year))
+    ).scalars().all()
+
+
+def test_zero_length_term_is_held_in_its_year(db_session):
+    # Patrick Wahome Gakuru, 2017-2017 in data/2017/governors_2017.csv
+    assert governor_terms(db_session, "Nyeri", 2017) == ["Patrick Wahome Gakuru"]
+    assert "Patrick Wahome Gakuru" not in governor_terms(db_session, "Nyeri", 2018)
+
+
+def test_zero_length_term_counts_in_seat_share(db_session):
+    nyeri = db_session.execute(select(County).where(County.name == "Nyeri")).scalar_one()
+    governor = db_session.execute(select(Position).where(Position.name == "Governor")).scalar_one()
+    seats = db_session.execute(
+        select(SeatShare.seats).where(
+            SeatShare.election_year == 2017,
+            SeatShare.position_id == governor.id,
+            SeatShare.county_id == nyeri.id,
+        )
+    ).scalars().all()
+    assert sum(seats) == 1
+
+
+def make_term(db_session, start_year, end_year, **seat):
+    official = Official(name=f"Tenure Check {start_year}-{end_year}", gender="other",
+                        photo_url="https://example.com/official.webp")
+    db_session.add(official)
+    db_session.flush()
+    db_session.add(Term(official_id=official.id, start_year=start_year, end_year=end_year, **seat))
+    db_session.flush()
+
+
+@pytest.fixture
+def empty_seat(db_session):
+    position = Position(name="Tenure Check Seat", level="national")
+    db_session.add(position)
+    db_session.flush()
+    return {"position_id": position.id}
+
+
+def test_successor_starting_in_a_zero_length_year_is_allowed(db_session, empty_seat):
+    make_term(db_session, 2013, 2017, **empty_seat)
+    make_term(db_session, 2017, 2017, **empty_seat)
+    make_term(db_session, 2017, None, **empty_seat)
+
+
+def test_overlapping_elected_terms_are_rejected(db_session, empty_seat):
+    make_term(db_session, 2013, 2018, **empty_seat)
+    with pytest.raises(IntegrityError):
+        make_term(db_session, 2017, None, **empty_seat)
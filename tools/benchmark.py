@@ -0,0 +1,287 @@
+'''
+Endpoint benchmarks against a synthetic PostGIS dataset.
+
+    python -m tools.benchmark seed --scale 10       # (re)build the dataset
+    python -m tools.benchmark run --output bench/baseline.json
+    python -m tools.benchmark run --compare bench/baseline.json
+
+``seed`` TRUNCATEs and reloads every table, so it only ever talks to
+BENCH_DATABASE_URI (a scratch PostGIS database), never DATABASE_URI.
+``run`` requests every GET route registered on the app through the test
+client and records latency percentiles, SQL statements and payload bytes
+per route in a JSON report. ``--compare`` prints the change against an
+earlier report and exits with status 1 when a route got slower than
+``--tolerance`` or runs more queries.
+'''
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+# routes that can't be benchmarked offline
+SKIP_ROUTES = {
+    '/send_mail': 'POST only; queues email',
+    '/location_search': 'calls the Mapbox API',
+    '/metrics': 'instrumentation',
+}
+
+# path argument -> table its sample ids come from, or (other argument,
+# {its value: table}) when the table depends on another argument; a value
+# mapped to None takes id 0 (national seats have no location)
+ARGUMENT_TABLES = {
+    'county_id': 'counties',
+    'constituency_id': 'constituencies',
+    'official_id': 'officials',
+    'location_id': ('position', {'mp': 'constituencies', 'governor': 'counties', 'president': None}),
+}
+
+# path arguments that take a fixed set of values
+ARGUMENT_VALUES = {
+    'layer': ['counties', 'constituencies'],
+    'position': ['mp', 'governor', 'president'],
+}
+
+# query strings for routes that need them (synthetic officials are "Official N")
+ROUTE_QUERIES = {
+    '/officials/search': ['q=official 12', 'q=ofiscial', 'q=official 3&current=true', 'q=official&level=county'],
+    '/stats/seat-share': ['position=mp', 'position=mp&year=2022&compare=2017', 'position=governor&by=county'],
+    '/maps/<string:layer>/values': ['metric=party', 'metric=gender', 'metric=population_density&method=jenks',
+                                    'metric=population_per_mp'],
+}
+
+
+def bench_database_uri():
+    load_dotenv()
+    uri = os.getenv('BENCH_DATABASE_URI')
+    if not uri:
+        raise SystemExit('Set BENCH_DATABASE_URI to a scratch PostGIS database (it gets truncated).')
+    return uri
+
+
+def create_bench_app(uri):
+    from app import create_app
+
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'SQLALCHEMY_BINDS': {},
+        'ENABLE_MIGRATIONS': False,
+        'METRICS_DEBUG_HEADERS': True,
+        'STATEMENT_TIMEOUT_MS': 0,
+        'RATELIMIT_ENABLED': False,
+    })
+
+
+def seed(args):
+    from sqlalchemy import text
+    from models import db
+    from seeding.writer import write_records
+    from tools.synthetic_data import generate
+
+    started = time.perf_counter()
+    staging = generate(args.scale, terms_per_seat=args.terms, vertices=args.vertices, seed=args.seed)
+    print(f"Generated {staging.report()['counts']} in {time.perf_counter() - started:.1f}s")
+
+    app = create_bench_app(bench_database_uri())
+    with app.app_context():
+        db.session.execute(text('CREATE EXTENSION IF NOT EXISTS postgis'))
+        db.session.execute(text('CREATE EXTENSION IF NOT EXISTS btree_gist'))
+        db.session.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        db.session.commit()
+        db.create_all()
+        write_records(staging)
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def sample_ids(table, limit):
+    """Up to ``limit`` ids spread evenly over ``table``."""
+    from sqlalchemy import text
+    from models import db
+
+    ids = db.session.execute(text(f'SELECT id FROM {table} ORDER BY id')).scalars().all()
+    step = max(1, len(ids) // limit)
+    return ids[::step][:limit]
+
+
+def argument_values(arg, chosen, samples):
+    """Values to try for path argument ``arg``, given the ones ``chosen`` so far."""
+    if arg in ARGUMENT_VALUES:
+        return ARGUMENT_VALUES[arg]
+    table = ARGUMENT_TABLES[arg]
+    if isinstance(table, tuple):
+        other, tables = table
+        table = tables.get(chosen[other])
+        if table is None:
+            return [0]
+    return sample_ids(table, samples)
+
+
+def route_urls(app, samples):
+    """``{rule: [url, ...]}`` for every benchmarkable GET route."""
+    urls = {}
+    skipped = {}
+    with app.app_context():
+        for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+            if rule.endpoint == 'static':
+                continue
+            if rule.rule in SKIP_ROUTES or 'GET' not in rule.methods:
+                skipped[rule.rule] = SKIP_ROUTES.get(rule.rule, 'no GET handler')
+                continue
+            unknown = [arg for arg in rule.arguments if arg not in ARGUMENT_TABLES and arg not in ARGUMENT_VALUES]
+            if unknown:
+                skipped[rule.rule] = f'no sample ids for {", ".join(unknown)}'
+                continue
+            # every combination of argument values; dependent arguments go last
+            combinations = [{}]
+            for arg in sorted(rule.arguments, key=lambda a: isinstance(ARGUMENT_TABLES.get(a), tuple)):
+                combinations = [
+                    {**chosen, arg: value}
+                    for chosen in combinations
+                    for value in argument_values(arg, chosen, samples)
+                ]
+            paths = [rule.build(chosen)[1] for chosen in combinations]
+            queries = ROUTE_QUERIES.get(rule.rule)
+            urls[rule.rule] = [f'{path}?{query}' for path in paths for query in queries] if queries else paths
+    return urls, skipped
+
+
+def run(args):
+    app = create_bench_app(bench_database_uri())
+    client = app.test_client()
+    urls, skipped = route_urls(app, args.samples)
+
+    routes = {}
+    for rule, targets in urls.items():
+        latencies, queries, sizes, statuses = [], [], [], set()
+        for i in range(args.warmup + args.requests):
+            url = targets[i % len(targets)]
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - started
+            if i < args.warmup:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(int(response.headers.get('X-Query-Count', 0)))
+            sizes.append(len(response.get_data()))
+            statuses.add(response.status_code)
+        routes[rule] = {
+            'requests': len(latencies),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'queries_max': max(queries),
+            'queries_mean': round(sum(queries) / len(queries), 1),
+            'bytes_mean': round(sum(sizes) / len(sizes)),
+            'statuses': sorted(statuses),
+        }
+        print(f"{rule:42} p50 {routes[rule]['p50_ms']:9.1f} ms  p95 {routes[rule]['p95_ms']:9.1f} ms  "
+              f"{routes[rule]['queries_max']:6} queries  {routes[rule]['bytes_mean']:10} bytes")
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'requests': args.requests,
+            'samples': args.samples,
+            'dataset': dataset_counts(app),
+        },
+        'routes': routes,
+        'skipped': skipped,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        if compare(baseline, report, args.tolerance):
+            sys.exit(1)
+
+
+def dataset_counts(app):
+    from sqlalchemy import text
+    from models import db
+
+    with app.app_context():
+        return {
+            table: db.session.execute(text(f'SELECT count(*) FROM {table}')).scalar()
+            for table in ('counties', 'constituencies', 'wards', 'officials', 'terms')
+        }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(baseline, report, tolerance):
+    """Print per-route changes; return True if anything regressed."""
+    if baseline['meta'].get('dataset') != report['meta'].get('dataset'):
+        print('Warning: the baseline was recorded against a different dataset')
+    regressed = False
+    print(f"\n{'route':42} {'p95 before':>11} {'p95 now':>9} {'change':>8} {'queries':>15}")
+    for rule, now in report['routes'].items():
+        before = baseline['routes'].get(rule)
+        if not before:
+            print(f'{rule:42} (new route)')
+            continue
+        change = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0.0
+        slower = change > tolerance
+        more_queries = now['queries_max'] > before['queries_max']
+        flag = '  REGRESSION' if slower or more_queries else ''
+        regressed |= slower or more_queries
+        print(f"{rule:42} {before['p95_ms']:11.1f} {now['p95_ms']:9.1f} {change:+8.0%} "
+              f"{before['queries_max']:7} -> {now['queries_max']:<5}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every API route on a synthetic dataset.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help='load the synthetic dataset into BENCH_DATABASE_URI')
+    seed_parser.add_argument('--scale', type=int, default=1, choices=(1, 10, 100),
+                             help='multiple of the real data size (default: 1)')
+    seed_parser.add_argument('--terms', type=int, default=3, help='historical terms per seat (default: 3)')
+    seed_parser.add_argument('--vertices', type=int, default=8,
+                             help='vertices per polygon side, drives geometry size (default: 8)')
+    seed_parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    seed_parser.set_defaults(func=seed)
+
+    run_parser = commands.add_parser('run', help='benchmark every GET route')
+    run_parser.add_argument('--requests', type=int, default=20, help='timed requests per route (default: 20)')
+    run_parser.add_argument('--warmup', type=int, default=2, help='untimed requests per route (default: 2)')
+    run_parser.add_argument('--samples', type=int, default=5,
+                            help='distinct ids per parametrised route (default: 5)')
+    run_parser.add_argument('--output', metavar='PATH', help='write the JSON report here')
+    run_parser.add_argument('--compare', metavar='PATH', help='compare against an earlier JSON report')
+    run_parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='allowed p95 slowdown before --compare fails (default: 0.2 = 20%%)')
+    run_parser.set_defaults(func=run)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
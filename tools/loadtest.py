@@ -0,0 +1,319 @@
+'''
+Load test for sizing gunicorn workers.
+
+Starts a stub Mapbox geocoding server, then for each worker configuration
+starts gunicorn on the local app, replays a weighted mix of requests from
+``--concurrency`` keep-alive clients for ``--duration`` seconds, and
+reports throughput, latency percentiles, error rate and DB pool checkout
+wait (read from each response's Server-Timing header, so it covers every
+worker). The fastest configuration that meets ``--slo-ms`` at p95 with
+under 1% errors is recommended.
+
+Run with: python -m tools.loadtest [--configs sync:9 gthread:4x4 gevent:4] [--mix mix.json]
+
+The app uses DATABASE_URI as usual; it should hold seeded (or synthetic,
+see tools/benchmark.py) data. Requires gunicorn; gevent configurations are
+skipped unless gevent is installed. psycopg2 blocks a gevent worker on
+every query unless psycogreen patches it, which these numbers will show.
+'''
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import signal
+import argparse
+import threading
+import subprocess
+import http.client
+from importlib.util import find_spec
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# path template -> relative weight
+DEFAULT_MIX = {
+    '/maps/counties': 15,
+    '/maps/counties/{county_id}': 25,
+    '/maps/constituencies': 10,
+    '/officials/counties': 10,
+    '/officials/counties/{county_id}': 10,
+    '/officials/mps': 10,
+    '/officials/mps/{county_id}': 5,
+    '/presidents': 5,
+    '/location_search?place={place}': 10,
+}
+
+# [lng, lat] the stub hands back, spread over several counties
+STUB_POINTS = [
+    [36.8219, -1.2921],   # Nairobi
+    [39.6682, -4.0435],   # Mombasa
+    [34.7617, -0.0917],   # Kisumu
+    [36.0800, -0.3031],   # Nakuru
+    [35.2698, 0.5143],    # Eldoret
+    [37.0722, -0.4167],   # Nyeri
+    [40.0573, 1.7471],    # Wajir
+]
+
+PLACES = ['Kenyatta Avenue', 'Moi Avenue', 'Market Street', 'Station Road', 'Hospital Road', 'Kanisa Road']
+
+SLO_MS = 500
+MAX_ERROR_RATE = 0.01
+
+
+# --- Mapbox stub ---
+
+class MapboxStub(BaseHTTPRequestHandler):
+    latency = 0.08
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        body = json.dumps({
+            'type': 'FeatureCollection',
+            'features': [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': random.choice(STUB_POINTS)}}],
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mapbox_stub(latency_ms):
+    MapboxStub.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MapboxStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/search/geocode/v6/forward'
+
+
+# --- gunicorn ---
+
+def parse_config(spec):
+    """``sync:9`` / ``gthread:4x8`` / ``gevent:4`` -> dict."""
+    kind, _, size = spec.partition(':')
+    workers, _, threads = size.partition('x')
+    return {'name': spec, 'kind': kind, 'workers': int(workers or 1), 'threads': int(threads or 1)}
+
+
+def default_configs(cores):
+    configs = [f'sync:{cores}', f'sync:{2 * cores + 1}']
+    configs += [f'gthread:{cores}x{threads}' for threads in (2, 4, 8)]
+    configs += [f'gevent:{cores}']
+    return configs
+
+
+def start_gunicorn(config, port, mapbox_url, connections):
+    env = dict(os.environ)
+    env.update({
+        'MAPBOX_GEOCODE_URL': mapbox_url,
+        'MAPBOX_ACCESS_TOKEN': 'stub',
+        'ENABLE_MIGRATIONS': '0',
+        'METRICS_DEBUG_HEADERS': '1',
+        # the per-client read budgets would turn most of the load into 429s
+        'RATELIMIT_ENABLED': '0',
+    })
+    cmd = [sys.executable, '-m', 'gunicorn', 'app:create_app()', '--bind', f'127.0.0.1:{port}',
+           '--worker-class', config['kind'], '--workers', str(config['workers']), '--log-level', 'warning']
+    if config['kind'] == 'gthread':
+        cmd += ['--threads', str(config['threads'])]
+    if config['kind'] == 'gevent':
+        cmd += ['--worker-connections', str(connections)]
+    return subprocess.Popen(cmd, cwd=ROOT, env=env)
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not come up on port {port}')
+
+
+def stop(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# --- load ---
+
+def server_timing(header, name):
+    for part in (header or '').split(','):
+        fields = part.strip().split(';')
+        if fields[0] == name:
+            for field in fields[1:]:
+                if field.startswith('dur='):
+                    return float(field[4:])
+    return 0.0
+
+
+def client_loop(port, paths, weights, county_ids, deadline, results, seed):
+    rnd = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while time.monotonic() < deadline:
+        template = rnd.choices(paths, weights)[0]
+        path = template.format(county_id=rnd.choice(county_ids), place=quote(rnd.choice(PLACES)))
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+            pool_wait = server_timing(response.getheader('Server-Timing'), 'pool')
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            status, pool_wait = None, 0.0
+        results.append((template, (time.perf_counter() - started) * 1000, status, pool_wait))
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)] if ordered else None
+
+
+def summarise(results, duration):
+    latencies = [r[1] for r in results]
+    # 404s from location_search are a normal "no constituency here" answer
+    errors = sum(1 for r in results if r[2] is None or r[2] >= 500)
+    pool_waits = [r[3] for r in results]
+    per_path = {}
+    for template, latency, status, _ in results:
+        per_path.setdefault(template, []).append(latency)
+    return {
+        'requests': len(results),
+        'throughput_rps': round(len(results) / duration, 1),
+        'p50_ms': round(percentile(latencies, 0.50) or 0, 1),
+        'p95_ms': round(percentile(latencies, 0.95) or 0, 1),
+        'p99_ms': round(percentile(latencies, 0.99) or 0, 1),
+        'error_rate': round(errors / len(results), 4) if results else 1.0,
+        'pool_wait_mean_ms': round(sum(pool_waits) / len(pool_waits), 2) if pool_waits else 0.0,
+        'pool_wait_p95_ms': round(percentile(pool_waits, 0.95) or 0, 2),
+        'paths': {t: {'requests': len(v), 'p95_ms': round(percentile(v, 0.95), 1)} for t, v in sorted(per_path.items())},
+    }
+
+
+def run_config(config, args, mapbox_url, paths, weights, port):
+    process = start_gunicorn(config, port, mapbox_url, args.concurrency)
+    try:
+        wait_until_up(port)
+        results = []
+        deadline = time.monotonic() + args.duration
+        clients = [
+            threading.Thread(target=client_loop,
+                             args=(port, paths, weights, args.county_ids, deadline, results, i))
+            for i in range(args.concurrency)
+        ]
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+        return summarise(results, args.duration)
+    finally:
+        stop(process)
+
+
+def recommend(report, slo_ms):
+    passing = [
+        (name, r) for name, r in report.items()
+        if r and r['p95_ms'] <= slo_ms and r['error_rate'] < MAX_ERROR_RATE
+    ]
+    if not passing:
+        return None
+    name, result = max(passing, key=lambda item: item[1]['throughput_rps'])
+    config = parse_config(name)
+    note = ''
+    if result['pool_wait_p95_ms'] > 10:
+        note = ' (DB pool is saturating; raise DB_POOL_SIZE or lower the thread count)'
+    return {
+        'config': name,
+        'worker_class': config['kind'],
+        'workers': config['workers'],
+        'threads': config['threads'],
+        'throughput_rps': result['throughput_rps'],
+        'p95_ms': result['p95_ms'],
+        'summary': f"gunicorn -k {config['kind']} -w {config['workers']}"
+                   + (f" --threads {config['threads']}" if config['kind'] == 'gthread' else '') + note,
+    }
+
+
+def parse_ids(spec):
+    lo, _, hi = spec.partition('-')
+    return list(range(int(lo), int(hi or lo) + 1))
+
+
+def main(argv=None):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='Load-test the app under several gunicorn worker configurations.')
+    parser.add_argument('--configs', nargs='+', metavar='KIND:W[xT]',
+                        help=f'worker configurations (default: {" ".join(default_configs(cores))})')
+    parser.add_argument('--cores', type=int, default=cores,
+                        help='core count the default configurations are sized for (default: this machine)')
+    parser.add_argument('--mix', metavar='PATH', help='JSON object of path template -> weight (default: built-in mix)')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent clients (default: 32)')
+    parser.add_argument('--duration', type=float, default=30, help='seconds per configuration (default: 30)')
+    parser.add_argument('--county-ids', type=parse_ids, default=parse_ids('1-47'),
+                        help='range filled into {county_id} (default: 1-47)')
+    parser.add_argument('--mapbox-latency-ms', type=float, default=80,
+                        help='artificial latency of the Mapbox stub (default: 80)')
+    parser.add_argument('--slo-ms', type=float, default=SLO_MS, help=f'p95 target (default: {SLO_MS})')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--report', metavar='PATH', help='write the JSON report here')
+    args = parser.parse_args(argv)
+
+    if find_spec('gunicorn') is None:
+        raise SystemExit('gunicorn is not installed (pipenv install)')
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix, encoding='utf-8') as fh:
+            mix = json.load(fh)
+    paths, weights = list(mix), list(mix.values())
+
+    stub, mapbox_url = start_mapbox_stub(args.mapbox_latency_ms)
+    report = {}
+    try:
+        for spec in args.configs or default_configs(args.cores):
+            config = parse_config(spec)
+            if config['kind'] == 'gevent' and find_spec('gevent') is None:
+                print(f'{spec:16} skipped (gevent is not installed)')
+                report[spec] = None
+                continue
+            result = run_config(config, args, mapbox_url, paths, weights, args.port)
+            report[spec] = result
+            print(f"{spec:16} {result['throughput_rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f}  "
+                  f"p95 {result['p95_ms']:7.1f}  p99 {result['p99_ms']:7.1f} ms  "
+                  f"errors {result['error_rate']:.2%}  pool wait p95 {result['pool_wait_p95_ms']:.1f} ms")
+    finally:
+        stub.shutdown()
+
+    recommendation = recommend(report, args.slo_ms)
+    print()
+    if recommendation:
+        print(f"Recommended for {args.cores} cores: {recommendation['summary']}")
+    else:
+        print(f'No configuration met p95 <= {args.slo_ms:.0f} ms with < {MAX_ERROR_RATE:.0%} errors')
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as fh:
+            json.dump({'cores': args.cores, 'concurrency': args.concurrency, 'duration': args.duration,
+                       'mix': mix, 'results': report, 'recommendation': recommendation}, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
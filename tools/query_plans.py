@@ -0,0 +1,217 @@
+'''
+Query-plan regression checks for the hot queries.
+
+Each entry in HOT_QUERIES mirrors a query the API runs on every request
+(point-in-constituency lookup, current MP / county leaders, position by
+name, the lower(name) lookups, official search). ``check_plans()`` runs
+``EXPLAIN (FORMAT JSON)`` on each and reports
+
+* a sequential scan on terms, constituencies, wards or officials when the
+  table holds at least its ``SEQ_SCAN_MIN_ROWS`` rows (below that a seq scan
+  is the right plan; ``--min-rows`` sets one limit for all of them),
+* an estimated total cost more than ``--tolerance`` above the baseline,
+* a query with no cost in the baseline.
+
+Run with: python -m tools.query_plans [--update-baseline] [--min-rows N]
+
+Uses DATABASE_URI (a seeded database; see seed.py or tools/benchmark.py).
+The baseline lives in tools/query_plans.json; record it with
+--update-baseline against a seeded PostGIS database, and again when a plan
+change is intended. A null ``total_cost`` means not recorded yet, and fails
+the check until it is. tests/test_query_plans.py runs the same check under
+pytest against the template database from testing/fixtures.py.
+'''
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.dialects import postgresql
+
+BASELINE = Path(__file__).with_name('query_plans.json')
+
+# watched tables and the row count from which a sequential scan on them is
+# flagged; a seeded database has about 290 constituencies, 1,450 wards and
+# several thousand terms and officials
+SEQ_SCAN_MIN_ROWS = {
+    'terms': 1000,
+    'officials': 1000,
+    'wards': 500,
+    'constituencies': 100,
+}
+COST_TOLERANCE = 0.5
+
+# a point inside Nairobi; any seeded point works
+POINT = (36.8219, -1.2921)
+
+
+def hot_queries():
+    """``{name: statement}``, built from the same models and filters the resources use."""
+    from models import County, Constituency, Ward, Term, Position, Official
+    from resources.officials import search_query
+
+    point = func.ST_SetSRID(func.ST_MakePoint(*POINT), 4326)
+    any_constituency = select(func.min(Constituency.id)).scalar_subquery()
+    any_county = select(func.min(County.id)).scalar_subquery()
+
+    return {
+        # MapboxGeocodingService._get_constituency_by_point
+        'constituency_by_point': (
+            select(Constituency).where(func.ST_Contains(Constituency.geom, point)).limit(1)
+        ),
+        'ward_by_point': (
+            select(Ward).where(func.ST_Contains(Ward.geom, point)).limit(1)
+        ),
+        # MapboxGeocodingService.get_current_leaders (MPs)
+        'current_mp_terms': (
+            select(Term).join(Term.position).where(
+                Term.end_year.is_(None),
+                Term.constituency_id == any_constituency,
+                Position.level == 'constituency',
+                or_(func.lower(Position.name) == 'mp', Position.name.ilike('%mp%')),
+            )
+        ),
+        # MapboxGeocodingService.get_current_leaders (county seats)
+        'current_county_terms': (
+            select(Term).join(Term.position).where(
+                Term.end_year.is_(None),
+                Term.constituency_id.is_(None),
+                Term.county_id == any_county,
+                Position.level == 'county',
+            )
+        ),
+        # resources/maps.py get_leader_by_position
+        'leader_by_position_ilike': (
+            select(Term, Official, Position)
+            .join(Official, Term.official_id == Official.id)
+            .join(Position, Term.position_id == Position.id)
+            .where(Position.name.ilike('MP'), Term.constituency_id == any_constituency)
+            .order_by(Term.end_year.desc().nulls_first(), Term.start_year.desc())
+            .limit(1)
+        ),
+        # ?as_of=YEAR on the county and constituency leader endpoints
+        'county_terms_as_of': (
+            select(Term).where(Term.county_id == any_county, Term.held_in(2017))
+        ),
+        'constituency_terms_as_of': (
+            select(Term).where(Term.constituency_id == any_constituency, Term.held_in(2017))
+        ),
+        # resources/seats.py history_query
+        'constituency_seat_history': (
+            select(Term).where(
+                Term.position_id == select(func.min(Position.id)).where(Position.level == 'constituency')
+                .scalar_subquery(),
+                Term.constituency_id == any_constituency,
+            ).order_by(Term.start_year, Term.id)
+        ),
+        # resources/leaders.py CountyMPsResource
+        'county_mp_terms': (
+            select(Term).join(Term.position).join(Term.constituency)
+            .where(Constituency.county_id == any_county, Position.level == 'constituency')
+        ),
+        # the lower(name) expression indexes declared in models.py
+        'county_by_lower_name': select(County).where(func.lower(County.name) == 'nairobi'),
+        'constituency_by_lower_name': select(Constituency).where(func.lower(Constituency.name) == 'westlands'),
+        'official_by_lower_name': select(Official).where(func.lower(Official.name) == 'william ruto'),
+        # resources/officials.py OfficialSearch (GIN: tsvector and pg_trgm)
+        'official_search': search_query('khalwale'),
+        'official_search_misspelt': search_query('kalwale', level='county', current=True),
+    }
+
+
+def explain(session, statement):
+    # a named paramstyle leaves % alone (pg_trgm's <% operator); text() escapes it for the driver
+    sql = str(statement.compile(dialect=postgresql.dialect(paramstyle='named'), compile_kwargs={'literal_binds': True}))
+    return session.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()[0]['Plan']
+
+
+def walk(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from walk(child)
+
+
+def table_rows(session):
+    return dict(session.execute(text(
+        "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r' AND relname = ANY(:tables)"
+    ), {'tables': list(SEQ_SCAN_MIN_ROWS)}).all())
+
+
+def check_plans(app, baseline=None, min_rows=None, tolerance=COST_TOLERANCE):
+    """
+    Explain every hot query; return ``{'plans': {...}, 'rows': {...}, 'failures': [...]}``.
+    ``min_rows`` replaces the per-table SEQ_SCAN_MIN_ROWS with one limit.
+    """
+    from models import db
+
+    baseline = baseline or {}
+    limits = SEQ_SCAN_MIN_ROWS if min_rows is None else dict.fromkeys(SEQ_SCAN_MIN_ROWS, min_rows)
+    plans = {}
+    failures = []
+    with app.app_context():
+        rows = table_rows(db.session)
+        for name, statement in hot_queries().items():
+            plan = explain(db.session, statement)
+            seq_scans = sorted({
+                node['Relation Name'] for node in walk(plan)
+                if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in limits
+            })
+            cost = plan['Total Cost']
+            plans[name] = {'total_cost': cost, 'seq_scans': seq_scans}
+
+            for table in seq_scans:
+                if rows.get(table, 0) >= limits[table]:
+                    failures.append(f'{name}: sequential scan on {table} ({rows[table]} rows)')
+            before = baseline.get(name, {}).get('total_cost')
+            if before is None:
+                failures.append(f'{name}: no baseline cost recorded; run python -m tools.query_plans --update-baseline')
+            elif cost > before * (1 + tolerance):
+                failures.append(f'{name}: estimated cost {cost:.1f} is {cost / before - 1:.0%} above baseline {before:.1f}')
+        db.session.rollback()
+    return {'plans': plans, 'rows': rows, 'failures': failures}
+
+
+def load_baseline(path=BASELINE):
+    if not Path(path).exists():
+        return {}
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the plans of the hot queries against a baseline.')
+    parser.add_argument('--baseline', default=str(BASELINE), help='baseline JSON (default: tools/query_plans.json)')
+    parser.add_argument('--update-baseline', action='store_true', help='write the current costs as the baseline')
+    parser.add_argument('--min-rows', type=int, default=None,
+                        help='flag seq scans on any watched table with at least this many rows '
+                             '(default: per table, see SEQ_SCAN_MIN_ROWS)')
+    parser.add_argument('--tolerance', type=float, default=COST_TOLERANCE,
+                        help=f'allowed cost increase over the baseline (default: {COST_TOLERANCE} = 50%%)')
+    args = parser.parse_args(argv)
+
+    from app import create_app
+
+    app = create_app({'ENABLE_MIGRATIONS': False, 'SQLALCHEMY_BINDS': {}})
+    result = check_plans(app, load_baseline(args.baseline), args.min_rows, args.tolerance)
+
+    for name, plan in result['plans'].items():
+        scans = f"  seq scan: {', '.join(plan['seq_scans'])}" if plan['seq_scans'] else ''
+        print(f"{name:30} cost {plan['total_cost']:10.1f}{scans}")
+
+    if args.update_baseline:
+        costs = {name: {'total_cost': plan['total_cost']} for name, plan in result['plans'].items()}
+        with open(args.baseline, 'w', encoding='utf-8') as fh:
+            json.dump(costs, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+        print(f'Baseline written to {args.baseline}')
+        return
+    for failure in result['failures']:
+        print(f'FAIL {failure}')
+    if result['failures']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
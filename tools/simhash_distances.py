@@ -0,0 +1,99 @@
+'''
+SimHash distances behind the SPAM_SIMHASH_DISTANCE default.
+
+Fingerprints three sets of message pairs with services/spam_fingerprint.py
+and prints how far apart they land:
+
+* edits: one message and a resubmission with a greeting, sign-off, typo,
+  link or punctuation change (what a spammer varies);
+* neighbours: the same report about two different places, e.g. a water
+  shortage in Kisauni and in Nyali (legitimate, and must not be blocked);
+* unrelated: different reports.
+
+Then, for every threshold, the share of edits caught and of neighbours
+wrongly rejected. Neighbours are as close as edits (a place name changes
+as many 5-grams as a sign-off), so no threshold separates them; the default
+is the largest one that rejects at most about 1% of neighbours.
+
+Run with: python -m tools.simhash_distances [--max-distance 12]
+'''
+
+import argparse
+import itertools
+import statistics
+
+from services.spam_fingerprint import normalize, simhash
+
+REPORTS = [
+    'The road from {place} to the market has been impassable since the rains started. '
+    'Who is the MCA for {place} ward and how do I reach them?',
+    'Hello, I live in {place} constituency and I would like to know who our MP is and how to '
+    'contact their office about water shortages.',
+    'There has been no water in {place} for three weeks. Please tell me which county officials '
+    'are responsible so we can raise the issue.',
+    'Your map shows the wrong boundary for {place}. The ward office is on the other side of the '
+    'river according to the IEBC.',
+    'Is the information about the governor of {place} up to date? I think a by-election happened last year.',
+    'Kindly share the contact of the senator for {place} county, residents want to petition about the hospital.',
+]
+
+PLACES = ['Kisauni', 'Nyali', 'Likoni', 'Changamwe', 'Jomvu', 'Mvita',
+          'Westlands', 'Kibra', 'Embakasi East', 'Ruaraka', 'Kasarani', 'Langata']
+
+EDITS = [
+    lambda m: m + ' Thanks',
+    lambda m: 'Hi, ' + m,
+    lambda m: m.replace('the', 'teh', 1),
+    lambda m: m + ' Thank you very much!',
+    lambda m: m.replace(',', '') + '!!',
+    lambda m: m.upper(),
+    lambda m: m.replace(' is ', ' iz ', 1),
+    lambda m: 'Dear team, ' + m + ' Regards',
+    lambda m: m + ' https://example.com/offer',
+    lambda m: m.replace('.', '...'),
+]
+
+
+def fingerprint_bits(message):
+    return simhash(normalize(message))
+
+
+def distance(a, b):
+    return bin(fingerprint_bits(a) ^ fingerprint_bits(b)).count('1')
+
+
+def measure():
+    """Return ``{'edits': [...], 'neighbours': [...], 'unrelated': [...]}`` of bit distances."""
+    edits = [
+        distance(report.format(place=place), edit(report.format(place=place)))
+        for report in REPORTS for place in PLACES for edit in EDITS
+    ]
+    neighbours = [
+        distance(report.format(place=a), report.format(place=b))
+        for report in REPORTS for a, b in itertools.combinations(PLACES, 2)
+    ]
+    unrelated = [
+        distance(a.format(place=place), b.format(place=place))
+        for a, b in itertools.combinations(REPORTS, 2) for place in PLACES
+    ]
+    return {'edits': edits, 'neighbours': neighbours, 'unrelated': unrelated}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SimHash distances of edited, neighbouring and unrelated messages.')
+    parser.add_argument('--max-distance', type=int, default=12)
+    args = parser.parse_args()
+
+    distances = measure()
+    for name, values in distances.items():
+        print(f"{name:11} n={len(values):4} min={min(values):2} median={statistics.median(values):4} max={max(values):2}")
+    print()
+    print('distance  edits caught  neighbours rejected')
+    for threshold in range(args.max_distance + 1):
+        caught = sum(d <= threshold for d in distances['edits']) / len(distances['edits'])
+        rejected = sum(d <= threshold for d in distances['neighbours']) / len(distances['neighbours'])
+        print(f"{threshold:8}  {caught:11.0%}  {rejected:18.1%}")
+
+
+if __name__ == '__main__':
+    main()
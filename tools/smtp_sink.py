@@ -0,0 +1,125 @@
+'''
+Local SMTP sink for exercising the mail outbox without a real mail server.
+
+Accepts plain SMTP (no TLS, any or no AUTH), writes each message to
+``--outdir`` as an .eml file (or just logs it) and can slow down or
+temporarily reject deliveries to exercise the worker's retry path.
+
+Run with: python -m tools.smtp_sink [--port 8025] [--outdir sink/] [--latency-ms 200] [--fail-rate 0.2]
+
+and point the worker at it:
+
+    MAIL_SERVER=localhost MAIL_PORT=8025 MAIL_USE_TLS=0 python mail_worker.py
+'''
+
+import time
+import random
+import argparse
+import socketserver
+from pathlib import Path
+from datetime import datetime
+
+
+class SmtpSink(socketserver.StreamRequestHandler):
+    outdir = None
+    latency = 0.0
+    fail_rate = 0.0
+    received = 0
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.reply('220 smtp-sink ready')
+        sender, recipients = None, []
+        connection_messages = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode(errors='replace').strip().partition(' ')
+            command = command.upper()
+            if command == 'EHLO':
+                self.reply('250-smtp-sink')
+                self.reply('250-AUTH PLAIN LOGIN')
+                self.reply('250 8BITMIME')
+            elif command == 'HELO':
+                self.reply('250 smtp-sink')
+            elif command == 'AUTH':
+                self.reply('235 accepted')
+            elif command == 'MAIL':
+                sender, recipients = argument.partition(':')[2].strip(), []
+                self.reply('250 ok')
+            elif command == 'RCPT':
+                recipients.append(argument.partition(':')[2].strip())
+                self.reply('250 ok')
+            elif command == 'DATA':
+                self.reply('354 end with <CRLF>.<CRLF>')
+                data = self.read_data()
+                time.sleep(self.latency)
+                if random.random() < self.fail_rate:
+                    self.reply('451 temporary failure (smtp-sink --fail-rate)')
+                    continue
+                connection_messages += 1
+                self.store(sender, recipients, data, connection_messages)
+                self.reply('250 queued')
+            elif command == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 ok')
+            elif command == 'NOOP':
+                self.reply('250 ok')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('502 not implemented')
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b'.\r\n', b'.\n'):
+                return b''.join(lines)
+            # undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b'..') else line)
+
+    def store(self, sender, recipients, data, connection_messages):
+        type(self).received += 1
+        print(f"{datetime.now():%H:%M:%S} #{self.received} from {sender} to {', '.join(recipients)} "
+              f'({len(data)} bytes, message {connection_messages} on connection {self.client_address[1]})')
+        if self.outdir:
+            path = Path(self.outdir) / f'{time.time_ns()}.eml'
+            path.write_bytes(data)
+
+
+class Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a local SMTP server that accepts and stores all mail.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--outdir', help='write each message here as an .eml file')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay before accepting each message')
+    parser.add_argument('--fail-rate', type=float, default=0,
+                        help='fraction of messages answered with a 451 temporary failure')
+    args = parser.parse_args(argv)
+
+    if args.outdir:
+        Path(args.outdir).mkdir(parents=True, exist_ok=True)
+    SmtpSink.outdir = args.outdir
+    SmtpSink.latency = args.latency_ms / 1000
+    SmtpSink.fail_rate = args.fail_rate
+
+    with Server((args.host, args.port), SmtpSink) as server:
+        print(f'SMTP sink listening on {args.host}:{args.port}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+'''
+Synthetic, scalable dataset for benchmarks.
+
+Builds a :class:`seeding.staging.Staging` (the same structure the seeder
+writes) with procedurally generated boundaries: counties are cells of a
+grid over Kenya's bounding box, each county is cut into constituency strips
+and each constituency into ward strips, so children tile their parent
+exactly and neighbours share edges. Every seat gets ``terms_per_seat``
+historical terms; some officials are re-elected.
+
+At scale 1 the shape matches the real data (47 counties, ~6 constituencies
+per county, ~5 wards per constituency); scale N multiplies the number of
+counties, and everything below them follows.
+'''
+
+import math
+import random
+
+from seeding.manifest import load_manifest
+from seeding.parsers import PLACEHOLDER_PHOTO, format_const_code, format_ward_code
+from seeding.staging import Staging
+
+BBOX = (33.9, -4.7, 41.9, 5.0)  # min lon, min lat, max lon, max lat
+
+COUNTIES = 47
+CONSTITUENCIES_PER_COUNTY = 6
+WARDS_PER_CONSTITUENCY = 5
+PARTIES = 85
+
+COUNTY_POSITIONS = ('Governor', 'Deputy Governor', 'Senator', 'Women Representative')
+NATIONAL_POSITIONS = ('President', 'Deputy President')
+
+# chance that a seat's holder is re-elected for the next term
+REELECTION_RATE = 0.3
+
+
+def ring(x0, y0, x1, y1, vertices):
+    """Closed rectangle ring with ``vertices`` points per side."""
+    points = []
+    for i in range(vertices):
+        points.append((x0 + (x1 - x0) * i / vertices, y0))
+    for i in range(vertices):
+        points.append((x1, y0 + (y1 - y0) * i / vertices))
+    for i in range(vertices):
+        points.append((x1 - (x1 - x0) * i / vertices, y1))
+    for i in range(vertices):
+        points.append((x0, y1 - (y1 - y0) * i / vertices))
+    points.append(points[0])
+    return points
+
+
+def rectangle_wkt(x0, y0, x1, y1, vertices):
+    coords = ', '.join(f'{x:.6f} {y:.6f}' for x, y in ring(x0, y0, x1, y1, vertices))
+    return f'MULTIPOLYGON((({coords})))'
+
+
+def term_years(terms_per_seat, last_election=2022, cycle=5):
+    """``[(start_year, end_year)]`` oldest first; the last term is current."""
+    starts = [last_election - cycle * i for i in reversed(range(terms_per_seat))]
+    return [(start, starts[i + 1] if i + 1 < len(starts) else None) for i, start in enumerate(starts)]
+
+
+def generate(scale=1, terms_per_seat=3, vertices=8, seed=0, positions=None):
+    """Return a populated :class:`Staging` for ``scale`` times the real data."""
+    rnd = random.Random(seed)
+    staging = Staging()
+    positions = positions or load_manifest()['positions']
+    position_id = {p['name']: staging.add('positions', {'name': p['name'], 'level': p['level']}) for p in positions}
+
+    party_ids = [
+        staging.add('parties', {'name': f'Synthetic Party {i}', 'abbreviation': [f'SP{i}']})
+        for i in range(1, PARTIES + 1)
+    ]
+    years = term_years(terms_per_seat)
+
+    def fill_seat(position, **location):
+        holder = None
+        for start, end in years:
+            if holder is None or rnd.random() >= REELECTION_RATE:
+                holder = staging.add('officials', {
+                    'name': f'Official {len(staging.tables["officials"]) + 1}',
+                    'gender': rnd.choice(('male', 'female')),
+                    'photo_url': PLACEHOLDER_PHOTO,
+                })
+            staging.add('terms', {
+                'official_id': holder,
+                'position_id': position_id[position],
+                'party_id': rnd.choice(party_ids + [None]),
+                'start_year': start,
+                'end_year': end,
+                'county_id': location.get('county_id'),
+                'constituency_id': location.get('constituency_id'),
+                'ward_id': location.get('ward_id'),
+                'nomination_type': None,
+            })
+
+    for position in NATIONAL_POSITIONS:
+        if position in position_id:
+            fill_seat(position)
+
+    counties = COUNTIES * scale
+    columns = math.ceil(math.sqrt(counties))
+    rows = math.ceil(counties / columns)
+    min_x, min_y, max_x, max_y = BBOX
+    cell_w = (max_x - min_x) / columns
+    cell_h = (max_y - min_y) / rows
+
+    for c in range(counties):
+        x0 = min_x + (c % columns) * cell_w
+        y0 = min_y + (c // columns) * cell_h
+        county_id = staging.add('counties', {
+            'name': f'County {c + 1}',
+            'code': format_const_code(c + 1),
+            'population': rnd.randint(100_000, 4_000_000),
+            'area': round(rnd.uniform(500, 40_000), 1),
+            'population_density': rnd.randint(5, 6000),
+            'geom': rectangle_wkt(x0, y0, x0 + cell_w, y0 + cell_h, vertices),
+        })
+        for position in COUNTY_POSITIONS:
+            fill_seat(position, county_id=county_id)
+
+        strip_w = cell_w / CONSTITUENCIES_PER_COUNTY
+        for k in range(CONSTITUENCIES_PER_COUNTY):
+            number = c * CONSTITUENCIES_PER_COUNTY + k + 1
+            cx0 = x0 + k * strip_w
+            constituency_id = staging.add('constituencies', {
+                'name': f'Constituency {number}',
+                'county_id': county_id,
+                'code': format_const_code(number),
+                'population': rnd.randint(20_000, 400_000),
+                'area': round(rnd.uniform(10, 8_000), 1),
+                'population_density': round(rnd.uniform(5, 20_000), 1),
+                'geom': rectangle_wkt(cx0, y0, cx0 + strip_w, y0 + cell_h, vertices),
+            })
+            fill_seat('MP', county_id=county_id, constituency_id=constituency_id)
+
+            strip_h = cell_h / WARDS_PER_CONSTITUENCY
+            for w in range(WARDS_PER_CONSTITUENCY):
+                ward_number = (number - 1) * WARDS_PER_CONSTITUENCY + w + 1
+                wy0 = y0 + w * strip_h
+                ward_id = staging.add('wards', {
+                    'name': f'Ward {ward_number}',
+                    'constituency_id': constituency_id,
+                    'code': format_ward_code(ward_number),
+                    'geom': rectangle_wkt(cx0, wy0, cx0 + strip_w, wy0 + strip_h, vertices),
+                })
+                if 'MCA' in position_id:
+                    fill_seat('MCA', county_id=county_id, constituency_id=constituency_id, ward_id=ward_id)
+
+    return staging